@@ -8,7 +8,7 @@ from pydantic import BaseModel, Field
 from src.ingestion.scheduler import get_scheduler
 from src.ingestion.email_ingestion import ingest_emails
 from src.ingestion.calendar_ingestion import ingest_calendar_events
-from src.ingestion.todoist_ingestion import ingest_todoist_tasks, sync_task_to_todoist
+from src.ingestion.todoist_ingestion import ingest_todoist_tasks, sync_task_to_todoist, sync_tasks_to_todoist
 
 # Create router
 router = APIRouter(prefix="/ingestion", tags=["ingestion"])
@@ -27,6 +27,10 @@ class TaskSyncRequest(BaseModel):
     """Request model for syncing a task to Todoist."""
     task_id: int = Field(..., description="ID of the task to sync with Todoist")
 
+class TaskBatchSyncRequest(BaseModel):
+    """Request model for syncing several tasks to Todoist."""
+    task_ids: List[int] = Field(..., description="IDs of the tasks to sync with Todoist")
+
 class JobResponse(BaseModel):
     """Response model for job information."""
     id: str
@@ -118,6 +122,25 @@ async def sync_task(request: TaskSyncRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error syncing task to Todoist: {str(e)}")
 
+@router.post("/sync-tasks", response_model=IngestionResponse)
+async def sync_tasks(request: TaskBatchSyncRequest):
+    """
+    Sync several tasks to Todoist.
+    
+    This endpoint syncs the given local tasks with Todoist concurrently, creating or
+    updating each task as needed.
+    """
+    try:
+        results = await sync_tasks_to_todoist(request.task_ids)
+        synced = sum(1 for success in results.values() if success)
+        return {
+            "success": synced == len(results),
+            "message": f"Synced {synced} of {len(results)} tasks to Todoist.",
+            "result": results
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error syncing tasks to Todoist: {str(e)}")
+
 @router.get("/jobs", response_model=List[JobResponse])
 async def get_ingestion_jobs():
     """
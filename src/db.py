@@ -7,12 +7,12 @@ tasks, and status overviews.
 """
 import os
 import logging
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterator, List, Optional, Any, Union
 from datetime import datetime
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index, insert, update, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, joinedload, selectinload
 from sqlalchemy.sql import func
 
 # Configure logging
@@ -84,11 +84,24 @@ class Task(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     todoist_id = Column(String(100), nullable=True)  # External ID for Todoist integration
+    todoist_request_id = Column(String(32), nullable=True)  # Idempotency key for creating the Todoist task
 
     # Relationships
     goal = relationship("Goal", back_populates="tasks")
     parent = relationship("Task", remote_side=[id], backref="subtasks")
 
+    __table_args__ = (
+        # Ingestion looks tasks up by Todoist ID; most local tasks have none,
+        # so only index the linked ones
+        Index(
+            "ix_tasks_todoist_id",
+            todoist_id,
+            unique=True,
+            postgresql_where=todoist_id.isnot(None),
+            sqlite_where=todoist_id.isnot(None)
+        ),
+    )
+
 class StatusOverview(Base):
     """Model for storing status overviews generated for goals."""
     __tablename__ = "status_overviews"
@@ -169,6 +182,15 @@ class ChatMessage(Base):
     # Relationship
     session = relationship("ChatSession", back_populates="messages")
 
+class SyncState(Base):
+    """Model for storing incremental sync tokens for external services."""
+    __tablename__ = "sync_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    resource = Column(String(100), unique=True, index=True)  # e.g., 'todoist_items'
+    sync_token = Column(String(255))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 def get_db():
     """Get a database session."""
     db = SessionLocal()
@@ -177,9 +199,39 @@ def get_db():
     finally:
         db.close()
 
+def _add_missing_columns():
+    """
+    Add columns introduced after a table was first created.
+    
+    create_all never alters existing tables, so without this every query on
+    a model with a new column fails against an older database. New columns
+    must be nullable; they are added without a default.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as connection:
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                ))
+            logger.info(f"Added column {table.name}.{column.name}")
+
 def create_tables():
     """Create all tables in the database."""
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    
+    # create_all skips indexes on tables that already exist, so add any
+    # that were introduced after the tasks table was first created
+    for index in Task.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    
     logger.info("Database tables created")
 
 # Context Document Operations
@@ -282,6 +334,17 @@ def get_goal(goal_id: int) -> Optional[Goal]:
     finally:
         db.close()
 
+def get_goals_by_ids(goal_ids: List[int]) -> List[Goal]:
+    """Get several goals by ID with one query. Missing goals are left out."""
+    if not goal_ids:
+        return []
+    
+    db = SessionLocal()
+    try:
+        return db.query(Goal).filter(Goal.id.in_(goal_ids)).all()
+    finally:
+        db.close()
+
 def get_goals_by_type(goal_type: str) -> List[Goal]:
     """Get all goals of a specific type."""
     db = SessionLocal()
@@ -355,19 +418,92 @@ def create_task(
     finally:
         db.close()
 
-def get_task(task_id: int) -> Optional[Task]:
-    """Get a task by ID."""
+def get_task(task_id: int, eager: bool = True) -> Optional[Task]:
+    """
+    Get a task by ID.
+    
+    By default the parent task is joined into the same query and the
+    subtasks are fetched with one extra query, so ``task.parent`` and
+    ``task.subtasks`` can be read after the session is closed. Pass
+    ``eager=False`` to load only the task row.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Task)
+        if eager:
+            query = query.options(joinedload(Task.parent), selectinload(Task.subtasks))
+        return query.filter(Task.id == task_id).first()
+    finally:
+        db.close()
+
+def iter_tasks(batch_size: int = 500) -> Iterator[Task]:
+    """
+    Iterate over all tasks without loading the whole table at once.
+    
+    Rows are fetched from a server-side cursor in batches of ``batch_size``,
+    so memory use stays bounded however many tasks there are. The session
+    stays open until the iterator is exhausted or closed.
+    """
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(Task)
+            .order_by(Task.id)
+            .execution_options(stream_results=True)
+            .yield_per(batch_size)
+        )
+        for task in query:
+            yield task
+    finally:
+        db.close()
+
+def get_tasks_by_todoist_ids(todoist_ids: List[str]) -> Dict[str, Task]:
+    """Get the tasks linked to the given Todoist IDs, keyed by Todoist ID."""
+    if not todoist_ids:
+        return {}
+    
     db = SessionLocal()
     try:
-        return db.query(Task).filter(Task.id == task_id).first()
+        tasks = db.query(Task).filter(Task.todoist_id.in_(todoist_ids)).all()
+        return {task.todoist_id: task for task in tasks}
     finally:
         db.close()
 
 def get_tasks_by_goal(goal_id: int) -> List[Task]:
-    """Get all tasks associated with a specific goal."""
+    """Get all tasks associated with a specific goal, with their subtasks loaded."""
     db = SessionLocal()
     try:
-        return db.query(Task).filter(Task.goal_id == goal_id, Task.parent_id == None).all()
+        return (
+            db.query(Task)
+            .options(selectinload(Task.subtasks))
+            .filter(Task.goal_id == goal_id, Task.parent_id == None)
+            .all()
+        )
+    finally:
+        db.close()
+
+def get_tasks_by_goals(goal_ids: List[int]) -> Dict[int, List[Task]]:
+    """
+    Get the top-level tasks of several goals with one query, keyed by goal ID.
+    
+    Subtasks are loaded as in get_tasks_by_goal. Goals without tasks are
+    missing from the result.
+    """
+    if not goal_ids:
+        return {}
+    
+    db = SessionLocal()
+    try:
+        tasks = (
+            db.query(Task)
+            .options(selectinload(Task.subtasks))
+            .filter(Task.goal_id.in_(goal_ids), Task.parent_id == None)
+            .all()
+        )
+        tasks_by_goal: Dict[int, List[Task]] = {}
+        for task in tasks:
+            tasks_by_goal.setdefault(task.goal_id, []).append(task)
+        return tasks_by_goal
     finally:
         db.close()
 
@@ -387,7 +523,9 @@ def update_task(
     manual_priority_override: bool = None,
     manual_priority_value: float = None,
     deadline: datetime = None,
-    completed: bool = None
+    completed: bool = None,
+    todoist_id: str = None,
+    todoist_request_id: str = None
 ) -> Optional[Task]:
     """Update a task."""
     db = SessionLocal()
@@ -413,6 +551,10 @@ def update_task(
         if completed is not None:
             task.completed = completed
             task.completed_at = datetime.now() if completed else None
+        if todoist_id is not None:
+            task.todoist_id = todoist_id
+        if todoist_request_id is not None:
+            task.todoist_request_id = todoist_request_id
         
         db.commit()
         db.refresh(task)
@@ -425,11 +567,185 @@ def update_task(
     finally:
         db.close()
 
+def _execute_rows_individually(db, statement, rows: List[Dict[str, Any]], action: str) -> int:
+    """
+    Execute a statement once per row, each in its own savepoint.
+    
+    Used after a batch write fails, so one bad row doesn't lose the others.
+    If every row fails, the last error is raised.
+    
+    Args:
+        db: Session whose failed batch has been rolled back
+        statement: Insert or update statement to execute for each row
+        rows: Parameters, one dictionary per row
+        action: Description of the write for log messages
+        
+    Returns:
+        Number of rows written; fewer than len(rows) if some rows failed
+    """
+    written = 0
+    error = None
+    for index, row in enumerate(rows):
+        try:
+            with db.begin_nested():
+                db.execute(statement, [row])
+            written += 1
+        except Exception as e:
+            error = e
+            logger.error(f"Error {action} (row {index}): {str(e)}")
+    
+    if not written and error is not None:
+        db.rollback()
+        raise error
+    db.commit()
+    return written
+
+def bulk_create_tasks(rows: List[Dict[str, Any]]) -> int:
+    """
+    Create many tasks in a single transaction.
+    
+    If the batch fails, the tasks are created one by one so that one bad
+    row doesn't lose the others.
+    
+    Args:
+        rows: Task column values, one dictionary per task
+        
+    Returns:
+        Number of tasks created; fewer than len(rows) if some rows failed
+    """
+    if not rows:
+        return 0
+    
+    db = SessionLocal()
+    try:
+        db.execute(insert(Task), rows)
+        db.commit()
+        logger.info(f"Created {len(rows)} new tasks")
+        return len(rows)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error bulk creating tasks, creating them one by one: {str(e)}")
+        created = _execute_rows_individually(db, insert(Task), rows, "creating task")
+        logger.info(f"Created {created} of {len(rows)} new tasks")
+        return created
+    finally:
+        db.close()
+
+def bulk_update_tasks(rows: List[Dict[str, Any]]) -> int:
+    """
+    Update many tasks by primary key in a single transaction.
+    
+    Follows the same rules as update_task: the calculated priority is left
+    alone for tasks with a manual priority override, and changing
+    ``completed`` also sets ``completed_at``. If the batch fails, the tasks
+    are updated one by one so that one bad row doesn't lose the others.
+    
+    Args:
+        rows: Dictionaries holding the task ``id`` and the columns to update
+        
+    Returns:
+        Number of tasks updated; fewer than len(rows) if some rows failed
+    """
+    if not rows:
+        return 0
+    
+    db = SessionLocal()
+    try:
+        task_ids = [row["id"] for row in rows]
+        overridden = {
+            task_id for (task_id,) in db.query(Task.id).filter(
+                Task.id.in_(task_ids),
+                Task.manual_priority_override == True
+            )
+        }
+        
+        now = datetime.now()
+        params = []
+        for row in rows:
+            row = dict(row)
+            if row["id"] in overridden:
+                row.pop("priority", None)
+            if "completed" in row:
+                row["completed_at"] = now if row["completed"] else None
+            params.append(row)
+        
+        try:
+            db.execute(update(Task), params)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error bulk updating tasks, updating them one by one: {str(e)}")
+            updated = _execute_rows_individually(db, update(Task), params, "updating task")
+            logger.info(f"Updated {updated} of {len(params)} tasks")
+            return updated
+        
+        logger.info(f"Updated {len(params)} tasks")
+        return len(params)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error bulk updating tasks: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+# Sync State Operations
+def get_sync_token(resource: str) -> Optional[str]:
+    """Get the stored sync token for a resource, if any."""
+    db = SessionLocal()
+    try:
+        state = db.query(SyncState).filter(SyncState.resource == resource).first()
+        return state.sync_token if state else None
+    finally:
+        db.close()
+
+def set_sync_token(resource: str, sync_token: str) -> None:
+    """Store the sync token for a resource."""
+    db = SessionLocal()
+    try:
+        state = db.query(SyncState).filter(SyncState.resource == resource).first()
+        if state is None:
+            state = SyncState(resource=resource)
+            db.add(state)
+        state.sync_token = sync_token
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error storing sync token for {resource}: {str(e)}")
+        raise
+    finally:
+        db.close()
+
 # Status Overview Operations
-def create_status_overview(goal_id: int, overview: str, obstacles: Optional[str] = None) -> StatusOverview:
-    """Create a new status overview for a goal."""
+def _latest_status_overviews(db, goal_ids) -> Dict[int, StatusOverview]:
+    """Get the latest stored status overview of each goal with one query, keyed by goal ID."""
+    latest_ids = (
+        db.query(func.max(StatusOverview.id))
+        .filter(StatusOverview.goal_id.in_(goal_ids))
+        .group_by(StatusOverview.goal_id)
+    )
+    return {
+        status.goal_id: status
+        for status in db.query(StatusOverview).filter(StatusOverview.id.in_(latest_ids.scalar_subquery()))
+    }
+
+def create_status_overview(goal_id: int,
+                           overview: str,
+                           obstacles: Optional[str] = None,
+                           skip_unchanged: bool = False) -> StatusOverview:
+    """
+    Create a new status overview for a goal.
+    
+    With skip_unchanged, nothing is written if the overview is identical to
+    the goal's latest one, and that overview is returned instead.
+    """
     db = SessionLocal()
     try:
+        if skip_unchanged:
+            latest = _latest_status_overviews(db, [goal_id]).get(goal_id)
+            if latest is not None and (latest.overview, latest.obstacles) == (overview, obstacles):
+                logger.info(f"Status overview for goal {goal_id} is unchanged, not saving it again")
+                return latest
+        
         status = StatusOverview(
             goal_id=goal_id,
             overview=overview,
@@ -447,6 +763,56 @@ def create_status_overview(goal_id: int, overview: str, obstacles: Optional[str]
     finally:
         db.close()
 
+def bulk_create_status_overviews(rows: List[Dict[str, Any]], skip_unchanged: bool = False) -> int:
+    """
+    Create status overviews for many goals in a single transaction.
+    
+    Scheduled runs regenerate every goal's overview, and most goals change
+    little between runs. With skip_unchanged, an overview identical to the
+    goal's latest stored overview is not written again, so the latest
+    overview's created_at is when its content last changed.
+    
+    Args:
+        rows: Status overview column values (goal_id, overview, obstacles),
+            one dictionary per overview
+        skip_unchanged: Whether to skip overviews identical to the goal's latest one
+        
+    Returns:
+        Number of status overviews created
+    """
+    if not rows:
+        return 0
+    
+    db = SessionLocal()
+    try:
+        if skip_unchanged:
+            latest = _latest_status_overviews(db, {row["goal_id"] for row in rows})
+            stored = {(status.goal_id, status.overview, status.obstacles) for status in latest.values()}
+            
+            # Drop rows matching a stored overview or an earlier row
+            unique_rows = []
+            for row in rows:
+                content = (row["goal_id"], row.get("overview"), row.get("obstacles"))
+                if content not in stored:
+                    stored.add(content)
+                    unique_rows.append(row)
+            if len(unique_rows) < len(rows):
+                logger.info(f"Skipped {len(rows) - len(unique_rows)} unchanged status overviews")
+            rows = unique_rows
+            if not rows:
+                return 0
+        
+        db.execute(insert(StatusOverview), rows)
+        db.commit()
+        logger.info(f"Created {len(rows)} new status overviews")
+        return len(rows)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error bulk creating status overviews: {str(e)}")
+        raise
+    finally:
+        db.close()
+
 def get_latest_status_overview(goal_id: int) -> Optional[StatusOverview]:
     """Get the most recent status overview for a goal."""
     db = SessionLocal()
@@ -8,4 +8,4 @@ This package contains modules for ingesting data from various sources:
 """
 from src.ingestion.email_ingestion import ingest_emails
 from src.ingestion.calendar_ingestion import ingest_calendar_events
-from src.ingestion.todoist_ingestion import ingest_todoist_tasks, sync_task_to_todoist
\ No newline at end of file
+from src.ingestion.todoist_ingestion import ingest_todoist_tasks, sync_task_to_todoist, sync_tasks_to_todoist
\ No newline at end of file
@@ -5,9 +5,26 @@ This module schedules and runs data ingestion and processing tasks at specified
 """
 import os
 import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 
+# Optionally use the Rust-backed tick loop. apscheduler-rs patches
+# BackgroundScheduler in place on import, so it must be loaded before the
+# APScheduler imports below.
+if os.getenv("KAIROS_USE_RUST_SCHEDULER", "false").lower() in ("1", "true"):
+    try:
+        import apscheduler_rs  # noqa: F401
+    except ImportError:
+        logging.getLogger(__name__).warning(
+            "KAIROS_USE_RUST_SCHEDULER is set but apscheduler-rs is not installed; "
+            "falling back to the pure Python scheduler"
+        )
+
+import requests
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
@@ -16,17 +33,59 @@ from apscheduler.executors.pool import ThreadPoolExecutor
 
 from src.ingestion.email_ingestion import ingest_emails
 from src.ingestion.calendar_ingestion import ingest_calendar_events
-from src.ingestion.todoist_ingestion import ingest_todoist_tasks
+from src.ingestion.todoist_ingestion import TodoistClient, ingest_todoist_tasks
 
-# Import data processing modules
-from src.status_overview import run_status_overview_generation
-from src.task_prioritization import run_task_prioritization
-from src.data_processor import run_data_processing
-from src.llm_integration import get_llm
+# Data processing modules pull in the LLM client and the database models, so
+# they are imported inside the job functions that need them. Processes that
+# only use the scheduler for ingestion (or just query job status) skip that cost.
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=64)
+def _interval(minutes: int) -> IntervalTrigger:
+    """
+    Get a shared interval trigger firing every given number of minutes.
+    
+    Args:
+        minutes: Interval in minutes
+        
+    Returns:
+        Cached IntervalTrigger instance
+    """
+    return IntervalTrigger(minutes=minutes)
+
+
+@lru_cache(maxsize=64)
+def _interval_hours(hours: int) -> IntervalTrigger:
+    """
+    Get a shared interval trigger firing every given number of hours.
+    
+    Args:
+        hours: Interval in hours
+        
+    Returns:
+        Cached IntervalTrigger instance
+    """
+    return IntervalTrigger(hours=hours)
+
+
+@lru_cache(maxsize=64)
+def _cron(hour: int, minute: int) -> CronTrigger:
+    """
+    Get a shared cron trigger firing daily at the given time.
+    
+    Args:
+        hour: Hour of the day (0-23)
+        minute: Minute of the hour (0-59)
+        
+    Returns:
+        Cached CronTrigger instance
+    """
+    return CronTrigger(hour=hour, minute=minute)
+
+
 class IngestionScheduler:
     """Scheduler for data ingestion and processing tasks."""
     
@@ -37,20 +96,48 @@ class IngestionScheduler:
             'default': SQLAlchemyJobStore(url=os.getenv('SCHEDULER_DB_URL', 'sqlite:///jobs.sqlite'))
         }
         
+        # Optionally shrink the stack reserved for worker threads. Jobs spend
+        # most of their time idle between ticks, so the platform default
+        # (8 MB on Linux) is mostly wasted. The setting is process-wide and
+        # applies to threads started after this point.
+        stack_kb = int(os.getenv('SCHEDULER_THREAD_STACK_KB', '0'))
+        if stack_kb:
+            threading.stack_size(stack_kb * 1024)
+        
         # Create executor
         executors = {
             'default': ThreadPoolExecutor(max_workers=5)
         }
         
+        # Collapse missed runs into one (e.g. after the host wakes from sleep)
+        # rather than firing them back to back, and tolerate short delays
+        # instead of silently dropping the run.
+        job_defaults = {
+            'coalesce': True,
+            'max_instances': 1,
+            'misfire_grace_time': 300
+        }
+        
         # Create scheduler
         self.scheduler = BackgroundScheduler(
             jobstores=job_stores,
             executors=executors,
+            job_defaults=job_defaults,
             timezone=os.getenv('TZ', 'UTC')
         )
         
         # Initialize job status tracking
         self.job_status: Dict[str, Dict[str, Any]] = {}
+        
+        # Worker processes for CPU-bound processing, created on first use
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        
+        # HTTP session shared by every Todoist ingestion run so its pooled
+        # connections survive between ticks
+        self._http = requests.Session()
+        # Todoist client on that session, created on first use
+        self._todoist_client: Optional[TodoistClient] = None
+        self._todoist_client_lock = threading.Lock()
     
     def start(self):
         """Start the scheduler."""
@@ -63,6 +150,49 @@ class IngestionScheduler:
         if self.scheduler.running:
             self.scheduler.shutdown()
             logger.info("Ingestion scheduler shutdown")
+        
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+        
+        self._http.close()
+        self._todoist_client = None
+    
+    def _get_todoist_client(self) -> TodoistClient:
+        """
+        Get the Todoist client shared by every Todoist ingestion run.
+        
+        Returns:
+            TodoistClient on the scheduler's HTTP session
+        """
+        with self._todoist_client_lock:
+            if self._todoist_client is None:
+                self._todoist_client = TodoistClient(session=self._http)
+            return self._todoist_client
+    
+    def _run_in_process_pool(self, func, *args, **kwargs) -> Any:
+        """
+        Run a CPU-bound function in a worker process and wait for its result.
+        
+        Jobs themselves stay on the thread pool so they can update job_status;
+        only the work is shipped to another process, where it is not limited
+        by the GIL. Workers are spawned rather than forked so they do not
+        inherit the parent's database connections.
+        
+        Args:
+            func: Module-level (picklable) function to run
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+            
+        Returns:
+            Return value of the function
+        """
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=2,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._process_pool.submit(func, *args, **kwargs).result()
     
     def add_email_ingestion_job(self, days: int = 1, interval_minutes: int = 1440):
         """
@@ -81,7 +211,7 @@ class IngestionScheduler:
         self.scheduler.add_job(
             func=self._run_email_ingestion,
             args=[days],
-            trigger=IntervalTrigger(minutes=interval_minutes),
+            trigger=_interval(interval_minutes),
             id=job_id,
             replace_existing=True,
             name=f"Email Ingestion (every {interval_minutes} minutes)"
@@ -115,7 +245,7 @@ class IngestionScheduler:
         self.scheduler.add_job(
             func=self._run_calendar_ingestion,
             args=[days_past, days_future],
-            trigger=IntervalTrigger(minutes=interval_minutes),
+            trigger=_interval(interval_minutes),
             id=job_id,
             replace_existing=True,
             name=f"Calendar Ingestion (every {interval_minutes} minutes)"
@@ -146,7 +276,7 @@ class IngestionScheduler:
         # Add the job to the scheduler
         self.scheduler.add_job(
             func=self._run_todoist_ingestion,
-            trigger=IntervalTrigger(minutes=interval_minutes),
+            trigger=_interval(interval_minutes),
             id=job_id,
             replace_existing=True,
             name=f"Todoist Ingestion (every {interval_minutes} minutes)"
@@ -178,7 +308,7 @@ class IngestionScheduler:
         # Add the job to the scheduler
         self.scheduler.add_job(
             func=self._run_all_ingestion,
-            trigger=CronTrigger(hour=hour, minute=minute),
+            trigger=_cron(hour, minute),
             id=job_id,
             replace_existing=True,
             name=f"Daily Ingestion (at {hour:02d}:{minute:02d})"
@@ -208,6 +338,32 @@ class IngestionScheduler:
             # Job might not exist, which is fine
             pass
     
+    def _record_run(self, job_id: str, started_at: datetime, success: bool,
+                    result: Any = None, error: Optional[str] = None):
+        """
+        Publish the outcome of a job run as a single status record.
+        
+        The record is built up front and swapped in with one assignment so
+        readers of get_job_status() never observe a half-updated entry.
+        A failed run keeps the result of the last successful run.
+        
+        Args:
+            job_id: ID of the job that ran
+            started_at: Time the run started
+            success: Whether the run succeeded
+            result: Result of the run, if successful
+            error: Error message, if the run failed
+        """
+        if not success:
+            result = self.job_status.get(job_id, {}).get('last_result')
+        
+        self.job_status[job_id] = {
+            'last_run': started_at,
+            'last_success': success,
+            'last_result': result,
+            'error': error
+        }
+    
     def get_job_status(self, job_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get the status of a specific job or all jobs.
@@ -248,19 +404,16 @@ class IngestionScheduler:
             days: Number of days of emails to ingest
         """
         job_id = 'email_ingestion'
-        self.job_status[job_id]['last_run'] = datetime.now()
+        started_at = datetime.now()
         
         try:
             result = ingest_emails(days=days)
             
-            self.job_status[job_id]['last_success'] = True
-            self.job_status[job_id]['last_result'] = result
-            self.job_status[job_id]['error'] = None
+            self._record_run(job_id, started_at, True, result=result)
             
-            logger.info(f"Email ingestion completed: {result}")
+            logger.info("Email ingestion completed: %r", result)
         except Exception as e:
-            self.job_status[job_id]['last_success'] = False
-            self.job_status[job_id]['error'] = str(e)
+            self._record_run(job_id, started_at, False, error=str(e))
             
             logger.error(f"Error in email ingestion: {str(e)}")
     
@@ -273,45 +426,39 @@ class IngestionScheduler:
             days_future: Number of days in the future to fetch events for
         """
         job_id = 'calendar_ingestion'
-        self.job_status[job_id]['last_run'] = datetime.now()
+        started_at = datetime.now()
         
         try:
             result = ingest_calendar_events(days_past=days_past, days_future=days_future)
             
-            self.job_status[job_id]['last_success'] = True
-            self.job_status[job_id]['last_result'] = result
-            self.job_status[job_id]['error'] = None
+            self._record_run(job_id, started_at, True, result=result)
             
-            logger.info(f"Calendar ingestion completed: {result}")
+            logger.info("Calendar ingestion completed: %r", result)
         except Exception as e:
-            self.job_status[job_id]['last_success'] = False
-            self.job_status[job_id]['error'] = str(e)
+            self._record_run(job_id, started_at, False, error=str(e))
             
             logger.error(f"Error in calendar ingestion: {str(e)}")
     
     def _run_todoist_ingestion(self):
         """Run Todoist ingestion task and update job status."""
         job_id = 'todoist_ingestion'
-        self.job_status[job_id]['last_run'] = datetime.now()
+        started_at = datetime.now()
         
         try:
-            result = ingest_todoist_tasks()
+            result = ingest_todoist_tasks(client=self._get_todoist_client())
             
-            self.job_status[job_id]['last_success'] = True
-            self.job_status[job_id]['last_result'] = result
-            self.job_status[job_id]['error'] = None
+            self._record_run(job_id, started_at, True, result=result)
             
-            logger.info(f"Todoist ingestion completed: {result}")
+            logger.info("Todoist ingestion completed: %r", result)
         except Exception as e:
-            self.job_status[job_id]['last_success'] = False
-            self.job_status[job_id]['error'] = str(e)
+            self._record_run(job_id, started_at, False, error=str(e))
             
             logger.error(f"Error in Todoist ingestion: {str(e)}")
     
     def _run_all_ingestion(self):
         """Run all ingestion tasks and update job status."""
         job_id = 'daily_ingestion'
-        self.job_status[job_id]['last_run'] = datetime.now()
+        started_at = datetime.now()
         
         try:
             # Run email ingestion (last 1 day)
@@ -321,7 +468,7 @@ class IngestionScheduler:
             calendar_result = ingest_calendar_events(days_past=7, days_future=30)
             
             # Run Todoist ingestion
-            todoist_result = ingest_todoist_tasks()
+            todoist_result = ingest_todoist_tasks(client=self._get_todoist_client())
             
             result = {
                 'email': email_result,
@@ -329,14 +476,11 @@ class IngestionScheduler:
                 'todoist': todoist_result
             }
             
-            self.job_status[job_id]['last_success'] = True
-            self.job_status[job_id]['last_result'] = result
-            self.job_status[job_id]['error'] = None
+            self._record_run(job_id, started_at, True, result=result)
             
-            logger.info(f"Daily ingestion completed: {result}")
+            logger.info("Daily ingestion completed: %r", result)
         except Exception as e:
-            self.job_status[job_id]['last_success'] = False
-            self.job_status[job_id]['error'] = str(e)
+            self._record_run(job_id, started_at, False, error=str(e))
             
             logger.error(f"Error in daily ingestion: {str(e)}")
     
@@ -355,7 +499,7 @@ class IngestionScheduler:
         # Add the job to the scheduler
         self.scheduler.add_job(
             func=self._run_status_overview_generation,
-            trigger=IntervalTrigger(hours=interval_hours),
+            trigger=_interval_hours(interval_hours),
             id=job_id,
             replace_existing=True,
             name=f"Status Overview Generation (every {interval_hours} hours)"
@@ -386,7 +530,7 @@ class IngestionScheduler:
         # Add the job to the scheduler
         self.scheduler.add_job(
             func=self._run_task_prioritization,
-            trigger=IntervalTrigger(minutes=interval_minutes),
+            trigger=_interval(interval_minutes),
             id=job_id,
             replace_existing=True,
             name=f"Task Prioritization (every {interval_minutes} minutes)"
@@ -417,7 +561,7 @@ class IngestionScheduler:
         # Add the job to the scheduler
         self.scheduler.add_job(
             func=self._run_data_processing,
-            trigger=IntervalTrigger(hours=interval_hours),
+            trigger=_interval_hours(interval_hours),
             id=job_id,
             replace_existing=True,
             name=f"Data Processing (every {interval_hours} hours)"
@@ -457,7 +601,7 @@ class IngestionScheduler:
         # Add the job to the scheduler
         self.scheduler.add_job(
             func=self._run_llm_enhanced_processing,
-            trigger=IntervalTrigger(hours=interval_hours),
+            trigger=_interval_hours(interval_hours),
             id=job_id,
             replace_existing=True,
             name=f"LLM-Enhanced Processing (every {interval_hours} hours)"
@@ -476,75 +620,74 @@ class IngestionScheduler:
     def _run_status_overview_generation(self):
         """Run status overview generation and update job status."""
         job_id = 'status_overview_generation'
-        self.job_status[job_id]['last_run'] = datetime.now()
+        started_at = datetime.now()
         
         try:
+            from src.status_overview import run_status_overview_generation
+            
             result = run_status_overview_generation()
             
-            self.job_status[job_id]['last_success'] = True
-            self.job_status[job_id]['last_result'] = result
-            self.job_status[job_id]['error'] = None
+            self._record_run(job_id, started_at, True, result=result)
             
             logger.info("Status overview generation completed successfully")
         except Exception as e:
-            self.job_status[job_id]['last_success'] = False
-            self.job_status[job_id]['error'] = str(e)
+            self._record_run(job_id, started_at, False, error=str(e))
             
             logger.error(f"Error in status overview generation: {str(e)}")
     
     def _run_task_prioritization(self):
         """Run task prioritization and update job status."""
         job_id = 'task_prioritization'
-        self.job_status[job_id]['last_run'] = datetime.now()
+        started_at = datetime.now()
         
         try:
-            result = run_task_prioritization()
+            from src.task_prioritization import run_task_prioritization
             
-            self.job_status[job_id]['last_success'] = True
-            self.job_status[job_id]['last_result'] = result
-            self.job_status[job_id]['error'] = None
+            result = self._run_in_process_pool(run_task_prioritization)
+            
+            self._record_run(job_id, started_at, True, result=result)
             
             logger.info("Task prioritization completed successfully")
         except Exception as e:
-            self.job_status[job_id]['last_success'] = False
-            self.job_status[job_id]['error'] = str(e)
+            self._record_run(job_id, started_at, False, error=str(e))
             
             logger.error(f"Error in task prioritization: {str(e)}")
     
     def _run_data_processing(self):
         """Run full data processing and update job status."""
         job_id = 'data_processing'
-        self.job_status[job_id]['last_run'] = datetime.now()
+        started_at = datetime.now()
         
         try:
+            from src.data_processor import run_data_processing
+            
             # Run data processing without LLM by default (to save API costs)
-            result = run_data_processing(use_llm=False)
+            result = self._run_in_process_pool(run_data_processing, use_llm=False)
             
-            self.job_status[job_id]['last_success'] = True
-            self.job_status[job_id]['last_result'] = result
-            self.job_status[job_id]['error'] = None
+            self._record_run(job_id, started_at, True, result=result)
             
-            logger.info(f"Data processing completed successfully: {result}")
+            logger.info("Data processing completed successfully: %r", result)
         except Exception as e:
-            self.job_status[job_id]['last_success'] = False
-            self.job_status[job_id]['error'] = str(e)
+            self._record_run(job_id, started_at, False, error=str(e))
             
             logger.error(f"Error in data processing: {str(e)}")
     
     def _run_llm_enhanced_processing(self):
         """Run LLM-enhanced data processing and update job status."""
         job_id = 'llm_enhanced_processing'
-        self.job_status[job_id]['last_run'] = datetime.now()
+        started_at = datetime.now()
         
         try:
             # Check if LLM is available
             if not os.getenv("ANTHROPIC_API_KEY"):
                 error_msg = "ANTHROPIC_API_KEY is not set. Cannot run LLM-enhanced processing."
                 logger.error(error_msg)
-                self.job_status[job_id]['last_success'] = False
-                self.job_status[job_id]['error'] = error_msg
+                self._record_run(job_id, started_at, False, error=error_msg)
                 return
             
+            from src.status_overview import run_status_overview_generation
+            from src.task_prioritization import run_task_prioritization
+            
             # First run status overview generation with LLM
             logger.info("Running LLM-enhanced status overview generation...")
             status_result = run_status_overview_generation(use_llm=True)
@@ -559,14 +702,11 @@ class IngestionScheduler:
                 "task_prioritization": priority_result
             }
             
-            self.job_status[job_id]['last_success'] = True
-            self.job_status[job_id]['last_result'] = result
-            self.job_status[job_id]['error'] = None
+            self._record_run(job_id, started_at, True, result=result)
             
             logger.info("LLM-enhanced processing completed successfully")
         except Exception as e:
-            self.job_status[job_id]['last_success'] = False
-            self.job_status[job_id]['error'] = str(e)
+            self._record_run(job_id, started_at, False, error=str(e))
             
             logger.error(f"Error in LLM-enhanced processing: {str(e)}")
 
@@ -4,31 +4,180 @@ Todoist ingestion module for kairoslms.
 This module connects to the Todoist API to fetch and sync tasks and subtasks.
 """
 import os
+import time
+import random
+import uuid
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
 
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib decoder used by requests
+    orjson = None
 from todoist_api_python.api import TodoistAPI
 from todoist_api_python.models import Task as TodoistTask
 from todoist_api_python.models import Project as TodoistProject
 
-from src.db import create_task, update_task, get_task, Task
+from src.utils.retries import is_retryable_http_error
+from src.db import (
+    bulk_create_tasks, bulk_update_tasks, get_sync_token, get_task,
+    get_tasks_by_todoist_ids, set_sync_token, update_task, Task
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Retry policy for rate-limited (429) and server error (5xx) responses
+MAX_ATTEMPTS = 8
+RETRY_BACKOFF_BASE = 1.0  # seconds
+RETRY_MAX_BACKOFF = 60.0  # seconds
+RETRY_JITTER = 1.0  # seconds
+
+# Time of day used for date-only due dates
+END_OF_DAY = dt_time(23, 59, 59)
+
+# Todoist Sync API endpoint and the sync_state key for its item token
+SYNC_API_URL = "https://api.todoist.com/sync/v9/sync"
+ITEMS_SYNC_RESOURCE = "todoist_items"
+
+# Failures worth logging and skipping; anything else is a bug and propagates
+TODOIST_API_ERRORS = (requests.HTTPError, requests.ConnectionError, requests.Timeout, TimeoutError)
+
+
+def _is_auth_error(error: Exception) -> bool:
+    """
+    Check whether an error is a rejected API token.
+    
+    Args:
+        error: Exception raised by a Todoist API call
+        
+    Returns:
+        True for 401 and 403 responses, which no retry will fix
+    """
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code in (401, 403)
+
+
+@dataclass
+class SyncedDue:
+    """Due date of an item returned by the Todoist Sync API."""
+    date: Optional[str]
+    datetime: Optional[str]
+
+
+@dataclass
+class SyncedTask:
+    """Task (item) returned by the Todoist Sync API.
+    
+    Exposes the same attributes as the REST SDK's Task that ingestion reads.
+    """
+    id: str
+    content: str
+    priority: int
+    is_completed: bool
+    parent_id: Optional[str]
+    due: Optional[SyncedDue]
+    
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> "SyncedTask":
+        """
+        Build a task from a Sync API item.
+        
+        Args:
+            item: Item dictionary from the sync response
+            
+        Returns:
+            SyncedTask instance
+        """
+        due = None
+        if item.get("due"):
+            # The Sync API puts timed due dates in the "date" field as well
+            due_date = item["due"].get("date")
+            if due_date and "T" in due_date:
+                due = SyncedDue(date=due_date[:10], datetime=due_date)
+            else:
+                due = SyncedDue(date=due_date, datetime=None)
+        
+        return cls(
+            id=item["id"],
+            content=item.get("content", ""),
+            priority=item.get("priority", 1),
+            is_completed=bool(item.get("checked", False)),
+            parent_id=item.get("parent_id"),
+            due=due
+        )
+
 class TodoistClient:
     """Client for interacting with Todoist API."""
     
-    def __init__(self, api_token: Optional[str] = None):
+    def __init__(self, api_token: Optional[str] = None, session: Optional[requests.Session] = None):
         """
         Initialize the Todoist client.
         
         Args:
             api_token: Todoist API token
+            session: HTTP session to reuse across clients, so repeated runs
+                keep their pooled connections instead of re-handshaking
         """
         self.api_token = api_token or os.getenv("TODOIST_API_KEY")
+        if session is not None:
+            # A caller's session is shared with other clients, so it keeps
+            # its own adapter and pooled connections
+            self.api = TodoistAPI(self.api_token, session=session)
+            self.session = session
+            return
+        
         self.api = TodoistAPI(self.api_token)
+        
+        # Session for direct Sync API calls, shared with the SDK where possible
+        session = getattr(self.api, '_session', None)
+        self.session = session if isinstance(session, requests.Session) else requests.Session()
+        
+        # Keep enough pooled connections for concurrent calls on a shared client
+        self.session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+    
+    def _with_retry(self, fn, *args, **kwargs) -> Any:
+        """
+        Call a Todoist API function, retrying on 429 and 5xx responses.
+        
+        Waits for the server's Retry-After if given, otherwise backs off
+        exponentially, always adding random jitter so that concurrent callers
+        don't retry in lockstep. Other errors are raised immediately.
+        
+        Args:
+            fn: Todoist API function to call
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+            
+        Returns:
+            Return value of the function
+        """
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                return fn(*args, **kwargs)
+            except requests.HTTPError as e:
+                response = e.response
+                if (response is None or not is_retryable_http_error(response.status_code)
+                        or attempt == MAX_ATTEMPTS - 1):
+                    raise
+                
+                retry_after = response.headers.get('Retry-After', '')
+                retry_after = float(retry_after) if retry_after.isdigit() else 0.0
+                backoff = min(max(retry_after, RETRY_BACKOFF_BASE * 2 ** attempt), RETRY_MAX_BACKOFF)
+                backoff += random.uniform(0, RETRY_JITTER)
+                
+                logger.warning(
+                    "Todoist API returned %s, retrying in %.2fs (attempt %d/%d)",
+                    response.status_code, backoff, attempt + 1, MAX_ATTEMPTS
+                )
+                time.sleep(backoff)
     
     def fetch_tasks(self, include_completed: bool = False) -> List[TodoistTask]:
         """
@@ -41,8 +190,8 @@ class TodoistClient:
             List of Todoist tasks
         """
         try:
-            tasks = self.api.get_tasks()
-            logger.info(f"Fetched {len(tasks)} active tasks from Todoist")
+            tasks = self._with_retry(self.api.get_tasks)
+            logger.info("Fetched %s active tasks from Todoist", len(tasks))
             
             if include_completed:
                 # Note: The Python Todoist API doesn't directly support fetching completed tasks
@@ -50,10 +199,68 @@ class TodoistClient:
                 logger.warning("Fetching completed tasks is not supported in this version")
             
             return tasks
-        except Exception as e:
-            logger.error(f"Error fetching tasks from Todoist: {str(e)}")
+        except TODOIST_API_ERRORS as e:
+            if _is_auth_error(e):
+                raise
+            logger.error("Error fetching tasks from Todoist: %s", e)
             return []
     
+    def fetch_tasks_sync(self, sync_token: str = "*") -> Tuple[List[SyncedTask], str]:
+        """
+        Fetch tasks with the Todoist Sync API.
+        
+        A sync token of "*" returns every task in one request; passing the
+        token from the previous call returns only tasks changed since then.
+        Deleted tasks are left out.
+        
+        Args:
+            sync_token: Token from the previous sync, or "*" for a full sync
+            
+        Returns:
+            Tuple of (changed tasks, sync token for the next call). On error
+            the tasks are empty and the given token is returned unchanged.
+        """
+        try:
+            response = self._with_retry(
+                self._post_sync,
+                {"sync_token": sync_token, "resource_types": '["items"]'}
+            )
+            payload = orjson.loads(response.content) if orjson else response.json()
+            
+            tasks = [
+                SyncedTask.from_item(item)
+                for item in payload.get("items", [])
+                if not item.get("is_deleted")
+            ]
+            sync_type = "full" if payload.get("full_sync") else "incremental"
+            logger.info("Fetched %s tasks from Todoist (%s sync)", len(tasks), sync_type)
+            
+            return tasks, payload.get("sync_token", sync_token)
+        except TODOIST_API_ERRORS as e:
+            if _is_auth_error(e):
+                raise
+            logger.error("Error syncing tasks from Todoist: %s", e)
+            return [], sync_token
+    
+    def _post_sync(self, data: Dict[str, str]) -> requests.Response:
+        """
+        POST a request to the Todoist Sync API.
+        
+        Args:
+            data: Form fields for the sync request
+            
+        Returns:
+            Successful HTTP response
+        """
+        response = self.session.post(
+            SYNC_API_URL,
+            headers={"Authorization": f"Bearer {self.api_token}"},
+            data=data,
+            timeout=30
+        )
+        response.raise_for_status()
+        return response
+    
     def fetch_projects(self) -> List[TodoistProject]:
         """
         Fetch all projects from Todoist.
@@ -62,29 +269,37 @@ class TodoistClient:
             List of Todoist projects
         """
         try:
-            projects = self.api.get_projects()
-            logger.info(f"Fetched {len(projects)} projects from Todoist")
+            projects = self._with_retry(self.api.get_projects)
+            logger.info("Fetched %s projects from Todoist", len(projects))
             return projects
-        except Exception as e:
-            logger.error(f"Error fetching projects from Todoist: {str(e)}")
+        except TODOIST_API_ERRORS as e:
+            if _is_auth_error(e):
+                raise
+            logger.error("Error fetching projects from Todoist: %s", e)
             return []
     
     def create_todoist_task(self, content: str, project_id: Optional[str] = None,
-                           parent_id: Optional[str] = None, due_string: Optional[str] = None) -> Optional[TodoistTask]:
+                           parent_id: Optional[str] = None, due_string: Optional[str] = None,
+                           request_id: Optional[str] = None) -> Optional[TodoistTask]:
         """
         Create a new task in Todoist.
         
+        The request carries an X-Request-Id that Todoist uses to deduplicate
+        writes, so a retry after a response was lost cannot create the task
+        twice. Every retry of this call sends the same ID.
+        
         Args:
             content: Task content/title
             project_id: ID of the project to add the task to
             parent_id: ID of the parent task (for creating subtasks)
             due_string: Due date as a string (e.g., "tomorrow", "next Monday")
+            request_id: Idempotency key to send; a new one is generated if not given
             
         Returns:
             Created Todoist task, or None if creation failed
         """
         try:
-            task_args = {"content": content}
+            task_args = {"content": content, "request_id": request_id or uuid.uuid4().hex}
             
             if project_id:
                 task_args["project_id"] = project_id
@@ -95,11 +310,13 @@ class TodoistClient:
             if due_string:
                 task_args["due_string"] = due_string
             
-            task = self.api.add_task(**task_args)
-            logger.info(f"Created Todoist task: {content}")
+            task = self._with_retry(self.api.add_task, **task_args)
+            logger.debug("Created Todoist task: %s", content)
             return task
-        except Exception as e:
-            logger.error(f"Error creating Todoist task: {str(e)}")
+        except TODOIST_API_ERRORS as e:
+            if _is_auth_error(e):
+                raise
+            logger.error("Error creating Todoist task: %s", e)
             return None
     
     def update_todoist_task(self, task_id: str, **kwargs) -> bool:
@@ -114,11 +331,13 @@ class TodoistClient:
             True if update was successful, False otherwise
         """
         try:
-            self.api.update_task(task_id=task_id, **kwargs)
-            logger.info(f"Updated Todoist task: {task_id}")
+            self._with_retry(self.api.update_task, task_id=task_id, **kwargs)
+            logger.debug("Updated Todoist task: %s", task_id)
             return True
-        except Exception as e:
-            logger.error(f"Error updating Todoist task {task_id}: {str(e)}")
+        except TODOIST_API_ERRORS as e:
+            if _is_auth_error(e):
+                raise
+            logger.error("Error updating Todoist task %s: %s", task_id, e)
             return False
     
     def complete_todoist_task(self, task_id: str) -> bool:
@@ -132,14 +351,30 @@ class TodoistClient:
             True if completion was successful, False otherwise
         """
         try:
-            self.api.close_task(task_id=task_id)
-            logger.info(f"Completed Todoist task: {task_id}")
+            self._with_retry(self.api.close_task, task_id=task_id)
+            logger.debug("Completed Todoist task: %s", task_id)
             return True
-        except Exception as e:
-            logger.error(f"Error completing Todoist task {task_id}: {str(e)}")
+        except TODOIST_API_ERRORS as e:
+            if _is_auth_error(e):
+                raise
+            logger.error("Error completing Todoist task %s: %s", task_id, e)
             return False
 
 
+@lru_cache(maxsize=1)
+def get_client() -> TodoistClient:
+    """
+    Get the shared Todoist client.
+    
+    Reusing one client keeps its HTTP connection pool alive across calls
+    instead of paying TCP and TLS setup on every ingestion or sync.
+    
+    Returns:
+        TodoistClient instance
+    """
+    return TodoistClient()
+
+
 def parse_todoist_due_date(due: Any) -> Optional[datetime]:
     """
     Parse Todoist due date into a datetime object.
@@ -155,75 +390,115 @@ def parse_todoist_due_date(due: Any) -> Optional[datetime]:
     
     try:
         # For datetime format
-        if hasattr(due, 'datetime') and due.datetime:
-            return datetime.fromisoformat(due.datetime.replace('Z', '+00:00'))
-        # For date format
-        elif hasattr(due, 'date') and due.date:
-            return datetime.fromisoformat(f"{due.date}T23:59:59")
+        due_datetime = getattr(due, 'datetime', None)
+        if due_datetime:
+            if due_datetime[-1] == 'Z':
+                due_datetime = due_datetime[:-1] + '+00:00'
+            return datetime.fromisoformat(due_datetime)
+        # For date format, due at the end of the day
+        due_date = getattr(due, 'date', None)
+        if due_date:
+            return datetime.combine(date.fromisoformat(due_date), END_OF_DAY)
         return None
-    except Exception as e:
-        logger.error(f"Error parsing due date: {str(e)}")
+    except ValueError as e:
+        logger.error("Error parsing due date: %s", e)
         return None
 
 
-def ingest_todoist_tasks() -> Tuple[int, int]:
+def ingest_todoist_tasks(client: Optional[TodoistClient] = None) -> Tuple[int, int]:
     """
     Ingest tasks from Todoist and store them in the database.
     
+    Args:
+        client: Todoist client to use, such as one kept by the scheduler.
+            If None, uses the shared client from get_client.
+        
     Returns:
         Tuple of (total tasks found, tasks stored/updated)
     """
-    # Create Todoist client
-    todoist_client = TodoistClient()
-    
     try:
-        # Fetch tasks from Todoist
-        todoist_tasks = todoist_client.fetch_tasks()
+        todoist_client = client or get_client()
         
-        # Process and store tasks
-        processed_count = 0
-        for todoist_task in todoist_tasks:
-            try:
-                # Convert Todoist due date to datetime
-                deadline = parse_todoist_due_date(todoist_task.due)
-                
-                # Check if the task already exists in our database
-                existing_task = None
-                if todoist_task.id:
-                    existing_tasks = [t for t in get_task(None) if hasattr(t, 'todoist_id') and t.todoist_id == todoist_task.id]
-                    if existing_tasks:
-                        existing_task = existing_tasks[0]
-                
-                if existing_task:
-                    # Update existing task
-                    update_task(
-                        task_id=existing_task.id,
-                        title=todoist_task.content,
-                        priority=float(todoist_task.priority) if hasattr(todoist_task, 'priority') else 5.0,
-                        deadline=deadline,
-                        completed=bool(todoist_task.is_completed) if hasattr(todoist_task, 'is_completed') else False
-                    )
-                else:
-                    # Create new task
-                    create_task(
-                        title=todoist_task.content,
-                        description=None,  # Todoist API doesn't provide a separate description field
-                        parent_id=None if not todoist_task.parent_id else todoist_task.parent_id,
-                        priority=float(todoist_task.priority) if hasattr(todoist_task, 'priority') else 5.0,
-                        deadline=deadline,
-                        todoist_id=todoist_task.id
-                    )
-                
-                processed_count += 1
-            except Exception as e:
-                logger.error(f"Error processing Todoist task {todoist_task.content}: {str(e)}")
-                continue
+        # Fetch tasks changed since the last run (everything on the first run)
+        sync_token = get_sync_token(ITEMS_SYNC_RESOURCE) or "*"
+        todoist_tasks, next_sync_token = todoist_client.fetch_tasks_sync(sync_token)
+        
+        # Precompute each field once for the whole batch
+        todoist_ids = [todoist_task.id for todoist_task in todoist_tasks]
+        contents = [todoist_task.content for todoist_task in todoist_tasks]
+        parent_todoist_ids = [todoist_task.parent_id or None for todoist_task in todoist_tasks]
+        deadlines = [parse_todoist_due_date(todoist_task.due) for todoist_task in todoist_tasks]
+        priorities = [float(todoist_task.priority) for todoist_task in todoist_tasks]
+        completed_flags = [bool(todoist_task.is_completed) for todoist_task in todoist_tasks]
         
-        logger.info(f"Processed {processed_count} out of {len(todoist_tasks)} Todoist tasks")
+        # Look up all tasks we already know about in a single query
+        existing_by_todoist_id = get_tasks_by_todoist_ids([tid for tid in todoist_ids if tid])
+        
+        # Split tasks into rows to update and rows to insert. New subtasks
+        # whose parent is also new get their parent once both are stored.
+        to_update = []
+        to_insert = []
+        pending_parents = []
+        for todoist_id, content, parent_todoist_id, deadline, priority, completed in zip(
+            todoist_ids, contents, parent_todoist_ids, deadlines, priorities, completed_flags
+        ):
+            existing_task = existing_by_todoist_id.get(todoist_id)
+            
+            if existing_task:
+                row = {
+                    "id": existing_task.id,
+                    "title": content,
+                    "priority": priority,
+                    "completed": completed
+                }
+                if deadline is not None:
+                    row["deadline"] = deadline
+                to_update.append(row)
+            else:
+                # parent_id refers to the local task, not the Todoist one
+                parent_task = existing_by_todoist_id.get(parent_todoist_id) if parent_todoist_id else None
+                if parent_todoist_id and parent_task is None:
+                    pending_parents.append((todoist_id, parent_todoist_id))
+                to_insert.append({
+                    "title": content,
+                    "description": None,  # Todoist API doesn't provide a separate description field
+                    "parent_id": parent_task.id if parent_task else None,
+                    "priority": priority,
+                    "deadline": deadline,
+                    "todoist_id": todoist_id
+                })
+        
+        # Write each group in a single transaction
+        processed_count = bulk_update_tasks(to_update) + bulk_create_tasks(to_insert)
+        all_written = processed_count == len(to_update) + len(to_insert)
+        
+        # Link new subtasks to parents created in this batch; parents that
+        # are still unknown are left unset
+        if pending_parents:
+            stored = get_tasks_by_todoist_ids(
+                list({todoist_id for pair in pending_parents for todoist_id in pair})
+            )
+            parent_links = [
+                {"id": stored[todoist_id].id, "parent_id": stored[parent_todoist_id].id}
+                for todoist_id, parent_todoist_id in pending_parents
+                if todoist_id in stored and parent_todoist_id in stored
+            ]
+            if parent_links:
+                all_written = bulk_update_tasks(parent_links) == len(parent_links) and all_written
+        
+        # Only advance the token once the changes are stored. The Sync API
+        # won't send changes from before the token again, so after a failed
+        # row the same changes are fetched again next run.
+        if not all_written:
+            logger.warning("Some Todoist tasks were not stored, keeping the previous sync token")
+        elif next_sync_token != sync_token:
+            set_sync_token(ITEMS_SYNC_RESOURCE, next_sync_token)
+        
+        logger.info("Processed %s out of %s Todoist tasks", processed_count, len(todoist_tasks))
         return len(todoist_tasks), processed_count
         
     except Exception as e:
-        logger.error(f"Error in Todoist ingestion process: {str(e)}")
+        logger.error("Error in Todoist ingestion process: %s", e)
         return 0, 0
 
 
@@ -237,23 +512,24 @@ def sync_task_to_todoist(task_id: int) -> bool:
     Returns:
         True if sync was successful, False otherwise
     """
-    # Create Todoist client
-    todoist_client = TodoistClient()
+    todoist_client = get_client()
     
     try:
-        # Fetch the task from the database
-        task = get_task(task_id)
+        # Fetch the task from the database, with its parent for the Todoist parent ID
+        task = get_task(task_id, eager=True)
         if not task:
-            logger.error(f"Task with ID {task_id} not found")
+            logger.error("Task with ID %s not found", task_id)
             return False
         
+        due_date = task.deadline.strftime("%Y-%m-%d") if task.deadline else None
+        
         # Check if the task already has a Todoist ID
         if task.todoist_id:
             # Update existing Todoist task
             update_args = {"content": task.title}
             
-            if task.deadline:
-                update_args["due_date"] = task.deadline.strftime("%Y-%m-%d")
+            if due_date:
+                update_args["due_date"] = due_date
                 
             if task.completed:
                 # If the task is completed, complete it in Todoist
@@ -263,17 +539,25 @@ def sync_task_to_todoist(task_id: int) -> bool:
                 success = todoist_client.update_todoist_task(task.todoist_id, **update_args)
             
             if success:
-                logger.info(f"Updated task {task.title} in Todoist")
+                logger.info("Updated task %s in Todoist", task.title)
                 return True
             else:
-                logger.error(f"Failed to update task {task.title} in Todoist")
+                logger.error("Failed to update task %s in Todoist", task.title)
                 return False
         else:
+            # Save the idempotency key before creating the task, so a sync that
+            # dies mid-request retries with the same key instead of duplicating
+            request_id = task.todoist_request_id
+            if not request_id:
+                request_id = uuid.uuid4().hex
+                update_task(task_id=task.id, todoist_request_id=request_id)
+            
             # Create new Todoist task
             todoist_task = todoist_client.create_todoist_task(
                 content=task.title,
-                due_string=task.deadline.strftime("%Y-%m-%d") if task.deadline else None,
-                parent_id=task.parent.todoist_id if task.parent and hasattr(task.parent, 'todoist_id') else None
+                due_string=due_date,
+                parent_id=task.parent.todoist_id if task.parent else None,
+                request_id=request_id
             )
             
             if todoist_task:
@@ -282,17 +566,42 @@ def sync_task_to_todoist(task_id: int) -> bool:
                     task_id=task.id,
                     todoist_id=todoist_task.id
                 )
-                logger.info(f"Created task {task.title} in Todoist")
+                logger.info("Created task %s in Todoist", task.title)
                 return True
             else:
-                logger.error(f"Failed to create task {task.title} in Todoist")
+                logger.error("Failed to create task %s in Todoist", task.title)
                 return False
             
     except Exception as e:
-        logger.error(f"Error syncing task {task_id} to Todoist: {str(e)}")
+        logger.error("Error syncing task %s to Todoist: %s", task_id, e)
         return False
 
 
+async def sync_tasks_to_todoist(task_ids: List[int], max_concurrency: int = 15) -> Dict[int, bool]:
+    """
+    Sync several local tasks to Todoist concurrently.
+    
+    Each task is synced with sync_task_to_todoist in a worker thread, all
+    sharing the pooled client from get_client. A semaphore caps the number
+    of requests in flight so large batches don't trip Todoist's rate limit.
+    
+    Args:
+        task_ids: IDs of the local tasks to sync
+        max_concurrency: Maximum number of tasks synced at the same time
+        
+    Returns:
+        Dictionary mapping each task ID to whether its sync succeeded
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def sync_one(task_id: int) -> bool:
+        async with semaphore:
+            return await asyncio.to_thread(sync_task_to_todoist, task_id)
+    
+    results = await asyncio.gather(*(sync_one(task_id) for task_id in task_ids))
+    return dict(zip(task_ids, results))
+
+
 if __name__ == "__main__":
     # Configure logging for standalone use
     logging.basicConfig(
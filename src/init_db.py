@@ -6,6 +6,7 @@ This script will create all database tables and optionally seed the database wit
 sample data for development and testing purposes.
 """
 import os
+import csv
 import sys
 import logging
 import argparse
@@ -16,8 +17,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the database module
 from src.db import (
-    create_tables, create_context_document, create_goal, create_task,
-    create_status_overview
+    Base, SessionLocal, engine, create_tables, ContextDocument, Goal, Task, StatusOverview
 )
 
 # Configure logging
@@ -27,6 +27,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# CSV fixtures named <table>.csv in this directory replace the built-in sample data
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
 def init_db(seed=False):
     """Initialize the database and optionally seed it with sample data."""
     # Create tables
@@ -40,11 +43,69 @@ def init_db(seed=False):
     if seed:
         seed_db()
 
+def seed_from_csv(table, csv_path):
+    """
+    Bulk load a CSV file into a table with PostgreSQL's COPY.
+    
+    The first line of the file must name the columns. Rows are streamed to
+    the server in one COPY, which is far faster than ORM inserts for large
+    fixtures. If the file sets explicit IDs, the table's ID sequence is moved
+    past them so later inserts don't collide.
+    
+    Returns the number of rows loaded.
+    """
+    if table not in Base.metadata.tables:
+        raise ValueError(f"Unknown table: {table}")
+    
+    with open(csv_path, newline="") as f:
+        columns = next(csv.reader(f))
+        unknown = set(columns) - set(Base.metadata.tables[table].columns.keys())
+        if unknown:
+            raise ValueError(f"Unknown columns for {table}: {', '.join(sorted(unknown))}")
+        
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        conn = engine.raw_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.copy_expert(f'COPY "{table}" ({column_list}) FROM STDIN WITH (FORMAT csv)', f)
+            row_count = cursor.rowcount
+            if "id" in columns:
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f'COALESCE(MAX(id), 1)) FROM "{table}"'
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    logger.info(f"Loaded {row_count} rows into {table} from {csv_path}")
+    return row_count
+
+def seed_from_fixtures(fixtures_dir=FIXTURES_DIR):
+    """Load every <table>.csv in the fixtures directory, parents before children."""
+    for table in Base.metadata.sorted_tables:
+        csv_path = os.path.join(fixtures_dir, f"{table.name}.csv")
+        if os.path.exists(csv_path):
+            seed_from_csv(table.name, csv_path)
+
 def seed_db():
     """Seed the database with sample data for development."""
+    if os.path.isdir(FIXTURES_DIR) and engine.dialect.name == "postgresql":
+        try:
+            seed_from_fixtures()
+            logger.info("Database seeded successfully from fixtures")
+        except Exception as e:
+            logger.error(f"Error seeding database from fixtures: {str(e)}")
+            sys.exit(1)
+        return
+    
+    db = SessionLocal()
     try:
         # Create a sample biography context document
-        bio_doc = create_context_document(
+        bio_doc = ContextDocument(
             title="User Biography",
             content=(
                 "Name: John Doe\n"
@@ -56,48 +117,43 @@ def seed_db():
             ),
             document_type="biography"
         )
-        logger.info(f"Created biography document with ID: {bio_doc.id}")
         
         # Create a sample high-level goal
-        career_goal = create_goal(
+        career_goal = Goal(
             title="Career Advancement",
             description="Advance career in software engineering with a focus on machine learning",
             goal_type="high_level",
             importance=9.0
         )
-        logger.info(f"Created high-level goal with ID: {career_goal.id}")
         
         # Create a project-level goal as a child of the career goal
-        ml_project_goal = create_goal(
+        ml_project_goal = Goal(
             title="Complete ML Certification",
             description="Complete a machine learning certification program within the next 6 months",
             goal_type="project_level",
             importance=8.5,
-            parent_id=career_goal.id
+            parent=career_goal
         )
-        logger.info(f"Created project-level goal with ID: {ml_project_goal.id}")
         
         # Create a task for the ML project goal
-        study_task = create_task(
+        study_task = Task(
             title="Study for ML certification exam",
             description="Review course materials and practice exercises",
-            goal_id=ml_project_goal.id,
+            goal=ml_project_goal,
             priority=8.0
         )
-        logger.info(f"Created task with ID: {study_task.id}")
         
         # Create a subtask for the study task
-        subtask = create_task(
+        subtask = Task(
             title="Complete practice quiz",
             description="Complete the practice quiz for the first module",
-            parent_id=study_task.id,
+            parent=study_task,
             priority=7.5
         )
-        logger.info(f"Created subtask with ID: {subtask.id}")
         
         # Create a status overview for the ML project goal
-        overview = create_status_overview(
-            goal_id=ml_project_goal.id,
+        overview = StatusOverview(
+            goal=ml_project_goal,
             overview=(
                 "The ML Certification project is on track. The user has completed "
                 "40% of the course material and is consistently making progress. "
@@ -108,12 +164,27 @@ def seed_db():
                 "study hours during the weekend to compensate for busy weekdays."
             )
         )
+        
+        # Insert everything in one transaction; the relationships above let
+        # SQLAlchemy order the inserts and fill in the foreign keys
+        db.add_all([bio_doc, career_goal, ml_project_goal, study_task, subtask, overview])
+        db.flush()
+        
+        logger.info(f"Created biography document with ID: {bio_doc.id}")
+        logger.info(f"Created high-level goal with ID: {career_goal.id}")
+        logger.info(f"Created project-level goal with ID: {ml_project_goal.id}")
+        logger.info(f"Created task with ID: {study_task.id}")
+        logger.info(f"Created subtask with ID: {subtask.id}")
         logger.info(f"Created status overview with ID: {overview.id}")
         
+        db.commit()
         logger.info("Database seeded successfully with sample data")
     except Exception as e:
+        db.rollback()
         logger.error(f"Error seeding database: {str(e)}")
         sys.exit(1)
+    finally:
+        db.close()
 
 if __name__ == "__main__":
     # Load environment variables
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+"""
+LLM Response Cache Module for KairosLMS
+
+This module caches LLM responses so that repeated prompts, which are common
+when goals and tasks change little between scheduler runs, are answered
+without calling the API again. Prompts are matched exactly or, in semantic
+mode, by embedding similarity.
+"""
+
+import os
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional, Literal
+
+logger = logging.getLogger(__name__)
+
+# Cache lookup modes: no caching, exact prompt matches, or exact plus similar prompts
+CacheMode = Literal["off", "exact", "semantic"]
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite")
+LLM_CACHE_EMBEDDING_MODEL = os.getenv("LLM_CACHE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+# Seconds a cached response stays valid; 0 keeps responses until cleared
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "21600"))
+
+# Minimum cosine similarity for a semantic cache hit
+DEFAULT_SIMILARITY_THRESHOLD = 0.97
+
+
+class SemanticLLMCache:
+    """SQLite-backed cache of LLM responses with optional semantic matching."""
+
+    def __init__(self,
+                 path: str = LLM_CACHE_PATH,
+                 similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                 embedding_model: str = LLM_CACHE_EMBEDDING_MODEL,
+                 ttl: float = LLM_CACHE_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file, or ":memory:" for a process-local cache
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            embedding_model: sentence-transformers model used for semantic mode
+            ttl: Seconds a response stays valid, or 0 to keep responses until cleared
+        """
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model = embedding_model
+        self.ttl = ttl
+        self._encoder = None
+        self._encoder_loaded = False
+        self._lock = threading.Lock()
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                embedding TEXT,
+                response TEXT NOT NULL,
+                usage TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_scope ON llm_cache (scope)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_created_at ON llm_cache (created_at)")
+        self._conn.commit()
+
+    def get(self,
+            prompt: str,
+            system_prompt: str,
+            model: str,
+            temperature: float,
+            mode: CacheMode = "exact",
+            context: Optional[str] = None,
+            embed_text: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a cached response for a prompt.
+
+        Args:
+            prompt: The user prompt
+            system_prompt: The system prompt the response was generated with
+            model: The model name
+            temperature: The sampling temperature
+            mode: "exact" for exact matches only, "semantic" to also accept
+                similar prompts, "off" to skip the lookup
+            context: Optional text that must match exactly for any hit, such
+                as a goal id; semantic matches are only made within it
+            embed_text: Part of the prompt compared in semantic mode. If None,
+                the whole prompt is embedded.
+
+        Returns:
+            Optional[str]: The cached response text, or None on a miss or if
+            the cached response has expired
+        """
+        if mode == "off":
+            return None
+
+        scope = self._scope(system_prompt, model, temperature, context)
+        key = self._key(scope, prompt)
+        # Responses stored before this time have expired
+        cutoff = time.time() - self.ttl if self.ttl else 0.0
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ? AND created_at >= ?", (key, cutoff)
+            ).fetchone()
+        if row:
+            logger.info("LLM cache hit (exact)")
+            return row[0]
+
+        if mode != "semantic":
+            return None
+
+        embedding = self._embed(embed_text or prompt)
+        if embedding is None:
+            return None
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT embedding, response FROM llm_cache "
+                "WHERE scope = ? AND embedding IS NOT NULL AND created_at >= ?",
+                (scope, cutoff)
+            ).fetchall()
+
+        best_score, best_response = 0.0, None
+        for stored_embedding, response in rows:
+            score = self._dot(embedding, json.loads(stored_embedding))
+            if score > best_score:
+                best_score, best_response = score, response
+
+        if best_score >= self.similarity_threshold:
+            logger.info(f"LLM cache hit (semantic, similarity={best_score:.3f})")
+            return best_response
+        return None
+
+    def put(self,
+            prompt: str,
+            system_prompt: str,
+            model: str,
+            temperature: float,
+            response: str,
+            usage: Optional[Dict[str, int]] = None,
+            mode: CacheMode = "exact",
+            context: Optional[str] = None,
+            embed_text: Optional[str] = None) -> None:
+        """
+        Store a response in the cache, removing any responses that have expired.
+
+        Args:
+            prompt: The user prompt
+            system_prompt: The system prompt the response was generated with
+            model: The model name
+            temperature: The sampling temperature
+            response: The response text to cache
+            usage: Token usage of the original request
+            mode: Cache mode; in "semantic" mode the prompt embedding is stored too
+            context: Optional text that must match exactly for any hit
+            embed_text: Part of the prompt to embed in semantic mode. If None,
+                the whole prompt is embedded.
+        """
+        if mode == "off":
+            return
+
+        scope = self._scope(system_prompt, model, temperature, context)
+        embedding = self._embed(embed_text or prompt) if mode == "semantic" else None
+
+        now = time.time()
+        try:
+            with self._lock:
+                # Expired responses are never returned, so drop them rather
+                # than letting the file grow
+                if self.ttl:
+                    self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache "
+                    "(key, scope, prompt, embedding, response, usage, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self._key(scope, prompt),
+                        scope,
+                        prompt,
+                        json.dumps(embedding) if embedding is not None else None,
+                        response,
+                        json.dumps(usage) if usage else None,
+                        now
+                    )
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to store LLM response in cache: {str(e)}")
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def _scope(self, system_prompt: str, model: str, temperature: float, context: Optional[str] = None) -> str:
+        """
+        Hash the request settings that must match for a cached response to apply.
+
+        Returns:
+            str: Scope hash shared by all prompts sent with these settings
+        """
+        scope = [system_prompt, model, round(temperature, 2)]
+        if context:
+            scope.append(context)
+        data = json.dumps(scope)
+        return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _key(self, scope: str, prompt: str) -> str:
+        """
+        Hash a prompt within a scope, ignoring differences in whitespace.
+
+        Returns:
+            str: Exact-match cache key
+        """
+        normalized = " ".join(prompt.split())
+        return hashlib.blake2b(f"{scope}:{normalized}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        """
+        Embed a prompt as a unit vector for semantic matching.
+
+        Returns:
+            Optional[List[float]]: Normalized embedding, or None if
+            sentence-transformers is not installed
+        """
+        if not self._encoder_loaded:
+            self._encoder_loaded = True
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._encoder = SentenceTransformer(self.embedding_model)
+            except ImportError:
+                logger.warning("sentence-transformers is not installed; semantic LLM caching falls back to exact matches")
+
+        if self._encoder is None:
+            return None
+
+        vector = [float(x) for x in self._encoder.encode(text)]
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    @staticmethod
+    def _dot(a: List[float], b: List[float]) -> float:
+        """Cosine similarity of two unit vectors."""
+        return sum(x * y for x, y in zip(a, b))
@@ -7,14 +7,31 @@ reasoning capabilities for goal achievement, status overviews, and task prioriti
 """
 
 import os
+import re
+import atexit
+import asyncio
+import hashlib
 import logging
 import time
-from typing import Dict, List, Any, Optional, Union, Tuple
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable, Dict, List, Any, Optional, Union, Tuple
 import json
 
 import anthropic
+import httpx
+import jinja2
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from src.llm_cache import CacheMode, SemanticLLMCache
+from src.utils.rate_limit import AsyncTokenBucket
+
 logger = logging.getLogger(__name__)
 
 # Default system prompt template for reasoning tasks
@@ -32,143 +49,995 @@ You should:
 Provide your reasoning and insights in a structured, clear format.
 """
 
+# Static instructions for each analysis. They are sent as a separate block
+# ahead of the goal/task data and marked for prompt caching, so repeated
+# calls reuse them from Anthropic's cache instead of re-processing them.
+GOAL_ANALYSIS_INSTRUCTIONS = """
+Please analyze the goal described below and provide insights to help achieve it effectively.
+
+## REQUESTED ANALYSIS
+1. Provide an assessment of the current state of this goal (250 words)
+2. Break down the goal into 3-5 concrete next steps or subtasks
+3. Identify any potential obstacles and how to overcome them
+4. Suggest what success would look like for this goal
+5. Assess how this goal connects to other aspects of life/work
+
+Keep it concise and actionable, and record your analysis with the emit_goal_analysis tool.
+"""
+
+TASK_PRIORITIZATION_INSTRUCTIONS = """
+Please prioritize the tasks listed below based on their importance, urgency, and impact on wellbeing.
+Consider the goals they relate to, deadlines, and overall context.
+
+## INSTRUCTIONS
+For each task, please:
+1. Assign a priority score (1-10)
+2. Provide brief reasoning (max 50 words per task)
+3. Consider the following weights:
+   - Parent goal importance: 40%
+   - Deadline urgency: 30%
+   - Wellbeing impact: 30%
+
+Format your response as a numbered list that matches the input task order.
+For each task include: Priority score (1-10), brief reasoning, and any suggested modifications.
+"""
+
+OBSTACLE_IDENTIFICATION_INSTRUCTIONS = """
+Please analyze the goal described below and identify potential obstacles that might prevent its successful completion.
+Also suggest specific remedial tasks to overcome each obstacle.
+
+## REQUESTED ANALYSIS
+1. Identify 3-5 potential obstacles that might prevent achieving this goal
+2. For each obstacle, suggest 1-2 specific remedial tasks that could help overcome it
+3. Categorize each obstacle by severity (High, Medium, Low)
+
+Record the obstacles, their severity and their remedial tasks with the emit_obstacles tool.
+"""
+
+# Tools the model is asked to call with its analysis, so the response arrives
+# as JSON matching the schema instead of prose that has to be parsed
+GOAL_ANALYSIS_TOOL = {
+    "name": "emit_goal_analysis",
+    "description": "Record the structured analysis of a goal.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string", "description": "Assessment of the current state of the goal"},
+            "next_steps": {"type": "array", "items": {"type": "string"}, "description": "Concrete next steps or subtasks"},
+            "obstacles": {"type": "array", "items": {"type": "string"}, "description": "Potential obstacles and how to overcome them"},
+            "success_criteria": {"type": "string", "description": "What success would look like"},
+            "connections": {"type": "string", "description": "How the goal connects to other aspects of life/work"}
+        },
+        "required": ["summary", "next_steps", "obstacles", "success_criteria", "connections"]
+    }
+}
+
+OBSTACLE_IDENTIFICATION_TOOL = {
+    "name": "emit_obstacles",
+    "description": "Record the obstacles identified for a goal and the remedial tasks for each.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "obstacles": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string"},
+                        "severity": {"type": "string", "enum": ["High", "Medium", "Low"]},
+                        "remedial_tasks": {"type": "array", "items": {"type": "string"}}
+                    },
+                    "required": ["title", "severity", "remedial_tasks"]
+                }
+            }
+        },
+        "required": ["obstacles"]
+    }
+}
+
+# Priority (1-10) of remedial tasks by the severity of their obstacle
+REMEDIAL_TASK_PRIORITY = {"High": 7, "Medium": 5, "Low": 3}
+
+# Marks a content block as the end of a cacheable prompt prefix
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# A numbered task block in a prioritization response: the "N." line and any
+# following lines up to the next numbered line
+TASK_BLOCK_RE = re.compile(r"^[ \t]*(\d+)\.[ \t]*([^\n]*)((?:\n(?![ \t]*\d+\.)[^\n]*)*)", re.M)
+# "Priority: 8" / "Score: 8/10", or failing that any number that could be a score
+TASK_SCORE_LABEL_RE = re.compile(r"(?:priority|score)\s*:\s*(\d{1,2})\b", re.I)
+TASK_SCORE_NUMBER_RE = re.compile(r"\b(\d{1,2})(?:/10)?\b")
+
+# Keywords marking a section of a prose obstacle response as an obstacle, and
+# the severity keywords looked for within it
+OBSTACLE_SECTION_RE = re.compile(r"obstacle|barrier|challenge", re.I)
+OBSTACLE_SEVERITY_RE = re.compile(r"high|medium|low", re.I)
+
+
+@dataclass(frozen=True, slots=True)
+class GoalView:
+    """Fields of a goal dictionary read by the prompt templates.
+    
+    Built once per goal so templates use attribute access instead of
+    repeated dict lookups. Missing fields are None.
+    """
+    title: Optional[str]
+    description: Optional[str]
+    goal_type: Optional[str]
+    importance: Any
+    
+    @classmethod
+    def of(cls, goal: Dict[str, Any]) -> "GoalView":
+        return cls(goal.get("title"), goal.get("description"), goal.get("goal_type"), goal.get("importance"))
+
+
+@dataclass(frozen=True, slots=True)
+class TaskView:
+    """Fields of a task dictionary read by the prompt templates.
+    
+    Built once per task so templates use attribute access instead of
+    repeated dict lookups. Missing fields are None.
+    """
+    title: Optional[str]
+    deadline: Any
+    completed: bool
+    goal_id: Any
+    
+    @classmethod
+    def of(cls, task: Dict[str, Any]) -> "TaskView":
+        return cls(task.get("title"), task.get("deadline"), bool(task.get("completed")), task.get("goal_id"))
+
+
+def _task_views(tasks: List[Dict[str, Any]]) -> List[TaskView]:
+    """Build TaskViews in task ID order, so the same tasks always render the same prompt."""
+    return [TaskView.of(task) for task in sorted(tasks, key=lambda task: str(task.get("id", "")))]
+
+
+# Templates for the goal/task data in each prompt, compiled once at import
+_TEMPLATE_ENV = jinja2.Environment(
+    autoescape=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True
+)
+# Substitute a default for fields missing from a GoalView/TaskView
+_TEMPLATE_ENV.filters["fallback"] = lambda value, default: default if value is None else value
+
+GOAL_ANALYSIS_TEMPLATE = _TEMPLATE_ENV.from_string("""
+## GOAL DETAILS
+Title: {{ goal.title | fallback('Untitled') }}
+Description: {{ goal.description | fallback('No description provided') }}
+Type: {{ goal.goal_type | fallback('Unknown') }}
+Importance (0-10): {{ goal.importance | fallback('Not specified') }}
+
+## RELATED TASKS
+{% for task in tasks %}
+{{ loop.index }}. {{ '✓' if task.completed else '☐' }} {{ task.title | fallback('Untitled task') }} - {{ 'Due: %s' % task.deadline if task.deadline else 'No deadline' }}
+{% else %}
+No related tasks found.
+{% endfor %}
+""")
+
+# Context shared by every goal in a run, sent as its own cached block ahead
+# of the goal details so its prefix is identical across goals
+GOAL_BACKGROUND_TEMPLATE = _TEMPLATE_ENV.from_string("""
+## RELEVANT CONTEXT
+Biography excerpts: {{ context.get('biography', 'No biography provided') }}
+Recent calendar: {{ context.get('calendar_events', []) | length }} upcoming events
+Recent emails: {{ context.get('emails', []) | length }} relevant emails
+""")
+
+TASK_PRIORITIZATION_TEMPLATE = _TEMPLATE_ENV.from_string("""
+## TASKS TO PRIORITIZE
+{% for task in tasks %}
+{{ loop.index }}. {{ task.title | fallback('Untitled task') }} - {{ 'Due: %s' % task.deadline if task.deadline else 'No deadline' }} - Goal: {{ task.goal_id | fallback('No goal') }}
+{% endfor %}
+
+## RELATED GOALS
+{% for goal in goals %}
+- {{ goal.title | fallback('Untitled') }} (Importance: {{ goal.importance | fallback('N/A') }}): {{ (goal.description | fallback('No description'))[:100] }}...
+{% endfor %}
+
+## CONTEXT INFORMATION
+Calendar: {{ context.get('calendar_events', []) | length }} upcoming events in the next 7 days
+Wellbeing priorities: {{ context.get('wellbeing_priorities', 'No specific wellbeing priorities mentioned') }}
+""")
+
+OBSTACLE_IDENTIFICATION_TEMPLATE = _TEMPLATE_ENV.from_string("""
+## GOAL DETAILS
+Title: {{ goal.title | fallback('Untitled') }}
+Description: {{ goal.description | fallback('No description provided') }}
+Type: {{ goal.goal_type | fallback('Unknown') }}
+Importance (0-10): {{ goal.importance | fallback('Not specified') }}
+
+## CURRENT PROGRESS
+{% if tasks %}
+{% set completed = tasks | selectattr('completed') | list | length %}
+Progress: {{ completed }}/{{ tasks | length }} tasks completed ({{ '%.1f' % (completed / (tasks | length) * 100) }}%)
+
+Tasks:
+{% for task in tasks %}
+{{ loop.index }}. {{ '✓' if task.completed else '☐' }} {{ task.title | fallback('Untitled task') }} - {{ 'Due: %s' % task.deadline if task.deadline else 'No deadline' }}
+{% endfor %}
+{% else %}
+No tasks created yet for this goal.
+{% endif %}
+
+## RELEVANT CONTEXT
+Time constraints: {{ context.get('time_constraints', 'No specific time constraints mentioned') }}
+Resources available: {{ context.get('resources', 'No specific resources mentioned') }}
+Past obstacles: {{ context.get('past_obstacles', 'No past obstacles recorded') }}
+""")
+
+# Retry policy for LLM queries; tenacity wraps coroutines as well as plain functions
+LLM_RETRY = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=30),
+    retry=retry_if_exception_type((anthropic.APIError, anthropic.APITimeoutError, anthropic.RateLimitError)),
+    reraise=True
+)
+
+
+@lru_cache(maxsize=1)
+def _shared_http_client() -> httpx.Client:
+    """
+    Get the HTTP client shared by all sync Anthropic clients.
+    
+    Every LLMIntegration reuses the same connection pool, so only the first
+    request in the process pays for the TCP and TLS handshakes. HTTP/2 is
+    used when the h2 package is installed.
+    
+    Returns:
+        httpx.Client: Pooled HTTP client, closed at interpreter exit
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    
+    client = anthropic.DefaultHttpxClient(
+        http2=http2,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        timeout=httpx.Timeout(60.0, connect=5.0)
+    )
+    atexit.register(client.close)
+    return client
+
+
+def _async_http_client() -> Optional[Any]:
+    """
+    Get an aiohttp transport for the async Anthropic client.
+    
+    Returns:
+        The aiohttp-backed client if ``anthropic[aiohttp]`` is installed,
+        otherwise None so the SDK uses its default httpx transport
+    """
+    try:
+        return anthropic.DefaultAioHttpClient()
+    except (AttributeError, RuntimeError):
+        return None
+
+
+# Number of recent interactions kept in memory for export
+LLM_LOG_RING = int(os.getenv("LLM_LOG_RING", "10000"))
+
+# Limits for concurrent async queries; 0 disables the per-minute limits
+MAX_CONCURRENCY = int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "8"))
+TOKENS_PER_MINUTE = int(os.getenv("ANTHROPIC_TOKENS_PER_MINUTE", "0"))
+REQUESTS_PER_MINUTE = int(os.getenv("ANTHROPIC_REQUESTS_PER_MINUTE", "0"))
+
+
+def _join_prompt(instructions: Optional[str], background: Optional[str], prompt: str) -> str:
+    """
+    Join the parts of a request into the prompt used for logging and caching.
+    
+    Returns:
+        str: The non-empty parts, one after another
+    """
+    return "\n".join(part for part in (instructions, background, prompt) if part)
+
+
+def _summarize_text(text: str, n: int = 200) -> Dict[str, Any]:
+    """
+    Summarize a prompt for the interaction log without keeping all of it.
+    
+    Args:
+        text: Text to summarize
+        n: Number of characters to keep from each end
+        
+    Returns:
+        Dict[str, Any]: Hash, length, and the first and last n characters
+    """
+    return {
+        "sha": hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest(),
+        "len": len(text),
+        "head": text[:n],
+        "tail": text[-n:] if len(text) > n else ""
+    }
+
+
 class LLMIntegration:
     """Class to handle integration with deepseek R1 LLM via Anthropic's API."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "claude-3-opus-20240229"):
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 model: str = "claude-3-opus-20240229",
+                 cache_mode: Optional[CacheMode] = None,
+                 log_full_prompts: bool = False):
         """
         Initialize the LLM integration.
         
         Args:
             api_key: Anthropic API key. If None, uses the ANTHROPIC_API_KEY environment variable.
             model: Model name to use. Defaults to claude-3-opus, which is the most powerful model.
+            cache_mode: Response cache mode ("off", "exact" or "semantic"). If None,
+                uses the LLM_CACHE_MODE environment variable, which defaults to "off".
+            log_full_prompts: Keep complete prompts in the interaction logs for
+                debugging. By default only a hash, length and excerpt are kept.
         """
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("Anthropic API key is required either as a parameter or as ANTHROPIC_API_KEY environment variable")
         
         self.model = model
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self._default_system = DEFAULT_SYSTEM_PROMPT
+        self.client = anthropic.Anthropic(api_key=self.api_key, http_client=_shared_http_client())
+        self._async_client = None
+        self._async_client_loop = None
+        self._semaphore = None
+        self._bucket = None
+        # Futures of async queries waiting on the API, keyed by request hash
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        self.cache_mode = cache_mode or os.getenv("LLM_CACHE_MODE", "off")
+        self._cache = None
+        
+        self.log_full_prompts = log_full_prompts
         
-        # Initialize interaction logs
-        self.interaction_logs = []
+        # Initialize interaction logs, keeping only the most recent entries
+        self.interaction_logs = deque(maxlen=LLM_LOG_RING)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=30),
-        retry=retry_if_exception_type((anthropic.APIError, anthropic.APITimeoutError, anthropic.RateLimitError)),
-        reraise=True
-    )
+    @property
+    def async_client(self) -> anthropic.AsyncAnthropic:
+        """
+        Async Anthropic client for the running event loop.
+        
+        The client's connection pool belongs to the loop it was first used
+        on, so a new client is created whenever the loop changes, e.g. on
+        each asyncio.run from a sync wrapper. Sync wrappers close their
+        client before their loop ends; async callers that are done with the
+        instance should await aclose.
+        """
+        self._bind_event_loop()
+        return self._async_client
+    
+    def _bind_event_loop(self) -> None:
+        """Create the async client and rate limiters for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is not None and self._async_client_loop is loop:
+            return
+        
+        # A client left on another loop that is still open can be closed
+        # there; one whose loop has closed has nothing left to close on
+        old_client, old_loop = self._async_client, self._async_client_loop
+        if old_client is not None and old_loop is not None and not old_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(old_client.close(), old_loop)
+        
+        self._async_client = anthropic.AsyncAnthropic(
+            api_key=self.api_key,
+            http_client=_async_http_client()
+        )
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        self._bucket = AsyncTokenBucket(tpm=TOKENS_PER_MINUTE, rpm=REQUESTS_PER_MINUTE)
+        self._inflight = {}
+        self._async_client_loop = loop
+    
+    async def aclose(self) -> None:
+        """Close the async client bound to the running event loop, if any."""
+        client = self._async_client
+        if client is None or self._async_client_loop is not asyncio.get_running_loop():
+            return
+        
+        self._async_client = None
+        self._async_client_loop = None
+        await client.close()
+    
+    def _run_async(self, coro: Awaitable[Any]) -> Any:
+        """
+        Run a coroutine on a new event loop from synchronous code.
+        
+        The async client created for the loop is closed before the loop
+        ends, so its connections aren't left open when the loop goes away.
+        
+        Args:
+            coro: The coroutine to run
+            
+        Returns:
+            The coroutine's result
+        """
+        async def run():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+        
+        return asyncio.run(run())
+    
+    @LLM_RETRY
     def query_llm(self, 
                  prompt: str, 
                  system_prompt: Optional[str] = None,
                  max_tokens: int = 4000,
                  temperature: float = 0.5,
-                 timeout: int = 60) -> str:
+                 timeout: int = 60,
+                 cache_mode: Optional[CacheMode] = None,
+                 instructions: Optional[str] = None,
+                 tool: Optional[Dict[str, Any]] = None,
+                 background: Optional[str] = None,
+                 cache_scope: Optional[str] = None) -> str:
         """
         Send a prompt to the LLM and get the response.
         
+        Blocks the calling thread until the response arrives. Use
+        aquery_llm from async code so other calls can run meanwhile.
+        
         Args:
             prompt: The user prompt to send to the LLM
             system_prompt: Optional custom system prompt. If None, uses the default.
             max_tokens: Maximum number of tokens to generate in the response
             temperature: Controls randomness in the response (0.0=deterministic, 1.0=creative)
             timeout: Request timeout in seconds
+            cache_mode: Response cache mode for this call. If None, uses the instance's mode.
+            instructions: Optional static instructions sent ahead of the prompt as a
+                separately cached block
+            tool: Optional tool definition the model must call; the tool input
+                is returned as a JSON string
+            background: Optional context shared by many prompts, such as the
+                user's biography, sent after the instructions as a separately
+                cached block
+            cache_scope: Optional key, such as a goal id, that a cached response
+                must have been stored under to be reused
             
         Returns:
             str: The LLM's response text
         """
+        system_prompt = system_prompt or self._default_system
         start_time = time.time()
-        log_entry = {
-            "timestamp": start_time,
-            "prompt": prompt,
-            "system_prompt": system_prompt or DEFAULT_SYSTEM_PROMPT,
-            "model": self.model,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-        }
+        full_prompt = _join_prompt(instructions, background, prompt)
+        log_entry = self._new_log_entry(start_time, full_prompt, system_prompt, max_tokens, temperature)
+        
+        cache_mode = cache_mode or self.cache_mode
+        cache_context = self._cache_context(instructions, background, cache_scope)
+        cached = self._cache_lookup(
+            log_entry, start_time, full_prompt, system_prompt, temperature, cache_mode, prompt, cache_context
+        )
+        if cached is not None:
+            return cached
         
         try:
             # Send the request to the LLM
             response = self.client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                system=system_prompt or DEFAULT_SYSTEM_PROMPT,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                timeout=timeout
+                **self._message_args(prompt, system_prompt, max_tokens, temperature, timeout, instructions, tool, background)
             )
-            
-            # Extract the response text
-            response_text = response.content[0].text
-            
-            # Log the successful interaction
-            elapsed_time = time.time() - start_time
-            log_entry.update({
-                "success": True,
-                "elapsed_time": elapsed_time,
-                "response": response_text[:500] + "..." if len(response_text) > 500 else response_text,
-                "tokens": {
-                    "prompt_tokens": response.usage.input_tokens,
-                    "completion_tokens": response.usage.output_tokens,
-                    "total_tokens": response.usage.input_tokens + response.usage.output_tokens
-                }
-            })
-            self.interaction_logs.append(log_entry)
-            
-            # Log a summary of the interaction
-            logger.info(
-                f"LLM query successful: model={self.model}, "
-                f"prompt_tokens={response.usage.input_tokens}, "
-                f"completion_tokens={response.usage.output_tokens}, "
-                f"time={elapsed_time:.2f}s"
+            response_text = self._record_success(log_entry, start_time, response)
+            self._cache_store(
+                full_prompt, system_prompt, temperature, response_text, response, cache_mode, prompt, cache_context
             )
+            return response_text
+        except Exception as e:
+            self._record_failure(log_entry, start_time, e)
+            raise
+    
+    @LLM_RETRY
+    async def aquery_llm(self, 
+                        prompt: str, 
+                        system_prompt: Optional[str] = None,
+                        max_tokens: int = 4000,
+                        temperature: float = 0.5,
+                        timeout: int = 60,
+                        cache_mode: Optional[CacheMode] = None,
+                        instructions: Optional[str] = None,
+                        tool: Optional[Dict[str, Any]] = None,
+                        background: Optional[str] = None,
+                        cache_scope: Optional[str] = None) -> str:
+        """
+        Send a prompt to the LLM without blocking the event loop.
+        
+        Takes the same arguments as query_llm. While one call waits on the
+        API, the event loop is free to run others, so independent analyses
+        can be awaited concurrently. At most ANTHROPIC_MAX_CONCURRENCY
+        queries are in flight at once, and queries wait for room under the
+        optional per-minute token and request limits instead of running
+        into rate limit errors. A query identical to one already waiting on
+        the API shares that call's result instead of sending another.
+        
+        Args:
+            prompt: The user prompt to send to the LLM
+            system_prompt: Optional custom system prompt. If None, uses the default.
+            max_tokens: Maximum number of tokens to generate in the response
+            temperature: Controls randomness in the response (0.0=deterministic, 1.0=creative)
+            timeout: Request timeout in seconds
+            cache_mode: Response cache mode for this call. If None, uses the instance's mode.
+            instructions: Optional static instructions sent ahead of the prompt as a
+                separately cached block
+            tool: Optional tool definition the model must call; the tool input
+                is returned as a JSON string
+            background: Optional context shared by many prompts, such as the
+                user's biography, sent after the instructions as a separately
+                cached block
+            cache_scope: Optional key, such as a goal id, that a cached response
+                must have been stored under to be reused
             
+        Returns:
+            str: The LLM's response text
+        """
+        system_prompt = system_prompt or self._default_system
+        start_time = time.time()
+        full_prompt = _join_prompt(instructions, background, prompt)
+        log_entry = self._new_log_entry(start_time, full_prompt, system_prompt, max_tokens, temperature)
+        
+        cache_mode = cache_mode or self.cache_mode
+        cache_context = self._cache_context(instructions, background, cache_scope)
+        cached = self._cache_lookup(
+            log_entry, start_time, full_prompt, system_prompt, temperature, cache_mode, prompt, cache_context
+        )
+        if cached is not None:
+            return cached
+        
+        self._bind_event_loop()
+        key = self._inflight_key(full_prompt, system_prompt, max_tokens, temperature, tool)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                # Shielded so a cancelled duplicate doesn't cancel the shared call
+                response_text = await asyncio.shield(inflight)
+            except Exception as e:
+                self._record_failure(log_entry, start_time, e)
+                raise
+            self._record_reused(log_entry, start_time, response_text, "deduplicated")
             return response_text
         
+        inflight = asyncio.get_running_loop().create_future()
+        # Retrieve the exception so it isn't reported as unhandled when no
+        # duplicate was waiting for it
+        inflight.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = inflight
+        
+        # Rough estimate: about four characters per input token, plus the full output budget
+        est_tokens = max_tokens + len(full_prompt) // 4
+        
+        try:
+            async with self._semaphore:
+                await self._bucket.acquire(est_tokens)
+                response = await self._async_client.messages.create(
+                    **self._message_args(prompt, system_prompt, max_tokens, temperature, timeout, instructions, tool, background)
+                )
+            self._bucket.record_usage(
+                est_tokens, response.usage.input_tokens + response.usage.output_tokens
+            )
+            response_text = self._record_success(log_entry, start_time, response)
+            self._cache_store(
+                full_prompt, system_prompt, temperature, response_text, response, cache_mode, prompt, cache_context
+            )
+            inflight.set_result(response_text)
+            return response_text
         except Exception as e:
-            # Log the error
-            elapsed_time = time.time() - start_time
-            log_entry.update({
-                "success": False,
-                "elapsed_time": elapsed_time,
-                "error": str(e)
-            })
-            self.interaction_logs.append(log_entry)
+            self._record_failure(log_entry, start_time, e)
+            inflight.set_exception(e)
+            raise
+        finally:
+            if not inflight.done():
+                inflight.cancel()
+            self._inflight.pop(key, None)
+    
+    async def aquery_llm_stream(self, 
+                               prompt: str, 
+                               system_prompt: Optional[str] = None,
+                               max_tokens: int = 4000,
+                               temperature: float = 0.5,
+                               timeout: int = 60,
+                               cache_mode: Optional[CacheMode] = None,
+                               instructions: Optional[str] = None,
+                               background: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream the LLM's response text as it is generated.
+        
+        Takes the same arguments as aquery_llm and is subject to the same
+        concurrency and rate limits. Callers can start consuming the text
+        before generation finishes. Unlike aquery_llm, failures are not
+        retried, since part of the response may already have been yielded.
+        
+        Args:
+            prompt: The user prompt to send to the LLM
+            system_prompt: Optional custom system prompt. If None, uses the default.
+            max_tokens: Maximum number of tokens to generate in the response
+            temperature: Controls randomness in the response (0.0=deterministic, 1.0=creative)
+            timeout: Request timeout in seconds
+            cache_mode: Response cache mode for this call. If None, uses the instance's mode.
+            instructions: Optional static instructions sent ahead of the prompt as a
+                separately cached block
+            background: Optional context shared by many prompts, sent after the
+                instructions as a separately cached block
             
-            logger.error(f"LLM query failed: {str(e)}")
+        Yields:
+            str: Chunks of the response text
+        """
+        system_prompt = system_prompt or self._default_system
+        start_time = time.time()
+        full_prompt = _join_prompt(instructions, background, prompt)
+        log_entry = self._new_log_entry(start_time, full_prompt, system_prompt, max_tokens, temperature)
+        
+        cache_mode = cache_mode or self.cache_mode
+        cache_context = self._cache_context(instructions, background, None)
+        cached = self._cache_lookup(
+            log_entry, start_time, full_prompt, system_prompt, temperature, cache_mode, prompt, cache_context
+        )
+        if cached is not None:
+            yield cached
+            return
+        
+        self._bind_event_loop()
+        est_tokens = max_tokens + len(full_prompt) // 4
+        
+        try:
+            async with self._semaphore:
+                await self._bucket.acquire(est_tokens)
+                async with self._async_client.messages.stream(
+                    **self._message_args(
+                        prompt, system_prompt, max_tokens, temperature, timeout, instructions, background=background
+                    )
+                ) as stream:
+                    async for text in stream.text_stream:
+                        yield text
+                    response = await stream.get_final_message()
+            self._bucket.record_usage(
+                est_tokens, response.usage.input_tokens + response.usage.output_tokens
+            )
+            response_text = self._record_success(log_entry, start_time, response)
+            self._cache_store(
+                full_prompt, system_prompt, temperature, response_text, response, cache_mode, prompt, cache_context
+            )
+        except Exception as e:
+            self._record_failure(log_entry, start_time, e)
             raise
     
+    def _get_cache(self) -> SemanticLLMCache:
+        """Open the response cache on first use."""
+        if self._cache is None:
+            self._cache = SemanticLLMCache()
+        return self._cache
+    
+    def _cache_lookup(self,
+                      log_entry: Dict[str, Any],
+                      start_time: float,
+                      prompt: str,
+                      system_prompt: Optional[str],
+                      temperature: float,
+                      cache_mode: CacheMode,
+                      embed_text: Optional[str] = None,
+                      context: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a cached response, logging the interaction on a hit.
+        
+        In semantic mode only embed_text is compared for similarity, and
+        only against responses stored with the same context.
+        
+        Returns:
+            Optional[str]: The cached response text, or None on a miss
+        """
+        if cache_mode == "off":
+            return None
+        
+        response_text = self._get_cache().get(
+            prompt, system_prompt or self._default_system, self.model, temperature, cache_mode,
+            context=context, embed_text=embed_text
+        )
+        if response_text is None:
+            return None
+        
+        self._record_reused(log_entry, start_time, response_text, "cached")
+        return response_text
+    
+    def _cache_context(self,
+                       instructions: Optional[str],
+                       background: Optional[str],
+                       cache_scope: Optional[str]) -> Optional[str]:
+        """
+        Combine the parts of a request that semantic cache hits must share exactly.
+        
+        The shared instructions and background would otherwise dominate the
+        prompt embedding and make prompts about different subjects look alike.
+        
+        Returns:
+            Optional[str]: Cache context, or None if the request has none
+        """
+        if not (instructions or background or cache_scope):
+            return None
+        return json.dumps([cache_scope, instructions, background])
+    
+    def _inflight_key(self,
+                      prompt: str,
+                      system_prompt: Optional[str],
+                      max_tokens: int,
+                      temperature: float,
+                      tool: Optional[Dict[str, Any]]) -> str:
+        """
+        Hash the parts of a request that determine its response.
+        
+        Returns:
+            str: Key identifying identical in-flight requests
+        """
+        data = json.dumps([
+            self.model,
+            system_prompt or self._default_system,
+            prompt,
+            max_tokens,
+            temperature,
+            tool["name"] if tool else None
+        ])
+        return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _record_reused(self, log_entry: Dict[str, Any], start_time: float, response_text: str, source: str) -> None:
+        """
+        Log an interaction answered without its own API call.
+        
+        Args:
+            log_entry: Log entry started for this query
+            start_time: Time the query was sent
+            response_text: The reused response text
+            source: Log flag naming where the response came from ("cached" or "deduplicated")
+        """
+        log_entry.update({
+            "success": True,
+            source: True,
+            "elapsed_time": time.time() - start_time,
+            "response": response_text[:500] + "..." if len(response_text) > 500 else response_text,
+        })
+        self.interaction_logs.append(log_entry)
+    
+    def _cache_store(self,
+                     prompt: str,
+                     system_prompt: Optional[str],
+                     temperature: float,
+                     response_text: str,
+                     response: Any,
+                     cache_mode: CacheMode,
+                     embed_text: Optional[str] = None,
+                     context: Optional[str] = None) -> None:
+        """Store a fresh response in the cache if caching is enabled."""
+        if cache_mode == "off":
+            return
+        
+        self._get_cache().put(
+            prompt,
+            system_prompt or self._default_system,
+            self.model,
+            temperature,
+            response_text,
+            usage={
+                "input_tokens": response.usage.input_tokens,
+                "output_tokens": response.usage.output_tokens
+            },
+            mode=cache_mode,
+            context=context,
+            embed_text=embed_text
+        )
+    
+    def _message_args(self,
+                      prompt: str,
+                      system_prompt: Optional[str],
+                      max_tokens: int,
+                      temperature: float,
+                      timeout: int,
+                      instructions: Optional[str] = None,
+                      tool: Optional[Dict[str, Any]] = None,
+                      background: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the keyword arguments for a messages.create request.
+        
+        The system prompt, and the static instructions and shared background
+        if given, are each marked with cache_control so Anthropic caches
+        those prefixes and later calls sharing them are billed and processed
+        as cache reads. If a tool is given, the model is required to answer
+        by calling it.
+        
+        Returns:
+            Dict[str, Any]: Request arguments shared by the sync and async clients
+        """
+        blocks = [
+            {"type": "text", "text": text, "cache_control": CACHE_CONTROL}
+            for text in (instructions, background) if text
+        ]
+        content = blocks + [{"type": "text", "text": prompt}] if blocks else prompt
+        
+        args = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "system": [
+                {"type": "text", "text": system_prompt or self._default_system, "cache_control": CACHE_CONTROL}
+            ],
+            "messages": [
+                {"role": "user", "content": content}
+            ],
+            "timeout": timeout
+        }
+        if tool:
+            args["tools"] = [tool]
+            args["tool_choice"] = {"type": "tool", "name": tool["name"]}
+        return args
+    
+    def _new_log_entry(self,
+                       start_time: float,
+                       prompt: str,
+                       system_prompt: Optional[str],
+                       max_tokens: int,
+                       temperature: float) -> Dict[str, Any]:
+        """
+        Start an interaction log entry for a query.
+        
+        Returns:
+            Dict[str, Any]: Log entry describing the request
+        """
+        system_prompt = system_prompt or self._default_system
+        if not self.log_full_prompts:
+            prompt = _summarize_text(prompt)
+            system_prompt = _summarize_text(system_prompt)
+        
+        return {
+            "timestamp": start_time,
+            "prompt": prompt,
+            "system_prompt": system_prompt,
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+    
+    def _record_success(self, log_entry: Dict[str, Any], start_time: float, response: Any) -> str:
+        """
+        Log a successful interaction and extract the response text.
+        
+        Args:
+            log_entry: Log entry started for this query
+            start_time: Time the query was sent
+            response: Message returned by the API
+            
+        Returns:
+            str: The LLM's response text, or the tool input as JSON
+        """
+        # Extract the response text, or the input of a forced tool call
+        response_text = next(
+            (json.dumps(block.input) for block in response.content if getattr(block, "type", None) == "tool_use"),
+            None
+        )
+        if response_text is None:
+            response_text = response.content[0].text
+        
+        # Prompt prefix tokens served from Anthropic's cache
+        cache_read_tokens = getattr(response.usage, "cache_read_input_tokens", None) or 0
+        
+        # Log the successful interaction
+        elapsed_time = time.time() - start_time
+        log_entry.update({
+            "success": True,
+            "elapsed_time": elapsed_time,
+            "response": response_text[:500] + "..." if len(response_text) > 500 else response_text,
+            "tokens": {
+                "prompt_tokens": response.usage.input_tokens,
+                "completion_tokens": response.usage.output_tokens,
+                "total_tokens": response.usage.input_tokens + response.usage.output_tokens,
+                "cache_read_tokens": cache_read_tokens
+            }
+        })
+        self.interaction_logs.append(log_entry)
+        
+        # Log a summary of the interaction
+        logger.info(
+            f"LLM query successful: model={self.model}, "
+            f"prompt_tokens={response.usage.input_tokens}, "
+            f"completion_tokens={response.usage.output_tokens}, "
+            f"cache_read_tokens={cache_read_tokens}, "
+            f"time={elapsed_time:.2f}s"
+        )
+        
+        return response_text
+    
+    def _record_failure(self, log_entry: Dict[str, Any], start_time: float, error: Exception) -> None:
+        """
+        Log a failed interaction.
+        
+        Args:
+            log_entry: Log entry started for this query
+            start_time: Time the query was sent
+            error: Exception raised by the API call
+        """
+        elapsed_time = time.time() - start_time
+        log_entry.update({
+            "success": False,
+            "elapsed_time": elapsed_time,
+            "error": str(error)
+        })
+        self.interaction_logs.append(log_entry)
+        
+        logger.error(f"LLM query failed: {str(error)}")
+    
     def export_logs(self, file_path: Optional[str] = None) -> Union[str, bool]:
         """
         Export interaction logs to a JSON file or return as a string.
         
+        Blocks while the logs are serialized and written. Use aexport_logs
+        from async code.
+        
         Args:
             file_path: Path to export logs to. If None, returns as a string.
             
         Returns:
             Union[str, bool]: JSON string of logs or True if successfully written to file
         """
-        log_json = json.dumps(self.interaction_logs, indent=2, default=str)
+        logs = list(self.interaction_logs)
         
         if file_path:
-            try:
+            return self._write_logs(logs, file_path)
+        return self._dump_logs(logs)
+    
+    async def aexport_logs(self, file_path: Optional[str] = None) -> Union[str, bool]:
+        """
+        Export interaction logs without blocking the event loop.
+        
+        Takes the same arguments as export_logs. The logs are snapshotted on
+        the event loop, then serialized and written in a worker thread so
+        concurrent LLM queries keep running during large exports.
+        
+        Args:
+            file_path: Path to export logs to. If None, returns as a string.
+            
+        Returns:
+            Union[str, bool]: JSON string of logs or True if successfully written to file
+        """
+        logs = list(self.interaction_logs)
+        
+        if file_path:
+            return await asyncio.to_thread(self._write_logs, logs, file_path)
+        return await asyncio.to_thread(self._dump_logs, logs)
+    
+    def _dump_logs(self, logs: List[Dict[str, Any]]) -> str:
+        """
+        Serialize interaction logs to a JSON string.
+        
+        Returns:
+            str: JSON string of logs
+        """
+        if orjson:
+            return orjson.dumps(logs, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(logs, indent=2, default=str)
+    
+    def _write_logs(self, logs: List[Dict[str, Any]], file_path: str) -> bool:
+        """
+        Write interaction logs to a JSON file.
+        
+        Returns:
+            bool: True if the logs were written, False on failure
+        """
+        try:
+            if orjson:
+                with open(file_path, "wb") as f:
+                    f.write(orjson.dumps(logs, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                # json.dump writes in chunks rather than building the whole string first
                 with open(file_path, "w") as f:
-                    f.write(log_json)
-                logger.info(f"Interaction logs exported to {file_path}")
-                return True
-            except Exception as e:
-                logger.error(f"Failed to export logs to {file_path}: {str(e)}")
-                return False
-        else:
-            return log_json
+                    json.dump(logs, f, indent=2, default=str)
+            logger.info(f"Interaction logs exported to {file_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to export logs to {file_path}: {str(e)}")
+            return False
     
     def generate_goal_analysis(self, 
                               goal: Dict[str, Any], 
                               related_tasks: List[Dict[str, Any]], 
-                              context: Dict[str, Any]) -> Dict[str, Any]:
+                              context: Dict[str, Any],
+                              cache_mode: Optional[CacheMode] = None) -> Dict[str, Any]:
         """
         Generate a comprehensive analysis of a goal using LLM reasoning.
         
@@ -176,21 +1045,122 @@ class LLMIntegration:
             goal: The goal data dictionary
             related_tasks: List of tasks related to this goal
             context: Additional context data (biography, calendar events, etc.)
+            cache_mode: Response cache mode for this call. If None, uses the instance's mode.
             
         Returns:
             Dict[str, Any]: Analysis results
         """
-        # Format the prompt with all the relevant context
-        prompt = self._format_goal_analysis_prompt(goal, related_tasks, context)
+        # Format the goal details, with the context shared by all goals kept
+        # separate so its cached prefix is reused across goals
+        prompt = self._format_goal_analysis_prompt(goal, related_tasks)
         
         # Query the LLM
         response = self.query_llm(
             prompt=prompt,
-            system_prompt=DEFAULT_SYSTEM_PROMPT,
-            temperature=0.3  # Lower temperature for more factual analysis
+            instructions=GOAL_ANALYSIS_INSTRUCTIONS,
+            tool=GOAL_ANALYSIS_TOOL,
+            background=GOAL_BACKGROUND_TEMPLATE.render(context=context),
+            system_prompt=self._default_system,
+            temperature=0.3,  # Lower temperature for more factual analysis
+            cache_mode=cache_mode,
+            cache_scope=f"goal:{goal.get('id')}"
         )
         
-        # Parse and structure the response
+        return self._build_goal_analysis(goal, response)
+    
+    async def agenerate_goal_analysis(self, 
+                                     goal: Dict[str, Any], 
+                                     related_tasks: List[Dict[str, Any]], 
+                                     context: Dict[str, Any],
+                                     cache_mode: Optional[CacheMode] = None) -> Dict[str, Any]:
+        """
+        Async version of generate_goal_analysis.
+        
+        Args:
+            goal: The goal data dictionary
+            related_tasks: List of tasks related to this goal
+            context: Additional context data (biography, calendar events, etc.)
+            cache_mode: Response cache mode for this call. If None, uses the instance's mode.
+            
+        Returns:
+            Dict[str, Any]: Analysis results
+        """
+        prompt = self._format_goal_analysis_prompt(goal, related_tasks)
+        
+        response = await self.aquery_llm(
+            prompt=prompt,
+            instructions=GOAL_ANALYSIS_INSTRUCTIONS,
+            tool=GOAL_ANALYSIS_TOOL,
+            background=GOAL_BACKGROUND_TEMPLATE.render(context=context),
+            system_prompt=self._default_system,
+            temperature=0.3,
+            cache_mode=cache_mode,
+            cache_scope=f"goal:{goal.get('id')}"
+        )
+        
+        return self._build_goal_analysis(goal, response)
+    
+    async def agenerate_goal_analyses(self, 
+                                     goals: List[Dict[str, Any]], 
+                                     related_tasks_per_goal: List[List[Dict[str, Any]]], 
+                                     context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Analyze several goals concurrently.
+        
+        All queries are in flight at once, so the batch takes about as long
+        as the slowest single analysis. A goal whose query fails gets an
+        error entry instead of failing the whole batch.
+        
+        Args:
+            goals: Goals to analyze
+            related_tasks_per_goal: Related tasks for each goal, in the same order
+            context: Additional context data shared by all goals
+            
+        Returns:
+            List[Dict[str, Any]]: Analysis results in the same order as goals
+        """
+        results = await asyncio.gather(
+            *(self.agenerate_goal_analysis(goal, related_tasks, context)
+              for goal, related_tasks in zip(goals, related_tasks_per_goal)),
+            return_exceptions=True
+        )
+        
+        analyses = []
+        for goal, result in zip(goals, results):
+            if isinstance(result, Exception):
+                logger.error(f"Goal analysis failed for '{goal.get('title', 'Untitled goal')}': {str(result)}")
+                result = {"summary": "Error generating analysis", "error": str(result)}
+            analyses.append(result)
+        return analyses
+    
+    def generate_goal_analyses_parallel(self, 
+                                        goals: List[Dict[str, Any]], 
+                                        related_tasks_per_goal: List[List[Dict[str, Any]]], 
+                                        context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Analyze several goals concurrently from synchronous code.
+        
+        Args:
+            goals: Goals to analyze
+            related_tasks_per_goal: Related tasks for each goal, in the same order
+            context: Additional context data shared by all goals
+            
+        Returns:
+            List[Dict[str, Any]]: Analysis results in the same order as goals
+        """
+        return self._run_async(self.agenerate_goal_analyses(goals, related_tasks_per_goal, context))
+    
+    def _build_goal_analysis(self, goal: Dict[str, Any], response: str) -> Dict[str, Any]:
+        """
+        Parse a goal analysis response, falling back to the raw text on error.
+        
+        Args:
+            goal: The goal that was analyzed
+            response: The raw LLM response
+            
+        Returns:
+            Dict[str, Any]: Analysis results
+        """
         try:
             analysis = self._parse_goal_analysis_response(response)
             
@@ -226,6 +1196,7 @@ class LLMIntegration:
         # Query the LLM
         response = self.query_llm(
             prompt=prompt,
+            instructions=TASK_PRIORITIZATION_INSTRUCTIONS,
             temperature=0.2  # Even lower temperature for consistent prioritization
         )
         
@@ -246,7 +1217,8 @@ class LLMIntegration:
     def identify_obstacles(self, 
                           goal: Dict[str, Any], 
                           tasks: List[Dict[str, Any]], 
-                          context: Dict[str, Any]) -> Dict[str, Any]:
+                          context: Dict[str, Any],
+                          cache_mode: Optional[CacheMode] = None) -> Dict[str, Any]:
         """
         Use LLM reasoning to identify obstacles and suggest remedial actions.
         
@@ -254,6 +1226,7 @@ class LLMIntegration:
             goal: The goal to analyze
             tasks: Tasks related to the goal
             context: Additional context data
+            cache_mode: Response cache mode for this call. If None, uses the instance's mode.
             
         Returns:
             Dict[str, Any]: Identified obstacles and remedial task suggestions
@@ -264,10 +1237,105 @@ class LLMIntegration:
         # Query the LLM
         response = self.query_llm(
             prompt=prompt,
-            temperature=0.4  # Slightly higher temperature to encourage creative problem-solving
+            instructions=OBSTACLE_IDENTIFICATION_INSTRUCTIONS,
+            tool=OBSTACLE_IDENTIFICATION_TOOL,
+            temperature=0.4,  # Slightly higher temperature to encourage creative problem-solving
+            cache_mode=cache_mode,
+            cache_scope=f"goal:{goal.get('id')}"
         )
         
-        # Parse and structure the response
+        return self._build_obstacles_analysis(goal, response)
+    
+    async def aidentify_obstacles(self, 
+                                 goal: Dict[str, Any], 
+                                 tasks: List[Dict[str, Any]], 
+                                 context: Dict[str, Any],
+                                 cache_mode: Optional[CacheMode] = None) -> Dict[str, Any]:
+        """
+        Async version of identify_obstacles.
+        
+        Args:
+            goal: The goal to analyze
+            tasks: Tasks related to the goal
+            context: Additional context data
+            cache_mode: Response cache mode for this call. If None, uses the instance's mode.
+            
+        Returns:
+            Dict[str, Any]: Identified obstacles and remedial task suggestions
+        """
+        prompt = self._format_obstacle_identification_prompt(goal, tasks, context)
+        
+        response = await self.aquery_llm(
+            prompt=prompt,
+            instructions=OBSTACLE_IDENTIFICATION_INSTRUCTIONS,
+            tool=OBSTACLE_IDENTIFICATION_TOOL,
+            temperature=0.4,
+            cache_mode=cache_mode,
+            cache_scope=f"goal:{goal.get('id')}"
+        )
+        
+        return self._build_obstacles_analysis(goal, response)
+    
+    async def aidentify_obstacles_batch(self, 
+                                       goals: List[Dict[str, Any]], 
+                                       tasks_per_goal: List[List[Dict[str, Any]]], 
+                                       context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Identify obstacles for several goals concurrently.
+        
+        A goal whose query fails gets an empty result with the error
+        instead of failing the whole batch.
+        
+        Args:
+            goals: Goals to analyze
+            tasks_per_goal: Tasks for each goal, in the same order
+            context: Additional context data shared by all goals
+            
+        Returns:
+            List[Dict[str, Any]]: Obstacle analyses in the same order as goals
+        """
+        results = await asyncio.gather(
+            *(self.aidentify_obstacles(goal, tasks, context)
+              for goal, tasks in zip(goals, tasks_per_goal)),
+            return_exceptions=True
+        )
+        
+        analyses = []
+        for goal, result in zip(goals, results):
+            if isinstance(result, Exception):
+                logger.error(f"Obstacle identification failed for '{goal.get('title', 'Untitled goal')}': {str(result)}")
+                result = {"obstacles": [], "remedial_tasks": [], "error": str(result)}
+            analyses.append(result)
+        return analyses
+    
+    def identify_obstacles_parallel(self, 
+                                    goals: List[Dict[str, Any]], 
+                                    tasks_per_goal: List[List[Dict[str, Any]]], 
+                                    context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Identify obstacles for several goals concurrently from synchronous code.
+        
+        Args:
+            goals: Goals to analyze
+            tasks_per_goal: Tasks for each goal, in the same order
+            context: Additional context data shared by all goals
+            
+        Returns:
+            List[Dict[str, Any]]: Obstacle analyses in the same order as goals
+        """
+        return self._run_async(self.aidentify_obstacles_batch(goals, tasks_per_goal, context))
+    
+    def _build_obstacles_analysis(self, goal: Dict[str, Any], response: str) -> Dict[str, Any]:
+        """
+        Parse an obstacle identification response, falling back to the raw text on error.
+        
+        Args:
+            goal: The goal that was analyzed
+            response: The raw LLM response
+            
+        Returns:
+            Dict[str, Any]: Identified obstacles and remedial task suggestions
+        """
         try:
             obstacles_analysis = self._parse_obstacle_identification_response(response)
             
@@ -285,60 +1353,72 @@ class LLMIntegration:
     
     def _format_goal_analysis_prompt(self, 
                                     goal: Dict[str, Any], 
-                                    related_tasks: List[Dict[str, Any]], 
-                                    context: Dict[str, Any]) -> str:
+                                    related_tasks: List[Dict[str, Any]]) -> str:
         """
-        Format the prompt for goal analysis.
+        Format the goal/task data for goal analysis.
+        
+        The static instructions and the context shared by all goals
+        (GOAL_BACKGROUND_TEMPLATE) are sent separately so they can be cached.
         
         Args:
             goal: The goal data dictionary
             related_tasks: List of tasks related to this goal
-            context: Additional context data
             
         Returns:
             str: Formatted prompt
         """
-        prompt = f"""
-Please analyze the following goal and provide insights to help achieve it effectively.
-
-## GOAL DETAILS
-Title: {goal.get('title', 'Untitled')}
-Description: {goal.get('description', 'No description provided')}
-Type: {goal.get('goal_type', 'Unknown')}
-Importance (0-10): {goal.get('importance', 'Not specified')}
-
-## RELATED TASKS
-"""
-        
-        if related_tasks:
-            for i, task in enumerate(related_tasks, 1):
-                status = "✓" if task.get('completed', False) else "☐"
-                deadline = f"Due: {task.get('deadline', 'No deadline')}" if task.get('deadline') else "No deadline"
-                prompt += f"{i}. {status} {task.get('title', 'Untitled task')} - {deadline}\n"
-        else:
-            prompt += "No related tasks found.\n"
-        
-        prompt += f"""
-## RELEVANT CONTEXT
-Biography excerpts: {context.get('biography', 'No biography provided')}
-Recent calendar: {len(context.get('calendar_events', []))} upcoming events
-Recent emails: {len(context.get('emails', []))} relevant emails
-
-## REQUESTED ANALYSIS
-1. Provide an assessment of the current state of this goal (250 words)
-2. Break down the goal into 3-5 concrete next steps or subtasks
-3. Identify any potential obstacles and how to overcome them
-4. Suggest what success would look like for this goal
-5. Assess how this goal connects to other aspects of life/work
-
-Please structure your response clearly with headings and keep it concise and actionable.
-"""
-        return prompt
+        return GOAL_ANALYSIS_TEMPLATE.render(
+            goal=GoalView.of(goal),
+            tasks=_task_views(related_tasks)
+        )
     
     def _parse_goal_analysis_response(self, response: str) -> Dict[str, Any]:
         """
         Parse the goal analysis response into a structured format.
         
+        The response is normally the JSON input of the emit_goal_analysis
+        tool call. Models that answer in prose instead fall back to a
+        heuristic text parser.
+        
+        Args:
+            response: The raw LLM response
+            
+        Returns:
+            Dict[str, Any]: Structured analysis
+        """
+        data = self._load_tool_input(response)
+        if data is None:
+            return self._parse_goal_analysis_text(response)
+        
+        return {
+            "summary": data.get("summary", ""),
+            "next_steps": data.get("next_steps", []),
+            "obstacles": data.get("obstacles", []),
+            "success_criteria": data.get("success_criteria", ""),
+            "connections": data.get("connections", ""),
+            "raw_response": response
+        }
+    
+    def _load_tool_input(self, response: str) -> Optional[Dict[str, Any]]:
+        """
+        Decode a tool call's input from a response.
+        
+        Args:
+            response: The raw LLM response
+            
+        Returns:
+            Optional[Dict[str, Any]]: The tool input, or None if the response is prose
+        """
+        try:
+            data = json.loads(response)
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    
+    def _parse_goal_analysis_text(self, response: str) -> Dict[str, Any]:
+        """
+        Parse a prose goal analysis response.
+        
         Args:
             response: The raw LLM response
             
@@ -377,7 +1457,9 @@ Please structure your response clearly with headings and keep it concise and act
                                           goals: List[Dict[str, Any]], 
                                           context: Dict[str, Any]) -> str:
         """
-        Format the prompt for task prioritization.
+        Format the goal/task data for task prioritization.
+        
+        The static instructions are sent separately so they can be cached.
         
         Args:
             tasks: List of tasks to prioritize
@@ -387,40 +1469,11 @@ Please structure your response clearly with headings and keep it concise and act
         Returns:
             str: Formatted prompt
         """
-        prompt = """
-Please prioritize the following tasks based on their importance, urgency, and impact on wellbeing.
-Consider the goals they relate to, deadlines, and overall context.
-
-## TASKS TO PRIORITIZE
-"""
-        
-        for i, task in enumerate(tasks, 1):
-            deadline = f"Due: {task.get('deadline')}" if task.get('deadline') else "No deadline"
-            goal_id = task.get('goal_id', 'No goal')
-            prompt += f"{i}. {task.get('title', 'Untitled task')} - {deadline} - Goal: {goal_id}\n"
-        
-        prompt += "\n## RELATED GOALS\n"
-        for goal in goals:
-            prompt += f"- {goal.get('title', 'Untitled')} (Importance: {goal.get('importance', 'N/A')}): {goal.get('description', 'No description')[:100]}...\n"
-        
-        prompt += f"""
-## CONTEXT INFORMATION
-Calendar: {len(context.get('calendar_events', []))} upcoming events in the next 7 days
-Wellbeing priorities: {context.get('wellbeing_priorities', 'No specific wellbeing priorities mentioned')}
-
-## INSTRUCTIONS
-For each task, please:
-1. Assign a priority score (1-10)
-2. Provide brief reasoning (max 50 words per task)
-3. Consider the following weights:
-   - Parent goal importance: 40%
-   - Deadline urgency: 30%
-   - Wellbeing impact: 30%
-
-Format your response as a numbered list that matches the input task order.
-For each task include: Priority score (1-10), brief reasoning, and any suggested modifications.
-"""
-        return prompt
+        return TASK_PRIORITIZATION_TEMPLATE.render(
+            tasks=[TaskView.of(task) for task in tasks],
+            goals=[GoalView.of(goal) for goal in goals],
+            context=context
+        )
     
     def _parse_task_prioritization_response(self, 
                                           response: str, 
@@ -437,63 +1490,22 @@ For each task include: Priority score (1-10), brief reasoning, and any suggested
         """
         tasks = original_tasks.copy()
         
-        # Split the response into lines
-        lines = response.strip().split('\n')
-        
-        # Track the current task index
-        current_task_idx = 0
-        current_priority = None
-        current_reasoning = []
-        
-        # Process each line
-        for line in lines:
-            line = line.strip()
+        for match in TASK_BLOCK_RE.finditer(response):
+            task_idx = int(match.group(1)) - 1
+            if not 0 <= task_idx < len(tasks):
+                continue
             
-            # Look for numbered lines that might start a new task
-            if line and line[0].isdigit() and '. ' in line[:5]:
-                # If we were processing a previous task, save its data
-                if current_priority is not None and current_task_idx < len(tasks):
-                    tasks[current_task_idx]["llm_priority"] = current_priority
-                    tasks[current_task_idx]["llm_reasoning"] = " ".join(current_reasoning)
-                
-                # Move to the next task
-                current_task_idx = int(line.split('.')[0]) - 1
-                if current_task_idx < len(tasks):
-                    # Reset for the new task
-                    current_reasoning = []
-                    
-                    # Try to extract the priority score
-                    try:
-                        # Look for patterns like "Priority: 8" or "Score: 8/10"
-                        if "priority:" in line.lower():
-                            priority_part = line.lower().split("priority:")[1]
-                            current_priority = int(priority_part.strip().split()[0])
-                        elif "score:" in line.lower():
-                            priority_part = line.lower().split("score:")[1]
-                            current_priority = int(priority_part.strip().split()[0].split('/')[0])
-                        else:
-                            # Look for any number that could be a score
-                            import re
-                            numbers = re.findall(r'\b(\d{1,2})(?:/10)?\b', line)
-                            if numbers:
-                                current_priority = int(numbers[0])
-                            else:
-                                current_priority = None
-                    except (ValueError, IndexError):
-                        current_priority = None
-                    
-                    # Add the rest of the line as reasoning
-                    reasoning_part = line.split(':', 1)[1] if ':' in line else line
-                    current_reasoning.append(reasoning_part.strip())
-            
-            # If not a new task, add to current reasoning
-            elif current_task_idx < len(tasks):
-                current_reasoning.append(line)
-        
-        # Don't forget the last task
-        if current_priority is not None and current_task_idx < len(tasks):
-            tasks[current_task_idx]["llm_priority"] = current_priority
-            tasks[current_task_idx]["llm_reasoning"] = " ".join(current_reasoning)
+            header = match.group(2)
+            score = TASK_SCORE_LABEL_RE.search(header) or TASK_SCORE_NUMBER_RE.search(header)
+            if not score:
+                continue
+            
+            # Reasoning is the header after its first colon plus the lines below it
+            reasoning_lines = [header.split(':', 1)[1] if ':' in header else header]
+            reasoning_lines.extend(match.group(3).split('\n'))
+            
+            tasks[task_idx]["llm_priority"] = int(score.group(1))
+            tasks[task_idx]["llm_reasoning"] = " ".join(line.strip() for line in reasoning_lines if line.strip())
         
         # Set priorities for any tasks that didn't get processed
         for task in tasks:
@@ -508,7 +1520,9 @@ For each task include: Priority score (1-10), brief reasoning, and any suggested
                                              tasks: List[Dict[str, Any]], 
                                              context: Dict[str, Any]) -> str:
         """
-        Format the prompt for obstacle identification.
+        Format the goal/task data for obstacle identification.
+        
+        The static instructions are sent separately so they can be cached.
         
         Args:
             goal: The goal to analyze
@@ -518,52 +1532,51 @@ For each task include: Priority score (1-10), brief reasoning, and any suggested
         Returns:
             str: Formatted prompt
         """
-        prompt = f"""
-Please analyze the following goal and identify potential obstacles that might prevent its successful completion.
-Also suggest specific remedial tasks to overcome each obstacle.
-
-## GOAL DETAILS
-Title: {goal.get('title', 'Untitled')}
-Description: {goal.get('description', 'No description provided')}
-Type: {goal.get('goal_type', 'Unknown')}
-Importance (0-10): {goal.get('importance', 'Not specified')}
-
-## CURRENT PROGRESS
-"""
+        return OBSTACLE_IDENTIFICATION_TEMPLATE.render(
+            goal=GoalView.of(goal),
+            tasks=_task_views(tasks),
+            context=context
+        )
+    
+    def _parse_obstacle_identification_response(self, response: str) -> Dict[str, Any]:
+        """
+        Parse the obstacle identification response into a structured format.
         
-        if tasks:
-            completed = sum(1 for task in tasks if task.get('completed', False))
-            total = len(tasks)
-            completion_rate = (completed / total) * 100 if total > 0 else 0
-            
-            prompt += f"Progress: {completed}/{total} tasks completed ({completion_rate:.1f}%)\n\n"
-            prompt += "Tasks:\n"
+        The response is normally the JSON input of the emit_obstacles tool
+        call. Models that answer in prose instead fall back to a heuristic
+        text parser.
+        
+        Args:
+            response: The raw LLM response
             
-            for i, task in enumerate(tasks, 1):
-                status = "✓" if task.get('completed', False) else "☐"
-                deadline = f"Due: {task.get('deadline', 'No deadline')}" if task.get('deadline') else "No deadline"
-                prompt += f"{i}. {status} {task.get('title', 'Untitled task')} - {deadline}\n"
-        else:
-            prompt += "No tasks created yet for this goal.\n"
+        Returns:
+            Dict[str, Any]: Structured obstacles and remedial tasks
+        """
+        data = self._load_tool_input(response)
+        if data is None:
+            return self._parse_obstacle_identification_text(response)
         
-        prompt += f"""
-## RELEVANT CONTEXT
-Time constraints: {context.get('time_constraints', 'No specific time constraints mentioned')}
-Resources available: {context.get('resources', 'No specific resources mentioned')}
-Past obstacles: {context.get('past_obstacles', 'No past obstacles recorded')}
-
-## REQUESTED ANALYSIS
-1. Identify 3-5 potential obstacles that might prevent achieving this goal
-2. For each obstacle, suggest 1-2 specific remedial tasks that could help overcome it
-3. Categorize each obstacle by severity (High, Medium, Low)
-
-Please format your response with clear headings for each obstacle and bullet points for remedial tasks.
-"""
-        return prompt
+        obstacles = []
+        remedial_tasks = []
+        for item in data.get("obstacles", []):
+            severity = item.get("severity", "Medium")
+            obstacles.append({"title": item.get("title", ""), "severity": severity})
+            for task_desc in item.get("remedial_tasks", []):
+                remedial_tasks.append({
+                    "title": f"Remedial: {task_desc}",
+                    "for_obstacle": item.get("title", ""),
+                    "priority": REMEDIAL_TASK_PRIORITY.get(severity, 5)
+                })
+        
+        return {
+            "obstacles": obstacles,
+            "remedial_tasks": remedial_tasks,
+            "raw_response": response
+        }
     
-    def _parse_obstacle_identification_response(self, response: str) -> Dict[str, Any]:
+    def _parse_obstacle_identification_text(self, response: str) -> Dict[str, Any]:
         """
-        Parse the obstacle identification response into a structured format.
+        Parse a prose obstacle identification response.
         
         Args:
             response: The raw LLM response
@@ -580,7 +1593,7 @@ Please format your response with clear headings for each obstacle and bullet poi
         
         for section in sections:
             # Look for sections that might describe obstacles
-            if "obstacle" in section.lower() or "barrier" in section.lower() or "challenge" in section.lower():
+            if OBSTACLE_SECTION_RE.search(section):
                 obstacle_lines = section.split('\n')
                 
                 # First line is likely the obstacle title/description
@@ -588,14 +1601,13 @@ Please format your response with clear headings for each obstacle and bullet poi
                 if ":" in obstacle_title:
                     obstacle_title = obstacle_title.split(":", 1)[1].strip()
                 
-                # Extract severity if present
-                severity = "Medium"  # Default
-                if "high" in section.lower():
-                    severity = "High"
-                elif "medium" in section.lower():
-                    severity = "Medium"
-                elif "low" in section.lower():
-                    severity = "Low"
+                # Extract severity if present, preferring the most severe
+                # keyword mentioned
+                found = {match.lower() for match in OBSTACLE_SEVERITY_RE.findall(section)}
+                severity = next(
+                    (level for level in ("High", "Medium", "Low") if level.lower() in found),
+                    "Medium"  # Default
+                )
                 
                 # Add the obstacle
                 obstacle = {
@@ -613,7 +1625,7 @@ Please format your response with clear headings for each obstacle and bullet poi
                             task = {
                                 "title": f"Remedial: {task_desc}",
                                 "for_obstacle": obstacle_title,
-                                "priority": 7 if severity == "High" else 5 if severity == "Medium" else 3
+                                "priority": REMEDIAL_TASK_PRIORITY[severity]
                             }
                             remedial_tasks.append(task)
         
@@ -626,15 +1638,28 @@ Please format your response with clear headings for each obstacle and bullet poi
         return result
 
 
+@lru_cache(maxsize=1)
+def _llm_settings() -> Tuple[Optional[str], str]:
+    """
+    Read the LLM settings from the environment once per process.
+    
+    Returns:
+        Tuple[Optional[str], str]: API key and model name
+    """
+    return os.getenv("ANTHROPIC_API_KEY"), os.getenv("ANTHROPIC_MODEL", "claude-3-opus-20240229")
+
+
 def get_llm() -> LLMIntegration:
     """
     Get an instance of the LLM integration.
     
+    The API key and model are read from the environment on the first call
+    only; restart the process to pick up changes.
+    
     Returns:
         LLMIntegration: An initialized LLM integration instance
     """
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    model = os.getenv("ANTHROPIC_MODEL", "claude-3-opus-20240229")
+    api_key, model = _llm_settings()
     
     try:
         return LLMIntegration(api_key=api_key, model=model)
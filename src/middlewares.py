@@ -1,7 +1,9 @@
 """
 Middleware for kairoslms application.
 
-This module defines FastAPI middleware for:
+This module defines FastAPI middleware for the following, written as plain
+ASGI middleware to avoid the per-request task and stream overhead of
+Starlette's BaseHTTPMiddleware:
 - Error handling and exception processing
 - Request logging
 - Authentication
@@ -9,44 +11,148 @@ This module defines FastAPI middleware for:
 - CORS configuration
 """
 import time
+import asyncio
 import logging
-from typing import Callable, Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, Union, Tuple
 import traceback
 import json
 import os
+import itertools
+import ipaddress
+import secrets
+from collections import OrderedDict
 
-from fastapi import FastAPI, Request, Response
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR, HTTP_429_TOO_MANY_REQUESTS
 
-from src.utils.error_handling import KairosError, ErrorResponse
-from src.utils.logging import get_logger
+from src.utils.error_handling import KairosError, utc_timestamp
+from src.utils.logging import get_logger, REQUEST_ID
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # rate limits stay per process
+    aioredis = None
 
 # Configure module logger
 logger = get_logger(__name__)
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+# Paths that are neither rate limited nor logged: static files and the
+# health/metrics endpoints polled by probes. A tuple so a single
+# str.startswith call checks them all.
+UNTRACKED_PATH_PREFIXES = ("/static/", "/health", "/metrics", "/favicon.ico")
+
+
+def _parse_rate_limit(value: str, default: int = 60) -> int:
+    """
+    Parse the RATE_LIMIT setting.
+    
+    Args:
+        value: Raw environment value
+        default: Limit used if the value is not an integer
+        
+    Returns:
+        int: Requests per minute, at least 1
+    """
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning(f"Invalid RATE_LIMIT {value!r}, using {default}")
+        return default
+
+
+# Middleware settings, parsed and normalized once at import
+CORS_ORIGINS = tuple(dict.fromkeys(
+    origin.strip() for origin in os.getenv("CORS_ORIGINS", "http://localhost:8000").split(",") if origin.strip()
+))
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").strip().lower() in {"1", "true", "yes", "on"}
+RATE_LIMIT = _parse_rate_limit(os.getenv("RATE_LIMIT", "60"))
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL") or None
+
+class _ORJSONResponse(Response):
+    """
+    JSON response for the middleware error bodies.
+    
+    The content is serialized with orjson when installed, falling back to
+    the stdlib encoder, instead of always using the stdlib encoder like
+    JSONResponse. Either way the output is compact UTF-8 and non-string
+    dict keys in error details are converted to strings.
+    """
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        if orjson:
+            return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Sliding-log rate limit check, run atomically in Redis so concurrent workers
+# can't both pass the limit. KEYS[1]: client log; ARGV: now_ms, window_ms,
+# limit, unique member. Returns {rejected, count, ms until the oldest entry
+# expires}. The decision only needs ZCARD; the log itself is read (its oldest
+# entry only) when a request is rejected.
+RATE_LIMIT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, ARGV[1] - ARGV[2])
+local count = redis.call('ZCARD', KEYS[1])
+if count < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return {0, count + 1, 0}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {1, count, tonumber(oldest[2]) + ARGV[2] - ARGV[1]}
+"""
+
+class ErrorHandlingMiddleware:
     """Middleware for handling exceptions and converting them to appropriate responses."""
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: The next ASGI application
+        """
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process a request and handle any exceptions.
         
         Args:
-            request: The incoming request
-            call_next: The next middleware or route handler
-            
-        Returns:
-            Response: The response
+            scope: The ASGI connection scope
+            receive: The ASGI receive channel
+            send: The ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        response_started = False
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
         try:
             # Process the request
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_wrapper)
         
         except Exception as exc:
+            # Once the response has started it can no longer be replaced
+            if response_started:
+                raise
+            
             # Get traceback
             tb_str = traceback.format_exc()
             
@@ -64,160 +170,469 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                 # Log stack trace for 500 errors
                 logger.error(f"Unhandled exception: {str(exc)}\n{tb_str}")
             
-            # Create error response
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
-            error_response = ErrorResponse(
-                error=error_message,
-                status_code=status_code,
-                details=error_details,
-                timestamp=timestamp,
-                path=request.url.path
-            )
-            
-            # Return JSON response
-            return JSONResponse(
-                status_code=status_code,
-                content=error_response.dict()
+            # Send JSON response with the ErrorResponse fields
+            response = _ORJSONResponse(
+                {
+                    "error": error_message,
+                    "status_code": status_code,
+                    "details": error_details,
+                    "timestamp": utc_timestamp(),
+                    "path": scope["path"],
+                    "trace_id": None
+                },
+                status_code
             )
+            await response(scope, receive, send)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging requests and responses."""
+class RequestLoggingMiddleware:
+    """
+    Middleware for logging requests and responses.
+    
+    Each request is logged once, on completion. Errors are always logged,
+    while only one in success_sample_rate successful requests is, so
+    routine traffic doesn't dominate the logs. Request starts are logged
+    at DEBUG level.
+    """
+    
+    # Log one in this many successful (< 400) requests
+    success_sample_rate = 16
+    
+    def __init__(self, app: ASGIApp):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: The next ASGI application
+        """
+        self.app = app
+        self._successes = itertools.count()
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Log requests and responses.
         
         Args:
-            request: The incoming request
-            call_next: The next middleware or route handler
-            
-        Returns:
-            Response: The response
+            scope: The ASGI connection scope
+            receive: The ASGI receive channel
+            send: The ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Read request details straight from the scope rather than building a Request
+        method = scope["method"]
+        path = scope["path"]
+        
+        # Skip probe and static file requests
+        if path.startswith(UNTRACKED_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        
         # Start timer
         start_time = time.time()
         
-        # Generate request ID
-        request_id = f"req-{int(start_time * 1000)}"
-        
+        # Generate request ID; log records pick it up from the context variable
+        request_id = secrets.token_hex(8)
+        token = REQUEST_ID.set(request_id)
+        try:
+            await self._log_request(scope, receive, send, method, path, request_id, start_time)
+        finally:
+            REQUEST_ID.reset(token)
+    
+    async def _log_request(self,
+                           scope: Scope,
+                           receive: Receive,
+                           send: Send,
+                           method: str,
+                           path: str,
+                           request_id: str,
+                           start_time: float) -> None:
+        """Process a request, adding its ID to the response and logging its completion."""
         # Log the request
-        logger.info(
-            f"Request started: {request.method} {request.url.path}",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "client_ip": request.client.host if request.client else "unknown",
-                "user_agent": request.headers.get("user-agent", "unknown")
-            }
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Request started: %s %s",
+                method,
+                path,
+                extra={
+                    "method": method,
+                    "path": path,
+                    "client_ip": (scope.get("client") or ("unknown", 0))[0],
+                    "user_agent": Headers(scope=scope).get("user-agent", "unknown")
+                }
+            )
+        
+        status_code = HTTP_500_INTERNAL_SERVER_ERROR
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add request ID header to the response
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
         
         # Process the request
-        response = await call_next(request)
+        await self.app(scope, receive, send_wrapper)
+        
+        # Sample successful requests; always log errors
+        if status_code < 400 and next(self._successes) % self.success_sample_rate:
+            return
         
         # Calculate duration
         duration = time.time() - start_time
         
         # Log the response
         logger.info(
-            f"Request completed: {request.method} {request.url.path} - {response.status_code} ({duration:.3f}s)",
+            "Request completed: %s %s - %d (%.3fs)",
+            method,
+            path,
+            status_code,
+            duration,
             extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
+                "method": method,
+                "path": path,
+                "status_code": status_code,
                 "duration": duration
             }
         )
+
+
+def _client_key(host: str) -> bytes:
+    """
+    Compact dict key for a client address.
+    
+    IP addresses are keyed by their 4 or 16 packed bytes, with IPv4-mapped
+    IPv6 addresses folded into IPv4, which takes far less memory per client
+    than the address string. Other hosts are keyed by their encoded name.
+    
+    Args:
+        host: Client host from the request
         
-        # Add request ID header to the response
-        response.headers["X-Request-ID"] = request_id
-        
-        return response
+    Returns:
+        bytes: Key identifying the client
+    """
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return host.encode()
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return address.packed
+
+
+class _ClientWindow:
+    """Request counts of one client for the current and previous windows."""
+    
+    __slots__ = ("window", "previous", "current")
+    
+    def __init__(self, window: int):
+        self.window = window
+        self.previous = 0
+        self.current = 0
 
 
-class RateLimitingMiddleware(BaseHTTPMiddleware):
-    """Middleware for rate limiting requests."""
+class RateLimitingMiddleware:
+    """
+    Middleware for rate limiting requests.
+    
+    Uses a sliding-window estimate: each client keeps request counts for
+    the current and previous fixed windows, and the previous count is
+    weighted by how much of it still overlaps the last window_size seconds.
+    Checking the limit is a single dict lookup regardless of how many
+    requests the client has made, at the cost of a small error against an
+    exact rolling count.
+    
+    These counters are per process. With a redis_url, limits are instead
+    checked against an exact sliding log in Redis shared by all workers,
+    falling back to the local counters while Redis is unreachable.
     
-    def __init__(self, app: FastAPI, requests_per_minute: int = 60, by_ip: bool = True):
+    A client that is rejected is blocked until its limit resets, so during
+    a flood of requests the repeats are turned away with a single lookup
+    without touching the counters or Redis.
+    """
+    
+    # Seconds to use the local counters after a Redis error before retrying Redis
+    redis_retry_interval = 30.0
+    # Number of client count shards; a power of two so a shard is picked with a mask
+    shard_count = 16
+    
+    def __init__(self,
+                 app: ASGIApp,
+                 requests_per_minute: int = 60,
+                 by_ip: bool = True,
+                 redis_url: Optional[str] = None):
         """
         Initialize the middleware.
         
         Args:
-            app: The FastAPI application
+            app: The next ASGI application
             requests_per_minute: Maximum requests per minute
             by_ip: Whether to apply rate limiting per IP address
+            redis_url: Optional Redis URL for limits shared across workers
         """
-        super().__init__(app)
+        self.app = app
         self.requests_per_minute = requests_per_minute
         self.by_ip = by_ip
-        self.request_counts: Dict[str, List[float]] = {}
+        # Window counts per client key, split across shards by key hash. Each
+        # shard is ordered from least to most recently counted so expired
+        # clients are at the front.
+        self.count_shards: Tuple["OrderedDict[bytes, _ClientWindow]", ...] = tuple(
+            OrderedDict() for _ in range(self.shard_count)
+        )
+        self._shard_mask = self.shard_count - 1
         self.window_size = 60.0  # seconds
+        # Window length for the local counters, in integer nanoseconds
+        self.window_ns = int(self.window_size * 1_000_000_000)
+        self._sweeper: Optional[asyncio.Task] = None
+        # Rejected clients, mapped to the monotonic_ns time their block ends
+        # and their request count when they were blocked
+        self._blocked: Dict[bytes, Tuple[int, int]] = {}
+        # Fields of the 429 response that are the same for every rejection
+        self._rejection_template = {
+            "error": "Rate limit exceeded",
+            "status_code": HTTP_429_TOO_MANY_REQUESTS,
+            "details": None,
+            "timestamp": None,
+            "path": None,
+            "trace_id": None
+        }
+        
+        self._redis = None
+        self._redis_script = None
+        self._redis_retry_at = 0.0
+        self._sequence = itertools.count()
+        if redis_url:
+            if aioredis is None:
+                logger.warning("redis is not installed; rate limits are enforced per worker")
+            else:
+                # from_url keeps a connection pool shared by all requests
+                self._redis = aioredis.from_url(redis_url)
+                self._redis_script = self._redis.register_script(RATE_LIMIT_SCRIPT)
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Apply rate limiting to requests.
         
         Args:
-            request: The incoming request
-            call_next: The next middleware or route handler
-            
-        Returns:
-            Response: The response
+            scope: The ASGI connection scope
+            receive: The ASGI receive channel
+            send: The ASGI send channel
         """
-        # Skip rate limiting for some paths (like static files)
-        if request.url.path.startswith("/static/"):
-            return await call_next(request)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Skip rate limiting for static files and probes
+        path = scope["path"]
+        if path.startswith(UNTRACKED_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        
+        self._start_sweeper()
         
         # Get client identifier (IP address or user ID)
-        client_id = request.client.host if self.by_ip else "global"
+        if self.by_ip:
+            client_id = (scope.get("client") or ("unknown", 0))[0]
+            client_key = _client_key(client_id)
+        else:
+            client_id, client_key = "global", b"global"
+        
+        # Turn away blocked clients before any counting
+        now = time.monotonic_ns()
+        blocked = self._blocked.get(client_key)
+        if blocked is not None and blocked[0] > now:
+            reset_after = -(-(blocked[0] - now) // 1_000_000_000)
+            await self._reject(scope, receive, send, path, blocked[1], reset_after)
+            return
         
         # Check rate limit
-        current_time = time.time()
-        
-        # Clean up old request timestamps
-        if client_id in self.request_counts:
-            self.request_counts[client_id] = [
-                timestamp for timestamp in self.request_counts[client_id]
-                if current_time - timestamp < self.window_size
-            ]
-        else:
-            self.request_counts[client_id] = []
+        allowed, count, reset_after = await self._check(client_key)
         
         # Check if rate limit exceeded
-        if len(self.request_counts[client_id]) >= self.requests_per_minute:
+        if not allowed:
             logger.warning(
-                f"Rate limit exceeded for {client_id}: {len(self.request_counts[client_id])} "
-                f"requests in the last minute"
-            )
-            
-            # Return rate limit error
-            error_response = ErrorResponse(
-                error="Rate limit exceeded",
-                status_code=HTTP_429_TOO_MANY_REQUESTS,
-                details={
-                    "limit": self.requests_per_minute,
-                    "current": len(self.request_counts[client_id]),
-                    "reset_after": int(
-                        self.window_size - (current_time - min(self.request_counts[client_id]))
-                    )
-                },
-                timestamp=time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
-                path=request.url.path
+                f"Rate limit exceeded for {client_id}: about {count} "
+                f"requests in the last minute, blocked for {reset_after}s"
             )
+            self._blocked[client_key] = (now + reset_after * 1_000_000_000, count)
+            await self._reject(scope, receive, send, path, count, reset_after)
+            return
+        
+        # Process the request
+        await self.app(scope, receive, send)
+    
+    async def _reject(self,
+                      scope: Scope,
+                      receive: Receive,
+                      send: Send,
+                      path: str,
+                      count: int,
+                      reset_after: int) -> None:
+        """
+        Send a 429 response, filling in the per-rejection fields of the template.
+        
+        Args:
+            scope: The ASGI connection scope
+            receive: The ASGI receive channel
+            send: The ASGI send channel
+            path: The request path
+            count: The client's request count in the window
+            reset_after: Seconds until the client's limit resets
+        """
+        content = self._rejection_template.copy()
+        content["details"] = {"limit": self.requests_per_minute, "current": count, "reset_after": reset_after}
+        content["timestamp"] = utc_timestamp()
+        content["path"] = path
+        response = _ORJSONResponse(
+            content,
+            HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(max(reset_after, 1))}
+        )
+        await response(scope, receive, send)
+    
+    async def _check(self, client_key: bytes) -> Tuple[bool, int, int]:
+        """
+        Record a request if it is within the client's limit.
+        
+        Args:
+            client_key: The client key from _client_key
             
-            return JSONResponse(
-                status_code=HTTP_429_TOO_MANY_REQUESTS,
-                content=error_response.dict(),
-                headers={"Retry-After": "60"}
-            )
+        Returns:
+            Tuple[bool, int, int]: Whether the request is allowed, the client's
+            request count in the window, and seconds until the limit resets
+        """
+        if self._redis_script is not None and time.monotonic() >= self._redis_retry_at:
+            try:
+                return await self._check_redis(client_key)
+            except Exception as e:
+                self._redis_retry_at = time.monotonic() + self.redis_retry_interval
+                logger.warning(f"Redis rate limit check failed, using local counters: {str(e)}")
+        
+        return self._check_local(client_key)
+    
+    async def _check_redis(self, client_key: bytes) -> Tuple[bool, int, int]:
+        """
+        Check and record a request in the client's sliding log in Redis.
+        
+        Wall-clock time is used because the log is shared between processes.
+        
+        Returns:
+            Tuple[bool, int, int]: Whether the request is allowed, the client's
+            request count in the window, and seconds until the limit resets
+        """
+        now_ms = int(time.time() * 1000)
+        window_ms = int(self.window_size * 1000)
+        member = f"{now_ms}:{os.getpid()}:{next(self._sequence)}"
+        
+        rejected, count, reset_ms = await self._redis_script(
+            keys=[b"ratelimit:" + client_key],
+            args=[now_ms, window_ms, self.requests_per_minute, member]
+        )
+        return not rejected, int(count), -(-int(reset_ms) // 1000)
+    
+    def _check_local(self, client_key: bytes) -> Tuple[bool, int, int]:
+        """
+        Check and record a request in the client's in-process window counters.
+        
+        Returns:
+            Tuple[bool, int, int]: Whether the request is allowed, the estimated
+            request count in the window, and seconds until the window ends or,
+            for a rejected request, until the estimate drops below the limit
+        """
+        # Settings are read into locals once; this runs on every request
+        window_ns = self.window_ns
+        limit = self.requests_per_minute
+        
+        # Monotonic time so clock adjustments can't reset windows, in integer
+        # nanoseconds so the window arithmetic below stays in exact ints
+        window, elapsed = divmod(time.monotonic_ns(), window_ns)
+        
+        shard = self.count_shards[hash(client_key) & self._shard_mask]
+        counts = shard.get(client_key)
+        if counts is None:
+            counts = _ClientWindow(window)
+            previous = current = 0
+        elif counts.window != window:
+            previous = counts.current if counts.window == window - 1 else 0
+            current = 0
+            counts.window, counts.previous = window, previous
+        else:
+            previous, current = counts.previous, counts.current
+        
+        # Weight the previous window by its overlap with the sliding window,
+        # scaled by window_ns: previous * (1 - elapsed / window) + current
+        remaining = window_ns - elapsed
+        weighted = previous * remaining + current * window_ns
+        reset_after = remaining // 1_000_000_000
+        if weighted >= limit * window_ns:
+            counts.current = current
+            # The estimate drops below the limit as the previous window's
+            # weight decays, unless the current window alone has reached it
+            if current < limit:
+                remaining -= (limit - current) * window_ns // previous
+            return False, weighted // window_ns, -(-remaining // 1_000_000_000)
         
         # Record the request
-        self.request_counts[client_id].append(current_time)
+        counts.current = current + 1
+        if client_key in shard:
+            shard.move_to_end(client_key)
+        else:
+            shard[client_key] = counts
         
-        # Process the request
-        return await call_next(request)
+        return True, weighted // window_ns + 1, reset_after
+    
+    def _start_sweeper(self) -> None:
+        """
+        Start the background sweep of expired clients on the running event loop.
+        
+        Starlette builds middleware lazily, outside any startup hook, so the
+        sweeper is started by the first request and restarted if its loop
+        has gone away.
+        """
+        loop = asyncio.get_running_loop()
+        if self._sweeper is None or self._sweeper.done() or self._sweeper.get_loop() is not loop:
+            self._sweeper = loop.create_task(self._sweep_periodically())
+    
+    async def _sweep_periodically(self) -> None:
+        """
+        Evict expired clients in the background, keeping eviction off the request path.
+        
+        One shard is swept per tick, so every shard is swept once per window
+        and a mass expiry after a traffic spike is spread over shard_count
+        short steps instead of one long one. Expired blocks are dropped once
+        per window, with the first shard.
+        """
+        for index, shard in itertools.cycle(enumerate(self.count_shards)):
+            await asyncio.sleep(self.window_size / self.shard_count)
+            now = time.monotonic_ns()
+            if index == 0 and self._blocked:
+                self._blocked = {key: blocked for key, blocked in self._blocked.items() if blocked[0] > now}
+            self._evict_expired(shard, now // self.window_ns)
+    
+    def _evict_expired(self, counts: "OrderedDict[bytes, _ClientWindow]", current_window: int) -> None:
+        """
+        Remove clients in a shard with no requests in the current or previous window.
+        
+        Clients are kept in the order they were last counted, so expired
+        ones form a prefix and eviction stops at the first live client.
+        Each sweep costs O(1) plus the number of clients evicted.
+        
+        The ordering holds because windows come from time.monotonic_ns,
+        which never goes backwards. A rejected request refreshes a client's
+        window without moving it to the end; that can only delay the
+        eviction of clients behind it, never evict a live one.
+        
+        Args:
+            counts: The shard to sweep
+            current_window: Index of the current window
+        """
+        while counts:
+            if next(iter(counts.values())).window >= current_window - 1:
+                break
+            counts.popitem(last=False)
 
 
 def configure_middlewares(app: FastAPI) -> None:
@@ -236,16 +651,18 @@ def configure_middlewares(app: FastAPI) -> None:
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=os.getenv("CORS_ORIGINS", "http://localhost:8000").split(","),
+        allow_origins=list(CORS_ORIGINS),
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
     )
     
     # Add rate limiting middleware (if enabled)
-    rate_limit_enabled = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
-    if rate_limit_enabled:
-        rate_limit = int(os.getenv("RATE_LIMIT", "60"))
-        app.add_middleware(RateLimitingMiddleware, requests_per_minute=rate_limit)
+    if RATE_LIMIT_ENABLED:
+        app.add_middleware(
+            RateLimitingMiddleware,
+            requests_per_minute=RATE_LIMIT,
+            redis_url=RATE_LIMIT_REDIS_URL
+        )
     
     logger.info("Application middlewares configured")
\ No newline at end of file
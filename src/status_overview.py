@@ -10,39 +10,159 @@ It integrates with the LLM to provide enhanced reasoning and insights.
 
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+
+from sqlalchemy import exc as sa_exc
 
 import db
-from src.llm_integration import get_llm
 
 logger = logging.getLogger(__name__)
 
+# Response cache mode for goal analyses and obstacle identification. Goals
+# change little between scheduled runs, so by default an unchanged prompt
+# reuses its cached response until it expires (LLM_CACHE_TTL). "semantic"
+# also reuses responses to similar prompts about the same goal.
+STATUS_LLM_CACHE_MODE = os.getenv("STATUS_LLM_CACHE_MODE", "exact")
+
+# Maximum number of goals whose overviews are generated at once
+STATUS_OVERVIEW_WORKERS = int(os.getenv("STATUS_OVERVIEW_WORKERS", "8"))
+
+# Errors meaning the database can't be reached at all, rather than that one
+# query failed. Retrying goal by goal or row by row cannot succeed, so these
+# fail the run instead of falling back.
+DATABASE_UNAVAILABLE_ERRORS = (sa_exc.OperationalError, sa_exc.TimeoutError, ConnectionError, TimeoutError)
+
+# Subtasks every project goal should have, added by breakdown_into_subtasks if missing
+STANDARD_PROJECT_SUBTASKS = (
+    {"title": "Define project scope", "priority": "high"},
+    {"title": "Create project timeline", "priority": "high"},
+    {"title": "Identify key stakeholders", "priority": "medium"},
+    {"title": "Set up project tracking", "priority": "medium"},
+    {"title": "Schedule regular reviews", "priority": "low"}
+)
+
+
+def get_llm():
+    """
+    Get the shared LLM integration instance.
+    
+    The LLM module pulls in the Anthropic SDK and its HTTP stack, so it is
+    only imported once a run actually uses the LLM.
+    
+    Returns:
+        LLMIntegration: The shared LLM integration instance
+    """
+    from src.llm_integration import get_llm as _get_llm
+    return _get_llm()
+
+
+def _make_remedial_task(title: str, *, goal_id: str, task_id: Optional[str], now_iso: str) -> Dict[str, Any]:
+    """
+    Build a remedial task for an overdue or blocked task.
+    
+    Args:
+        title (str): Title of the remedial task
+        goal_id (str): ID of the goal the task belongs to
+        task_id (Optional[str]): ID of the overdue or blocked task
+        now_iso (str): Creation timestamp in ISO format
+        
+    Returns:
+        Dict[str, Any]: The remedial task
+    """
+    return {
+        "title": title,
+        "priority": "high",
+        "priority_score": 0.9,  # High priority score
+        "goal_id": goal_id,
+        "created_at": now_iso,
+        "status": "pending",
+        "related_to_task_id": task_id,
+        "is_remedial": True
+    }
+
+
+def _status_overview_row(overview: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a generated overview onto the columns of a stored status overview.
+    
+    Args:
+        overview (Dict[str, Any]): Overview from _generate_overview_for_goal
+        
+    Returns:
+        Dict[str, Any]: Row for db.bulk_create_status_overviews or db.create_status_overview
+    """
+    remedial_titles = [task["title"] for task in overview.get("remedial_tasks") or []]
+    return {
+        "goal_id": overview["goal_id"],
+        "overview": overview["description"],
+        "obstacles": "\n".join(remedial_titles) or None
+    }
+
+
+def _subtask_row(subtask: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a suggested subtask onto task columns.
+    
+    Args:
+        subtask (Dict[str, Any]): Subtask from breakdown_into_subtasks or identify_obstacles
+        
+    Returns:
+        Dict[str, Any]: Row for db.bulk_create_tasks
+    """
+    return {
+        "title": subtask["title"],
+        "description": subtask.get("description"),
+        "goal_id": subtask.get("goal_id"),
+        "priority": subtask.get("priority_score")
+    }
+
+
 class StatusOverview:
     """Class to handle the generation and management of status overviews."""
     
+    # Seconds read_current_goals reuses goals it has read, so closely spaced
+    # runs on the same instance don't each re-read every goal
+    goals_cache_ttl = 30.0
+    
     def __init__(self):
         """Initialize the StatusOverview class."""
         self.db = db.Database()
+        # Whether an API key is configured, checked once rather than per goal
+        self._llm_available = bool(os.getenv("ANTHROPIC_API_KEY"))
+        # Goals from the last read_current_goals, with the monotonic time they expire
+        self._goals_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._goals_lock = threading.Lock()
     
     def read_current_goals(self) -> Dict[str, Any]:
         """
         Read current high-level and project-level goals from the database.
         
+        Goals are reused for goals_cache_ttl seconds after they are read,
+        until update_goal_status changes one. Failed reads are not cached.
+        
         Returns:
             Dict[str, Any]: Dictionary containing high-level and project-level goals
         """
-        try:
-            high_level_goals = self.db.get_goals(goal_type="high_level")
-            project_goals = self.db.get_goals(goal_type="project")
-            
-            return {
-                "high_level": high_level_goals,
-                "project": project_goals
-            }
-        except Exception as e:
-            logger.error(f"Error reading current goals: {str(e)}")
-            return {"high_level": [], "project": []}
+        with self._goals_lock:
+            cached = self._goals_cache
+            if cached is None or cached[0] <= time.monotonic():
+                try:
+                    goals = {
+                        "high_level": self.db.get_goals(goal_type="high_level"),
+                        "project": self.db.get_goals(goal_type="project")
+                    }
+                except Exception as e:
+                    logger.error(f"Error reading current goals: {str(e)}")
+                    return {"high_level": [], "project": []}
+                
+                cached = self._goals_cache = (time.monotonic() + self.goals_cache_ttl, goals)
+        
+        # Copy the lists so callers can't change the cached goals
+        return {goal_type: list(goals) for goal_type, goals in cached[1].items()}
     
     def process_new_inputs(self, 
                          days_back: int = 1) -> Dict[str, List[Any]]:
@@ -74,197 +194,294 @@ class StatusOverview:
             logger.error(f"Error processing new inputs: {str(e)}")
             return {"emails": [], "calendar_events": [], "tasks": []}
     
-    def generate_goal_description(self, goal_id: str, use_llm: bool = True) -> str:
+    def load_shared_context(self) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the LLM context that is the same for every goal.
+        
+        Fetching it once per run, rather than once per goal, keeps the number
+        of queries constant as the number of goals grows. The three queries
+        are independent, so they run concurrently.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Biography content, recent emails and
+                                      upcoming calendar events, or None on error
+            
+        Raises:
+            DATABASE_UNAVAILABLE_ERRORS: If the database can't be reached
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                biography = executor.submit(self.db.get_context_document_by_type, "biography")
+                recent_emails = executor.submit(self.db.get_emails, days=7, limit=10)
+                calendar_events = executor.submit(self.db.get_upcoming_calendar_events, days=14)
+                biography = biography.result()
+                
+                return {
+                    "biography": biography.get('content', '') if biography else '',
+                    "recent_emails": recent_emails.result(),
+                    "calendar_events": calendar_events.result()
+                }
+        except DATABASE_UNAVAILABLE_ERRORS:
+            raise
+        except Exception as e:
+            logger.error(f"Error loading shared context: {str(e)}")
+            return None
+    
+    def _prefetch_goal_tasks(self, goals: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Load the tasks of several goals with a single query.
+        
+        Args:
+            goals (List[Dict[str, Any]]): Goals already read from the database
+            
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Tasks keyed by goal ID. Empty on
+                                             error, so each goal's tasks are
+                                             loaded separately instead.
+            
+        Raises:
+            DATABASE_UNAVAILABLE_ERRORS: If the database can't be reached
+        """
+        goal_ids = [goal['id'] for goal in goals if goal.get('id')]
+        if not goal_ids:
+            return {}
+        
+        try:
+            tasks_by_goal = self.db.get_tasks_by_goals(goal_ids)
+        except DATABASE_UNAVAILABLE_ERRORS:
+            raise
+        except Exception as e:
+            logger.error(f"Error prefetching goal tasks: {str(e)}")
+            return {}
+        
+        return {goal_id: tasks_by_goal.get(goal_id, []) for goal_id in goal_ids}
+    
+    def _load_goal(self,
+                   goal_id: str,
+                   preloaded: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Get a goal and its tasks, from preloaded data when given.
+        
+        Args:
+            goal_id (str): ID of the goal
+            preloaded (Optional[Dict[str, Any]]): The goal and its tasks, if already loaded
+            
+        Returns:
+            Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]: The goal, or None
+                                                                    if not found, and its tasks
+        """
+        if preloaded is not None:
+            return preloaded["goal"], preloaded["tasks"]
+        
+        goal = self.db.get_goal_by_id(goal_id)
+        if not goal:
+            return None, []
+        return goal, self.db.get_tasks_by_goal_id(goal_id)
+    
+    def generate_goal_description(self,
+                                  goal_id: str,
+                                  use_llm: bool = True,
+                                  shared_context: Optional[Dict[str, Any]] = None,
+                                  preloaded: Optional[Dict[str, Any]] = None) -> str:
         """
         Generate a detailed description of a goal based on available information.
         
         Args:
             goal_id (str): ID of the goal to describe
             use_llm (bool): Whether to use LLM for enhanced description
+            shared_context (Optional[Dict[str, Any]]): Context from load_shared_context,
+                                                       fetched here if not given
+            preloaded (Optional[Dict[str, Any]]): The goal and its tasks, if already
+                                                  loaded; fetched here if not given
             
         Returns:
             str: Generated description of the goal
         """
         try:
-            # Get the goal data from the database
-            goal = self.db.get_goal_by_id(goal_id)
+            # Get the goal and its related tasks
+            goal, related_tasks = self._load_goal(goal_id, preloaded)
             
             if not goal:
                 return "Goal not found"
             
-            # Get related tasks for this goal
-            related_tasks = self.db.get_tasks_by_goal_id(goal_id)
-            
             # Check if LLM should be used and is available
-            if use_llm and os.getenv("ANTHROPIC_API_KEY"):
+            if use_llm and self._llm_available:
                 try:
-                    # Get biography and other context documents
-                    biography = self.db.get_context_document_by_type("biography")
-                    bio_content = biography.get('content', '') if biography else ''
-                    
-                    # Get relevant recent emails
-                    recent_emails = self.db.get_emails(days=7, limit=10)
-                    
-                    # Get upcoming calendar events
-                    calendar_events = self.db.get_upcoming_calendar_events(days=14)
+                    # Get biography, recent emails and upcoming calendar events
+                    shared_context = shared_context or self.load_shared_context()
+                    if shared_context is None:
+                        raise ValueError("Shared context is unavailable")
                     
-                    # Prepare context for LLM
-                    context = {
-                        "biography": bio_content,
-                        "emails": recent_emails,
-                        "calendar_events": calendar_events
-                    }
+                    # Without tasks, a biography or upcoming events the LLM has
+                    # nothing to analyze, so use the standard description
+                    if not (related_tasks or shared_context["biography"] or shared_context["calendar_events"]):
+                        logger.info(f"No context to analyze for goal {goal_id}, skipping the LLM")
+                    else:
+                        # Prepare context for LLM
+                        context = {
+                            "biography": shared_context["biography"],
+                            "emails": shared_context["recent_emails"],
+                            "calendar_events": shared_context["calendar_events"]
+                        }
                     
-                    # Get LLM instance
-                    llm = get_llm()
+                        # Get LLM instance
+                        llm = get_llm()
                     
-                    # Get enhanced analysis from LLM
-                    analysis = llm.generate_goal_analysis(goal, related_tasks, context)
+                        # Get enhanced analysis from LLM
+                        analysis = llm.generate_goal_analysis(goal, related_tasks, context, cache_mode=STATUS_LLM_CACHE_MODE)
                     
-                    # Construct a comprehensive description with LLM insights
-                    description = f"# Goal: {goal.get('title', 'Untitled')}\n\n"
-                    description += f"## Current Status\n{analysis.get('summary', 'No summary available')}\n\n"
+                        # Construct a comprehensive description with LLM insights,
+                        # collecting the lines and joining them once at the end
+                        parts = [
+                            f"# Goal: {goal.get('title', 'Untitled')}\n\n",
+                            f"## Current Status\n{analysis.get('summary', 'No summary available')}\n\n"
+                        ]
                     
-                    # Add next steps from LLM
-                    next_steps = analysis.get('next_steps', [])
-                    if next_steps:
-                        description += "## Recommended Next Steps\n"
-                        for i, step in enumerate(next_steps, 1):
-                            description += f"{i}. {step}\n"
-                        description += "\n"
+                        # Add next steps from LLM
+                        next_steps = analysis.get('next_steps', [])
+                        if next_steps:
+                            parts.append("## Recommended Next Steps\n")
+                            parts.extend(f"{i}. {step}\n" for i, step in enumerate(next_steps, 1))
+                            parts.append("\n")
                     
-                    # Add obstacles identified by LLM
-                    obstacles = analysis.get('obstacles', [])
-                    if obstacles:
-                        description += "## Potential Obstacles\n"
-                        for obstacle in obstacles:
-                            description += f"- {obstacle}\n"
-                        description += "\n"
+                        # Add obstacles identified by LLM
+                        obstacles = analysis.get('obstacles', [])
+                        if obstacles:
+                            parts.append("## Potential Obstacles\n")
+                            parts.extend(f"- {obstacle}\n" for obstacle in obstacles)
+                            parts.append("\n")
                     
-                    # Include existing tasks for reference
-                    if related_tasks:
-                        description += "## Current Tasks\n"
-                        completed_tasks = [t for t in related_tasks if t.get('completed', False)]
-                        active_tasks = [t for t in related_tasks if not t.get('completed', False)]
+                        # Include existing tasks for reference
+                        if related_tasks:
+                            parts.append("## Current Tasks\n")
+                            active_tasks, completed_tasks = [], []
+                            for task in related_tasks:
+                                (completed_tasks if task.get('completed', False) else active_tasks).append(task)
                         
-                        if active_tasks:
-                            description += "Active:\n"
-                            for task in active_tasks:
-                                deadline = f" (Due: {task.get('deadline')})" if task.get('deadline') else ""
-                                description += f"- {task.get('title', 'Untitled task')}{deadline}\n"
+                            if active_tasks:
+                                parts.append("Active:\n")
+                                for task in active_tasks:
+                                    deadline = f" (Due: {task.get('deadline')})" if task.get('deadline') else ""
+                                    parts.append(f"- {task.get('title', 'Untitled task')}{deadline}\n")
                         
-                        if completed_tasks:
-                            description += "Completed:\n"
-                            for task in completed_tasks:
-                                description += f"- ✓ {task.get('title', 'Untitled task')}\n"
+                            if completed_tasks:
+                                parts.append("Completed:\n")
+                                parts.extend(f"- ✓ {task.get('title', 'Untitled task')}\n" for task in completed_tasks)
                     
-                    logger.info(f"Generated LLM-enhanced description for goal {goal_id}")
-                    return description
+                        logger.info(f"Generated LLM-enhanced description for goal {goal_id}")
+                        return "".join(parts)
                     
                 except Exception as e:
                     logger.error(f"Error using LLM for goal description: {str(e)}")
                     logger.info("Falling back to standard description generation")
             
             # Standard description generation (without LLM)
-            description = f"Goal: {goal.get('title', 'Untitled')}\n"
-            description += f"Status: {goal.get('status', 'Unknown')}\n"
-            description += f"Progress: {goal.get('progress', 0)}%\n\n"
-            description += f"Description: {goal.get('description', 'No description available')}\n\n"
+            parts = [
+                f"Goal: {goal.get('title', 'Untitled')}\n",
+                f"Status: {goal.get('status', 'Unknown')}\n",
+                f"Progress: {goal.get('progress', 0)}%\n\n",
+                f"Description: {goal.get('description', 'No description available')}\n\n"
+            ]
             
             if related_tasks:
-                description += "Related Tasks:\n"
+                parts.append("Related Tasks:\n")
                 for task in related_tasks:
                     status = "✓" if task.get('completed', False) else "☐"
-                    description += f"- {status} {task.get('title', 'Untitled task')}\n"
+                    parts.append(f"- {status} {task.get('title', 'Untitled task')}\n")
             
-            return description
+            return "".join(parts)
         except Exception as e:
             logger.error(f"Error generating goal description for goal {goal_id}: {str(e)}")
             return "Error generating goal description"
     
-    def breakdown_into_subtasks(self, goal_id: str) -> List[Dict[str, Any]]:
+    def breakdown_into_subtasks(self,
+                                goal_id: str,
+                                preloaded: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Break down a goal into actionable subtasks.
         
         Args:
             goal_id (str): ID of the goal to break down
+            preloaded (Optional[Dict[str, Any]]): The goal and its tasks, if already
+                                                  loaded; fetched here if not given
             
         Returns:
             List[Dict[str, Any]]: List of subtasks
         """
         try:
             # Get the goal data
-            goal = self.db.get_goal_by_id(goal_id)
+            goal = preloaded["goal"] if preloaded is not None else self.db.get_goal_by_id(goal_id)
             
-            if not goal:
+            # Only project goals get standard subtasks, so other goals don't
+            # need their existing subtasks fetched
+            if not goal or goal.get('type', '') != "project":
                 return []
             
             # Get existing subtasks
-            existing_subtasks = self.db.get_tasks_by_goal_id(goal_id)
+            existing_subtasks = preloaded["tasks"] if preloaded is not None else self.db.get_tasks_by_goal_id(goal_id)
             
             # This logic will be enhanced with LLM integration in Task 5
             # For now, we're implementing a basic subtask generation logic
             subtasks = []
             
-            # Check what subtasks are missing based on the goal type and content
-            goal_type = goal.get('type', '')
-            goal_title = goal.get('title', '')
-            
-            # Example of simple rule-based subtask generation
-            if goal_type == "project":
-                # Standard project subtasks if they don't exist already
-                standard_subtasks = [
-                    {"title": "Define project scope", "priority": "high"},
-                    {"title": "Create project timeline", "priority": "high"},
-                    {"title": "Identify key stakeholders", "priority": "medium"},
-                    {"title": "Set up project tracking", "priority": "medium"},
-                    {"title": "Schedule regular reviews", "priority": "low"}
-                ]
-                
-                # Add standard subtasks if they don't exist
-                existing_titles = [task.get('title', '') for task in existing_subtasks]
-                for task in standard_subtasks:
-                    if task["title"] not in existing_titles:
-                        task["goal_id"] = goal_id
-                        task["created_at"] = datetime.now().isoformat()
-                        task["status"] = "pending"
-                        subtasks.append(task)
+            # Add standard subtasks if they don't exist, ignoring case and
+            # surrounding whitespace in the existing titles
+            existing_titles = {(task.get('title') or '').strip().casefold() for task in existing_subtasks}
+            now_iso = datetime.now().isoformat()
+            for template in STANDARD_PROJECT_SUBTASKS:
+                if template["title"].casefold() not in existing_titles:
+                    # Copy the template so it is never modified
+                    subtasks.append({**template, "goal_id": goal_id, "created_at": now_iso, "status": "pending"})
             
             return subtasks
         except Exception as e:
             logger.error(f"Error breaking down goal {goal_id} into subtasks: {str(e)}")
             return []
     
-    def identify_obstacles(self, goal_id: str, use_llm: bool = True) -> List[Dict[str, Any]]:
+    def identify_obstacles(self,
+                           goal_id: str,
+                           use_llm: bool = True,
+                           shared_context: Optional[Dict[str, Any]] = None,
+                           preloaded: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Identify potential obstacles for a goal and generate remedial subtasks.
         
         Args:
             goal_id (str): ID of the goal to analyze
             use_llm (bool): Whether to use LLM for enhanced obstacle identification
+            shared_context (Optional[Dict[str, Any]]): Context from load_shared_context;
+                                                       only the calendar is fetched if not given
+            preloaded (Optional[Dict[str, Any]]): The goal and its tasks, if already
+                                                  loaded; fetched here if not given
             
         Returns:
             List[Dict[str, Any]]: List of remedial subtasks
         """
         try:
-            # Get the goal data
-            goal = self.db.get_goal_by_id(goal_id)
+            # Get the goal data and related tasks with their status
+            goal, related_tasks = self._load_goal(goal_id, preloaded)
             
             if not goal:
                 return []
             
-            # Get related tasks and their status
-            related_tasks = self.db.get_tasks_by_goal_id(goal_id)
-            
             # Check if LLM should be used and is available
-            if use_llm and os.getenv("ANTHROPIC_API_KEY"):
+            if use_llm and self._llm_available:
                 try:
+                    # Get time constraints from calendar
+                    if shared_context is not None:
+                        calendar_events = shared_context["calendar_events"]
+                    else:
+                        calendar_events = self.db.get_upcoming_calendar_events(days=14)
+                    
+                    # Without tasks or upcoming events the LLM has nothing to
+                    # analyze, and the basic detection would find no obstacles
+                    if not related_tasks and not calendar_events:
+                        logger.info(f"No tasks or upcoming events for goal {goal_id}, skipping the LLM")
+                        return []
+                    
                     # Get past obstacles and other context
                     past_obstacles = self.db.get_past_obstacles(goal_id, limit=5)
                     
-                    # Get time constraints from calendar
-                    calendar_events = self.db.get_upcoming_calendar_events(days=14)
-                    
                     # Prepare context for LLM
                     context = {
                         "time_constraints": f"{len(calendar_events)} upcoming events in the next 14 days",
@@ -276,12 +493,13 @@ class StatusOverview:
                     llm = get_llm()
                     
                     # Get enhanced obstacle analysis from LLM
-                    obstacles_analysis = llm.identify_obstacles(goal, related_tasks, context)
+                    obstacles_analysis = llm.identify_obstacles(goal, related_tasks, context, cache_mode=STATUS_LLM_CACHE_MODE)
                     
                     # Extract remedial tasks from LLM analysis
                     llm_remedial_tasks = obstacles_analysis.get('remedial_tasks', [])
                     
                     # Format the remedial tasks for the database
+                    now_iso = datetime.now().isoformat()
                     formatted_tasks = []
                     for task in llm_remedial_tasks:
                         remedial_task = {
@@ -289,7 +507,7 @@ class StatusOverview:
                             "priority": "high",  # Default to high for remedial tasks
                             "priority_score": task.get('priority', 7) / 10,  # Convert 1-10 scale to 0-1
                             "goal_id": goal_id,
-                            "created_at": datetime.now().isoformat(),
+                            "created_at": now_iso,
                             "status": "pending",
                             "related_to_obstacle": task.get('for_obstacle', 'Unknown obstacle'),
                             "is_remedial": True
@@ -304,62 +522,57 @@ class StatusOverview:
                     logger.info("Falling back to basic obstacle detection")
             
             # Basic obstacle detection logic (without LLM)
-            remedial_tasks = []
+            now = datetime.now()
             
-            # Check for tasks that are overdue or blocked
-            overdue_tasks = [
-                task for task in related_tasks 
-                if task.get('status') != 'completed' and
-                task.get('due_date') and 
-                datetime.fromisoformat(task.get('due_date')) < datetime.now()
-            ]
-            
-            blocked_tasks = [
-                task for task in related_tasks
-                if task.get('status') == 'blocked'
-            ]
+            # Check for tasks that are overdue or blocked, in one pass
+            overdue_tasks = []
+            blocked_tasks = []
+            for task in related_tasks:
+                status = task.get('status')
+                due_date = task.get('due_date')
+                if status != 'completed' and due_date:
+                    if not isinstance(due_date, datetime):
+                        due_date = datetime.fromisoformat(due_date)
+                    if due_date < now:
+                        overdue_tasks.append(task)
+                if status == 'blocked':
+                    blocked_tasks.append(task)
             
-            # Create remedial tasks for overdue tasks
-            for task in overdue_tasks:
-                remedial_task = {
-                    "title": f"Resolve overdue task: {task.get('title', 'Untitled')}",
-                    "priority": "high",
-                    "priority_score": 0.9,  # High priority score
-                    "goal_id": goal_id,
-                    "created_at": datetime.now().isoformat(),
-                    "status": "pending",
-                    "related_to_task_id": task.get('id'),
-                    "is_remedial": True
-                }
-                remedial_tasks.append(remedial_task)
-            
-            # Create remedial tasks for blocked tasks
-            for task in blocked_tasks:
-                remedial_task = {
-                    "title": f"Unblock task: {task.get('title', 'Untitled')}",
-                    "priority": "high",
-                    "priority_score": 0.9,  # High priority score
-                    "goal_id": goal_id,
-                    "created_at": datetime.now().isoformat(),
-                    "status": "pending",
-                    "related_to_task_id": task.get('id'),
-                    "is_remedial": True
-                }
-                remedial_tasks.append(remedial_task)
+            # Create remedial tasks for overdue tasks, then for blocked tasks
+            now_iso = now.isoformat()
+            remedial_tasks = []
+            for prefix, tasks in (("Resolve overdue task", overdue_tasks), ("Unblock task", blocked_tasks)):
+                for task in tasks:
+                    remedial_tasks.append(_make_remedial_task(
+                        f"{prefix}: {task.get('title', 'Untitled')}",
+                        goal_id=goal_id, task_id=task.get('id'), now_iso=now_iso
+                    ))
             
             return remedial_tasks
         except Exception as e:
             logger.error(f"Error identifying obstacles for goal {goal_id}: {str(e)}")
             return []
     
-    def generate_status_overview(self, goal_id: Optional[str] = None, use_llm: bool = True) -> Dict[str, Any]:
+    def generate_status_overview(self,
+                                 goal_id: Optional[str] = None,
+                                 use_llm: bool = True,
+                                 shared_context: Optional[Dict[str, Any]] = None,
+                                 max_workers: int = STATUS_OVERVIEW_WORKERS) -> Dict[str, Any]:
         """
         Generate a comprehensive status overview for a specific goal or all goals.
         
+        Overviews for all goals are generated concurrently in a thread pool,
+        since each one mostly waits on the LLM and the database. With the
+        LLM, each goal's obstacles are identified in a second pool, shared
+        by all goals, while its analysis is generated.
+        
         Args:
             goal_id (Optional[str]): Specific goal ID to generate overview for.
                                      If None, generates overview for all goals.
             use_llm (bool): Whether to use LLM for enhanced overview generation
+            shared_context (Optional[Dict[str, Any]]): Context from load_shared_context,
+                                                       fetched once here if not given
+            max_workers (int): Maximum number of goals processed at once
                                      
         Returns:
             Dict[str, Any]: Status overview containing goal descriptions,
@@ -373,57 +586,178 @@ class StatusOverview:
                 if not goal:
                     return {"error": "Goal not found"}
                 
-                # Check if we should use LLM
-                llm_available = use_llm and os.getenv("ANTHROPIC_API_KEY")
-                
-                # Generate all components for this goal
-                description = self.generate_goal_description(goal_id, use_llm=llm_available)
-                new_subtasks = self.breakdown_into_subtasks(goal_id)
-                remedial_tasks = self.identify_obstacles(goal_id, use_llm=llm_available)
-                
-                # Create and save the status overview
-                overview = {
-                    "goal_id": goal_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "description": description,
-                    "new_subtasks": new_subtasks,
-                    "remedial_tasks": remedial_tasks,
-                    "llm_enhanced": llm_available
-                }
-                
-                # Save the overview to the database
-                self.db.save_status_overview(overview)
-                
-                # Log whether LLM was used
-                if llm_available:
-                    logger.info(f"Generated LLM-enhanced status overview for goal {goal_id}")
-                else:
-                    logger.info(f"Generated standard status overview for goal {goal_id}")
-                
-                return overview
+                with ThreadPoolExecutor(max_workers=1) as obstacles_executor:
+                    return self._generate_overview_for_goal(goal, use_llm, shared_context, obstacles_executor)
             
             # If no goal_id is provided, generate overviews for all goals
             else:
                 # Get all goals
                 goals = self.read_current_goals()
-                all_goals = goals.get('high_level', []) + goals.get('project', [])
+                all_goals = [goal for goal in goals.get('high_level', []) + goals.get('project', []) if goal.get('id')]
+                if not all_goals:
+                    return {"overviews": []}
                 
-                overviews = []
-                for goal in all_goals:
-                    goal_id = goal.get('id')
-                    if goal_id:
-                        overview = self.generate_status_overview(goal_id, use_llm=use_llm)
-                        overviews.append(overview)
+                # Fetch the context shared by all goals once for the whole run
+                if use_llm and self._llm_available and shared_context is None:
+                    shared_context = self.load_shared_context()
                 
-                return {"overviews": overviews}
+                # Load every goal's tasks in one query instead of one per goal
+                prefetched = self._prefetch_goal_tasks(all_goals)
+                
+                # Overviews are returned in goal order, whichever finishes first.
+                # Obstacles get their own pool, since goal workers wait on them
+                workers = min(max_workers, len(all_goals))
+                with ThreadPoolExecutor(max_workers=workers) as executor, \
+                        ThreadPoolExecutor(max_workers=workers) as obstacles_executor:
+                    overviews = list(executor.map(
+                        lambda goal: self._generate_overview_for_goal(
+                            goal, use_llm, shared_context, obstacles_executor,
+                            prefetched.get(goal['id']), save=False
+                        ),
+                        all_goals
+                    ))
+                
+                return {"overviews": self._save_overviews(overviews)}
         
         except Exception as e:
             logger.error(f"Error generating status overview: {str(e)}")
             return {"error": f"Failed to generate status overview: {str(e)}"}
     
+    def _generate_overview_for_goal(self,
+                                    goal: Dict[str, Any],
+                                    use_llm: bool,
+                                    shared_context: Optional[Dict[str, Any]],
+                                    obstacles_executor: ThreadPoolExecutor,
+                                    tasks: Optional[List[Dict[str, Any]]] = None,
+                                    save: bool = True) -> Dict[str, Any]:
+        """
+        Generate and save the status overview for a goal that has already been read.
+        
+        With save=False nothing is written, so it is safe to run for several
+        goals at once and save their overviews together afterwards.
+        
+        Args:
+            goal (Dict[str, Any]): The goal
+            use_llm (bool): Whether to use LLM for enhanced overview generation
+            shared_context (Optional[Dict[str, Any]]): Context from load_shared_context,
+                                                       fetched here if not given
+            obstacles_executor (ThreadPoolExecutor): Pool that identifies the obstacles
+                                                     while the goal is analyzed
+            tasks (Optional[List[Dict[str, Any]]]): The goal's tasks, fetched here if not given
+            save (bool): Whether to save the overview to the database
+            
+        Returns:
+            Dict[str, Any]: The status overview, or an error
+        """
+        goal_id = goal.get('id')
+        try:
+            # The goal and its tasks are shared by all the components below
+            if tasks is None:
+                tasks = self.db.get_tasks_by_goal_id(goal_id)
+            preloaded = {"goal": goal, "tasks": tasks}
+            
+            # Check if we should use LLM
+            llm_available = use_llm and self._llm_available
+            if llm_available and shared_context is None:
+                shared_context = self.load_shared_context()
+            
+            # Generate all components for this goal. With the LLM, the goal
+            # analysis and the obstacle analysis are separate requests, so the
+            # obstacles are identified in the background meanwhile
+            obstacles = None
+            if llm_available:
+                obstacles = obstacles_executor.submit(
+                    self.identify_obstacles,
+                    goal_id, use_llm=True, shared_context=shared_context, preloaded=preloaded
+                )
+            
+            description = self.generate_goal_description(
+                goal_id, use_llm=llm_available, shared_context=shared_context, preloaded=preloaded
+            )
+            # Only project goals are broken down into standard subtasks
+            if goal.get('type', '') == "project":
+                new_subtasks = self.breakdown_into_subtasks(goal_id, preloaded=preloaded)
+            else:
+                new_subtasks = []
+            
+            if obstacles is not None:
+                remedial_tasks = obstacles.result()
+            else:
+                remedial_tasks = self.identify_obstacles(
+                    goal_id, use_llm=False, shared_context=shared_context, preloaded=preloaded
+                )
+            
+            # Create the status overview
+            overview = {
+                "goal_id": goal_id,
+                "timestamp": datetime.now().isoformat(),
+                "description": description,
+                "new_subtasks": new_subtasks,
+                "remedial_tasks": remedial_tasks,
+                "llm_enhanced": llm_available
+            }
+            
+            # Save the overview to the database
+            if save:
+                self.db.create_status_overview(**_status_overview_row(overview), skip_unchanged=True)
+            
+            # Log whether LLM was used
+            if llm_available:
+                logger.info(f"Generated LLM-enhanced status overview for goal {goal_id}")
+            else:
+                logger.info(f"Generated standard status overview for goal {goal_id}")
+            
+            return overview
+        except Exception as e:
+            logger.error(f"Error generating status overview for goal {goal_id}: {str(e)}")
+            return {"error": f"Failed to generate status overview: {str(e)}"}
+    
+    def _save_overviews(self, overviews: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Save generated status overviews to the database in one write.
+        
+        If the bulk write fails, each overview is saved separately so one
+        bad overview doesn't lose the others; those that still fail are
+        replaced by an error. If the database can't be reached, every
+        overview is replaced by an error without retrying.
+        
+        Args:
+            overviews (List[Dict[str, Any]]): Overviews and errors, in goal order
+            
+        Returns:
+            List[Dict[str, Any]]: The overviews, with errors for any that couldn't be saved
+        """
+        generated = [overview for overview in overviews if "error" not in overview]
+        if not generated:
+            return overviews
+        
+        try:
+            # Goals change little between runs, so unchanged overviews aren't stored again
+            self.db.bulk_create_status_overviews(
+                [_status_overview_row(overview) for overview in generated], skip_unchanged=True
+            )
+            return overviews
+        except DATABASE_UNAVAILABLE_ERRORS as e:
+            logger.error(f"Error bulk saving status overviews, database unavailable: {str(e)}")
+            error = {"error": f"Failed to generate status overview: {str(e)}"}
+            return [overview if "error" in overview else dict(error) for overview in overviews]
+        except Exception as e:
+            logger.error(f"Error bulk saving status overviews, saving them one by one: {str(e)}")
+        
+        saved = []
+        for overview in overviews:
+            if "error" not in overview:
+                try:
+                    self.db.create_status_overview(**_status_overview_row(overview), skip_unchanged=True)
+                except Exception as e:
+                    logger.error(f"Error saving status overview for goal {overview['goal_id']}: {str(e)}")
+                    overview = {"error": f"Failed to generate status overview: {str(e)}"}
+            saved.append(overview)
+        return saved
+    
     def save_new_subtasks(self, subtasks: List[Dict[str, Any]]) -> bool:
         """
-        Save new subtasks to the database.
+        Save new subtasks to the database in one write.
         
         Args:
             subtasks (List[Dict[str, Any]]): List of subtasks to save
@@ -432,8 +766,8 @@ class StatusOverview:
             bool: True if successful, False otherwise
         """
         try:
-            for task in subtasks:
-                self.db.create_task(task)
+            if subtasks:
+                self.db.bulk_create_tasks([_subtask_row(subtask) for subtask in subtasks])
             return True
         except Exception as e:
             logger.error(f"Error saving new subtasks: {str(e)}")
@@ -452,6 +786,7 @@ class StatusOverview:
         """
         try:
             self.db.update_goal(goal_id, status_update)
+            self._goals_cache = None
             return True
         except Exception as e:
             logger.error(f"Error updating goal status: {str(e)}")
@@ -12,6 +12,7 @@ It also integrates with the LLM to enhance prioritization with reasoning.
 
 import logging
 import os
+import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Tuple, Optional
 
@@ -20,6 +21,54 @@ from src.llm_integration import get_llm
 
 logger = logging.getLogger(__name__)
 
+# Goal priority score: high (1.0), medium (0.6), low (0.3)
+GOAL_PRIORITY_SCORES = {
+    'high': 1.0,
+    'medium': 0.6,
+    'low': 0.3
+}
+
+# Goal type multiplier: high-level (1.2), project (1.0), other (0.8)
+GOAL_TYPE_MULTIPLIERS = {
+    'high_level': 1.2,
+    'project': 1.0,
+    'other': 0.8
+}
+
+# Deadline urgency score by whole days until the deadline: same day (1.0),
+# tomorrow (0.9), 2 days (0.8), 3 days (0.7), within a work week (0.6),
+# within a week (0.5), within 10 days (0.3), within 2 weeks (0.2)
+DEADLINE_SCORE_BY_DAYS = (1.0, 0.9, 0.8, 0.7, 0.6, 0.6, 0.5, 0.5, 0.3, 0.3, 0.3, 0.2, 0.2, 0.2, 0.2)
+
+# Deadline urgency score for deadlines more than 2 weeks away
+DISTANT_DEADLINE_SCORE = 0.1
+
+# Scores for explicit wellbeing impact tags
+WELLBEING_SCORES = {
+    'high_positive': 1.0,  # High positive impact on wellbeing
+    'positive': 0.8,       # Positive impact
+    'neutral': 0.5,        # Neutral impact
+    'negative': 0.3,       # Tasks that might have negative impact
+    'high_negative': 0.1   # Tasks with high negative impact
+}
+
+# Keywords suggesting positive wellbeing impact
+POSITIVE_KEYWORDS = (
+    'health', 'exercise', 'meditate', 'relax', 'break',
+    'rest', 'hobby', 'enjoy', 'fun', 'family', 'friend'
+)
+
+# Keywords suggesting high priority/stress
+STRESS_KEYWORDS = (
+    'urgent', 'critical', 'deadline', 'overdue',
+    'late', 'priority', 'emergency'
+)
+
+# Each keyword list compiled into one pattern, so a task's text is scanned
+# once per list instead of once per keyword
+POSITIVE_KEYWORDS_RE = re.compile("|".join(map(re.escape, POSITIVE_KEYWORDS)))
+STRESS_KEYWORDS_RE = re.compile("|".join(map(re.escape, STRESS_KEYWORDS)))
+
 class TaskPrioritizer:
     """Class to handle the prioritization of tasks and subtasks."""
     
@@ -27,6 +76,10 @@ class TaskPrioritizer:
         """Initialize the TaskPrioritizer class."""
         self.db = db.Database()
         
+        # Goals looked up during the current prioritize_tasks run, by ID, so
+        # each goal is read at most once per run
+        self._goal_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+        
         # Define weight factors for prioritization
         self.weights = {
             "goal_importance": 0.4,  # Weight for parent goal importance
@@ -59,12 +112,51 @@ class TaskPrioritizer:
             logger.error(f"Error retrieving tasks for prioritization: {str(e)}")
             return []
     
-    def calculate_goal_importance_score(self, task: Dict[str, Any]) -> float:
+    def get_goals_by_id(self, tasks: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the parent goals of several tasks with a single query.
+        
+        Args:
+            tasks (List[Dict[str, Any]]): Tasks whose goals to load
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Goals keyed by ID
+        """
+        goal_ids = {task.get('goal_id') for task in tasks if task.get('goal_id')}
+        if not goal_ids:
+            return {}
+        
+        goals_by_id = {goal['id']: goal for goal in self.db.get_goals_by_ids(list(goal_ids)) if goal}
+        
+        # Remember the goals, including missing ones, for later lookups in this run
+        for goal_id in goal_ids:
+            self._goal_cache[goal_id] = goals_by_id.get(goal_id)
+        return goals_by_id
+    
+    def _get_goal(self, goal_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a goal by ID, reading it from the database only once per run.
+        
+        Args:
+            goal_id (str): ID of the goal
+            
+        Returns:
+            Optional[Dict[str, Any]]: The goal, or None if it doesn't exist
+        """
+        if goal_id not in self._goal_cache:
+            self._goal_cache[goal_id] = self.db.get_goal_by_id(goal_id)
+        return self._goal_cache[goal_id]
+    
+    def calculate_goal_importance_score(self,
+                                        task: Dict[str, Any],
+                                        goals_by_id: Optional[Dict[str, Dict[str, Any]]] = None) -> float:
         """
         Calculate a score based on the importance of the parent goal.
         
         Args:
             task (Dict[str, Any]): Task to calculate score for
+            goals_by_id (Optional[Dict[str, Dict[str, Any]]]): Goals loaded by
+                get_goals_by_id; the goal is looked up here if not given
             
         Returns:
             float: Goal importance score (0 to 1)
@@ -76,7 +168,10 @@ class TaskPrioritizer:
                 return 0.0
             
             # Get the parent goal
-            goal = self.db.get_goal_by_id(goal_id)
+            if goals_by_id is not None:
+                goal = goals_by_id.get(goal_id)
+            else:
+                goal = self._get_goal(goal_id)
             
             if not goal:
                 return 0.0
@@ -85,23 +180,9 @@ class TaskPrioritizer:
             goal_priority = goal.get('priority', 'medium').lower()
             goal_type = goal.get('type', 'project').lower()
             
-            # Priority score: high (1.0), medium (0.6), low (0.3)
-            priority_scores = {
-                'high': 1.0,
-                'medium': 0.6,
-                'low': 0.3
-            }
-            
-            # Type multiplier: high-level (1.2), project (1.0), other (0.8)
-            type_multipliers = {
-                'high_level': 1.2,
-                'project': 1.0,
-                'other': 0.8
-            }
-            
             # Calculate the score
-            priority_score = priority_scores.get(goal_priority, 0.5)
-            type_multiplier = type_multipliers.get(goal_type, 0.8)
+            priority_score = GOAL_PRIORITY_SCORES.get(goal_priority, 0.5)
+            type_multiplier = GOAL_TYPE_MULTIPLIERS.get(goal_type, 0.8)
             
             return min(priority_score * type_multiplier, 1.0)  # Cap at 1.0
             
@@ -109,26 +190,30 @@ class TaskPrioritizer:
             logger.error(f"Error calculating goal importance score: {str(e)}")
             return 0.5  # Default to mid-priority
     
-    def calculate_deadline_score(self, task: Dict[str, Any]) -> float:
+    def calculate_deadline_score(self, task: Dict[str, Any], now: Optional[datetime] = None) -> float:
         """
         Calculate a score based on the urgency of the task deadline.
         
         Args:
             task (Dict[str, Any]): Task to calculate score for
+            now (Optional[datetime]): Current time, shared by all tasks in a run;
+                                      read here if not given
             
         Returns:
             float: Deadline urgency score (0 to 1)
         """
         try:
-            due_date_str = task.get('due_date')
+            due_date = task.get('due_date')
             
             # If no due date, assign a neutral score
-            if not due_date_str:
+            if not due_date:
                 return 0.5
             
-            # Parse the due date
-            due_date = datetime.fromisoformat(due_date_str)
-            now = datetime.now()
+            # Parse the due date, unless it was loaded as a datetime already
+            if not isinstance(due_date, datetime):
+                due_date = datetime.fromisoformat(due_date)
+            if now is None:
+                now = datetime.now()
             
             # If already overdue, assign highest score
             if due_date < now:
@@ -139,24 +224,9 @@ class TaskPrioritizer:
             
             # Calculate score: closer deadlines get higher scores
             # Scale: same day (1.0) to 14+ days away (0.1)
-            if days_until_deadline == 0:  # Due today
-                return 1.0
-            elif days_until_deadline <= 1:  # Due tomorrow
-                return 0.9
-            elif days_until_deadline <= 2:  # Due in 2 days
-                return 0.8
-            elif days_until_deadline <= 3:  # Due in 3 days
-                return 0.7
-            elif days_until_deadline <= 5:  # Due within a work week
-                return 0.6
-            elif days_until_deadline <= 7:  # Due within a week
-                return 0.5
-            elif days_until_deadline <= 10:  # Due within 10 days
-                return 0.3
-            elif days_until_deadline <= 14:  # Due within 2 weeks
-                return 0.2
-            else:  # Due more than 2 weeks away
-                return 0.1
+            if days_until_deadline < len(DEADLINE_SCORE_BY_DAYS):
+                return DEADLINE_SCORE_BY_DAYS[days_until_deadline]
+            return DISTANT_DEADLINE_SCORE
                 
         except Exception as e:
             logger.error(f"Error calculating deadline score: {str(e)}")
@@ -176,62 +246,46 @@ class TaskPrioritizer:
             # Check if the task has an explicit wellbeing tag or category
             wellbeing_impact = task.get('wellbeing_impact', 'neutral').lower()
             
-            # Assign scores based on wellbeing impact tags
-            wellbeing_scores = {
-                'high_positive': 1.0,  # High positive impact on wellbeing
-                'positive': 0.8,       # Positive impact
-                'neutral': 0.5,        # Neutral impact
-                'negative': 0.3,       # Tasks that might have negative impact
-                'high_negative': 0.1   # Tasks with high negative impact
-            }
-            
             # Keyword-based scoring for tasks without explicit tags
             if wellbeing_impact == 'neutral':
-                task_title = task.get('title', '').lower()
-                task_description = task.get('description', '').lower()
-                
-                # Keywords suggesting positive wellbeing impact
-                positive_keywords = [
-                    'health', 'exercise', 'meditate', 'relax', 'break', 
-                    'rest', 'hobby', 'enjoy', 'fun', 'family', 'friend'
-                ]
-                
-                # Keywords suggesting high priority/stress
-                stress_keywords = [
-                    'urgent', 'critical', 'deadline', 'overdue',
-                    'late', 'priority', 'emergency'
-                ]
+                # The newline keeps keywords from matching across the two fields
+                task_text = f"{task.get('title', '')}\n{task.get('description', '')}".lower()
                 
                 # Check for positive wellbeing keywords
-                for keyword in positive_keywords:
-                    if keyword in task_title or keyword in task_description:
-                        return 0.8  # Positive impact
+                if POSITIVE_KEYWORDS_RE.search(task_text):
+                    return 0.8  # Positive impact
                 
                 # Reduce priority for potentially stressful tasks
-                for keyword in stress_keywords:
-                    if keyword in task_title or keyword in task_description:
-                        return 0.3  # Could have negative impact
+                if STRESS_KEYWORDS_RE.search(task_text):
+                    return 0.3  # Could have negative impact
             
-            return wellbeing_scores.get(wellbeing_impact, 0.5)
+            # Assign scores based on wellbeing impact tags
+            return WELLBEING_SCORES.get(wellbeing_impact, 0.5)
             
         except Exception as e:
             logger.error(f"Error calculating wellbeing score: {str(e)}")
             return 0.5  # Default to neutral
     
-    def calculate_priority_score(self, task: Dict[str, Any]) -> float:
+    def calculate_priority_score(self,
+                                 task: Dict[str, Any],
+                                 goals_by_id: Optional[Dict[str, Dict[str, Any]]] = None,
+                                 now: Optional[datetime] = None) -> float:
         """
         Calculate the overall priority score for a task.
         
         Args:
             task (Dict[str, Any]): Task to calculate priority for
+            goals_by_id (Optional[Dict[str, Dict[str, Any]]]): Goals loaded by
+                get_goals_by_id; the task's goal is looked up if not given
+            now (Optional[datetime]): Current time, shared by all tasks in a run
             
         Returns:
             float: Overall priority score (0 to 1)
         """
         try:
             # Calculate individual component scores
-            goal_score = self.calculate_goal_importance_score(task)
-            deadline_score = self.calculate_deadline_score(task)
+            goal_score = self.calculate_goal_importance_score(task, goals_by_id)
+            deadline_score = self.calculate_deadline_score(task, now)
             wellbeing_score = self.calculate_wellbeing_score(task)
             
             # Calculate weighted sum
@@ -276,6 +330,9 @@ class TaskPrioritizer:
             List[Dict[str, Any]]: Prioritized list of tasks with updated priorities
         """
         try:
+            # Goals may have changed since the last run
+            self._goal_cache.clear()
+            
             # Get tasks to prioritize
             tasks = self.get_tasks_to_prioritize()
             
@@ -283,22 +340,40 @@ class TaskPrioritizer:
                 logger.info("No tasks to prioritize")
                 return []
             
-            # First pass: Calculate priority scores using our algorithm
+            # Load every parent goal with one query instead of one per task.
+            # If that fails, each goal is read once, when first needed
+            try:
+                goals_by_id = self.get_goals_by_id(tasks)
+            except Exception as e:
+                logger.error(f"Error loading goals for prioritization: {str(e)}")
+                goals_by_id = None
+            
+            # Tasks with the manual_priority flag set keep their priority, so
+            # only the others are scored, sent to the LLM and updated
+            manual_tasks, auto_tasks = [], []
             for task in tasks:
-                # Skip tasks with manual_priority flag set
-                if not task.get('manual_priority_set', False):
-                    # Calculate priority score
-                    priority_score = self.calculate_priority_score(task)
-                    task['priority_score'] = priority_score
-                    task['priority_category'] = self.categorize_priority(priority_score)
+                (manual_tasks if task.get('manual_priority_set', False) else auto_tasks).append(task)
+            if manual_tasks:
+                logger.debug(f"Skipping {len(manual_tasks)} tasks as manual priority is set")
+            
+            # First pass: Calculate priority scores using our algorithm,
+            # measuring every deadline from the same time
+            now = datetime.now()
+            for task in auto_tasks:
+                # Calculate priority score
+                priority_score = self.calculate_priority_score(task, goals_by_id, now)
+                task['priority_score'] = priority_score
+                task['priority_category'] = self.categorize_priority(priority_score)
             
             # Second pass: Enhance prioritization with LLM (if enabled)
-            if use_llm and os.getenv("ANTHROPIC_API_KEY"):
+            if auto_tasks and use_llm and os.getenv("ANTHROPIC_API_KEY"):
                 try:
                     # Get relevant goals for context
-                    goal_ids = list(set(task.get('goal_id') for task in tasks if task.get('goal_id')))
-                    goals = [self.db.get_goal_by_id(goal_id) for goal_id in goal_ids]
-                    goals = [goal for goal in goals if goal]  # Filter out None values
+                    if goals_by_id is not None:
+                        goals = list(goals_by_id.values())
+                    else:
+                        goal_ids = {task.get('goal_id') for task in auto_tasks if task.get('goal_id')}
+                        goals = [goal for goal in map(self._get_goal, goal_ids) if goal]
                     
                     # Get wellbeing context
                     wellbeing_doc = self.db.get_context_document_by_type("wellbeing_priorities")
@@ -317,26 +392,23 @@ class TaskPrioritizer:
                     llm = get_llm()
                     
                     # Get LLM-enhanced prioritization
-                    llm_prioritized_tasks = llm.prioritize_tasks(tasks, goals, context)
+                    llm_prioritized_tasks = llm.prioritize_tasks(auto_tasks, goals, context)
                     
                     # Merge LLM priorities with our algorithm's priorities
-                    for i, task in enumerate(tasks):
-                        if i < len(llm_prioritized_tasks) and not task.get('manual_priority_set', False):
-                            llm_task = llm_prioritized_tasks[i]
-                            
-                            # Get the LLM priority score (1-10 scale converted to 0-1)
-                            llm_score = llm_task.get('llm_priority', 5) / 10
-                            
-                            # Get algorithm score
-                            algo_score = task.get('priority_score', 0.5)
-                            
-                            # Blend the scores (60% LLM, 40% algorithm)
-                            blended_score = (llm_score * 0.6) + (algo_score * 0.4)
-                            
-                            # Update task with blended score and LLM reasoning
-                            task['priority_score'] = blended_score
-                            task['priority_category'] = self.categorize_priority(blended_score)
-                            task['llm_reasoning'] = llm_task.get('llm_reasoning', '')
+                    for task, llm_task in zip(auto_tasks, llm_prioritized_tasks):
+                        # Get the LLM priority score (1-10 scale converted to 0-1)
+                        llm_score = llm_task.get('llm_priority', 5) / 10
+                        
+                        # Get algorithm score
+                        algo_score = task.get('priority_score', 0.5)
+                        
+                        # Blend the scores (60% LLM, 40% algorithm)
+                        blended_score = (llm_score * 0.6) + (algo_score * 0.4)
+                        
+                        # Update task with blended score and LLM reasoning
+                        task['priority_score'] = blended_score
+                        task['priority_category'] = self.categorize_priority(blended_score)
+                        task['llm_reasoning'] = llm_task.get('llm_reasoning', '')
                     
                     logger.info("Enhanced task prioritization with LLM reasoning")
                     
@@ -344,16 +416,12 @@ class TaskPrioritizer:
                     logger.error(f"Error using LLM for task prioritization: {str(e)}")
                     logger.info("Falling back to algorithm-only prioritization")
             
-            # Final pass: Update the database and prepare the return value
-            prioritized_tasks = []
+            # Final pass: Prepare the return value and the database updates
+            prioritized_tasks = manual_tasks
+            updates = []
+            now_iso = datetime.now().isoformat()
             
-            for task in tasks:
-                # Skip tasks with manual_priority flag set
-                if task.get('manual_priority_set', False):
-                    logger.debug(f"Skipping task {task.get('id')} as manual priority is set")
-                    prioritized_tasks.append(task)
-                    continue
-                
+            for task in auto_tasks:
                 # Get the final priority data
                 priority_score = task.get('priority_score', 0.5)
                 priority_category = task.get('priority_category', 'medium')
@@ -363,26 +431,21 @@ class TaskPrioritizer:
                     **task,
                     'priority': priority_category,
                     'priority_score': priority_score,
-                    'last_prioritized': datetime.now().isoformat()
+                    'last_prioritized': now_iso
                 }
                 
                 if 'llm_reasoning' in task:
                     updated_task['llm_reasoning'] = task['llm_reasoning']
                 
-                # Update in database
-                update_data = {
-                    'priority': priority_category,
-                    'priority_score': priority_score,
-                    'last_prioritized': datetime.now().isoformat()
-                }
-                
-                if 'llm_reasoning' in task:
-                    update_data['llm_reasoning'] = task['llm_reasoning']
-                
-                self.db.update_task(task.get('id'), update_data)
-                
+                # Collect the database update; tasks store the numeric score
+                # as their priority, and the category is derived from it
+                updates.append({'id': task.get('id'), 'priority': priority_score})
                 prioritized_tasks.append(updated_task)
             
+            # Update all the tasks in the database with one write
+            if updates:
+                self.db.bulk_update_tasks(updates)
+            
             # Sort tasks by priority score (descending)
             prioritized_tasks.sort(key=lambda x: x.get('priority_score', 0), reverse=True)
             
@@ -15,9 +15,32 @@ import time
 from fastapi import HTTPException, Request, status
 from pydantic import BaseModel
 
+from src.utils.logging import REQUEST_ID
+
 # Configure module logger
 logger = logging.getLogger(__name__)
 
+# Last formatted error timestamp, as (epoch second, formatted string)
+_timestamp_cache = (0, "")
+
+
+def utc_timestamp() -> str:
+    """
+    Current UTC time formatted for error responses.
+    
+    The formatted string is reused within the same second, so bursts of
+    errors (such as rate limit rejections) call strftime once per second.
+    
+    Returns:
+        str: Timestamp like "2024-01-31 12:00:00 UTC"
+    """
+    global _timestamp_cache
+    now = int(time.time())
+    if _timestamp_cache[0] != now:
+        _timestamp_cache = (now, time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(now)))
+    return _timestamp_cache[1]
+
+
 # Custom exception classes
 class KairosError(Exception):
     """Base exception class for all kairoslms errors."""
@@ -100,13 +123,15 @@ def handle_exception(exc: Exception, request: Optional[Request] = None) -> Error
     details = {}
     
     # Get the current timestamp
-    timestamp = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
+    timestamp = utc_timestamp()
     
     # Extract path from request if available
     path = request.url.path if request else None
     
-    # Generate a simple trace ID (in production, use a proper request ID system)
-    trace_id = f"trace-{int(time.time() * 1000)}"
+    # Use the request ID so the error can be matched to the request's logs
+    trace_id = REQUEST_ID.get()
+    if trace_id == "-":
+        trace_id = f"trace-{int(time.time() * 1000)}"
     
     # Handle custom exceptions
     if isinstance(exc, KairosError):
@@ -12,10 +12,29 @@ import sys
 import logging
 import logging.handlers
 import json
+from contextvars import ContextVar
 from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
 import traceback
 
+# ID of the HTTP request being handled, set by RequestLoggingMiddleware. A
+# context variable, so it follows the request across awaits without being
+# passed around.
+REQUEST_ID: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Filter that adds the current request ID to log records.
+    
+    Records that already carry a request_id (passed via extra) keep it.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'request_id'):
+            record.request_id = REQUEST_ID.get()
+        return True
+
+
 # Define custom JSON formatter
 class JsonFormatter(logging.Formatter):
     """
@@ -200,6 +219,7 @@ def configure_logging(
     
     # Set formatter for all handlers
     for handler in handlers:
+        handler.addFilter(RequestIdFilter())
         if json_format:
             handler.setFormatter(JsonFormatter())
         else:
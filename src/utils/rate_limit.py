@@ -0,0 +1,102 @@
+"""
+Rate limiting utilities for kairoslms.
+
+This module provides a token-bucket limiter for async API clients that are
+limited both in requests per minute and in tokens per minute.
+"""
+import time
+import asyncio
+import logging
+from typing import Optional
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+
+class AsyncTokenBucket:
+    """
+    Token-bucket limiter for requests per minute and tokens per minute.
+
+    Both buckets start full and refill continuously at their per-minute
+    rate. acquire() waits until there is room for one more request of the
+    estimated size, so bursts are smoothed out to the provider's limits
+    rather than being rejected with rate limit errors. A limit of None or 0
+    disables that bucket.
+
+    The bucket uses an asyncio.Lock, so it must only be used from the event
+    loop it was first used on.
+    """
+
+    def __init__(self, tpm: Optional[int] = None, rpm: Optional[int] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            tpm: Maximum tokens per minute, or None for no token limit
+            rpm: Maximum requests per minute, or None for no request limit
+        """
+        self.tpm = tpm or None
+        self.rpm = rpm or None
+        self._tokens = float(self.tpm or 0)
+        self._requests = float(self.rpm or 0)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens and requests accrued since the last refill."""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+
+    async def acquire(self, est_tokens: int = 0) -> None:
+        """
+        Wait until a request of the estimated size fits within both limits.
+
+        Args:
+            est_tokens: Estimated total tokens (input and output) for the request
+        """
+        async with self._lock:
+            # A request larger than the whole bucket could never fit; let it
+            # through once the bucket is full instead of waiting forever
+            if self.tpm:
+                est_tokens = min(est_tokens, self.tpm)
+
+            while True:
+                self._refill()
+
+                wait = 0.0
+                if self.tpm and self._tokens < est_tokens:
+                    wait = max(wait, (est_tokens - self._tokens) * 60 / self.tpm)
+                if self.rpm and self._requests < 1:
+                    wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+
+                if wait <= 0:
+                    break
+
+                logger.debug(f"Rate limit reached, waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+
+            if self.tpm:
+                self._tokens -= est_tokens
+            if self.rpm:
+                self._requests -= 1
+
+    def record_usage(self, est_tokens: int, actual_tokens: int) -> None:
+        """
+        Correct the token bucket once a request's real usage is known.
+
+        Over-estimates are returned to the bucket; under-estimates are taken
+        from it, which may leave it in debt until it refills.
+
+        Args:
+            est_tokens: Tokens reserved by acquire() for the request
+            actual_tokens: Tokens the request actually used
+        """
+        if self.tpm:
+            est_tokens = min(est_tokens, self.tpm)
+            self._tokens = min(self.tpm, self._tokens + est_tokens - actual_tokens)
@@ -4,14 +4,17 @@ Tests for data processing functionality in kairoslms.
 This module tests the status_overview, task_prioritization, and data_processor modules.
 """
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, create_autospec
 import datetime
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path to allow importing module
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import src.db as db_module
 from src.status_overview import StatusOverview, run_status_overview_generation
 from src.task_prioritization import TaskPrioritizer, run_task_prioritization
 from src.data_processor import DataProcessor, run_data_processing
@@ -20,11 +23,17 @@ from src.data_processor import DataProcessor, run_data_processing
 class TestStatusOverview(unittest.TestCase):
     """Tests for the StatusOverview class and related functions."""
     
-    @patch('src.status_overview.db.Database')
+    @patch('src.status_overview.db.Database', create=True)
     def setUp(self, mock_db):
         """Set up test environment."""
         self.mock_db = mock_db
         self.status_overview = StatusOverview()
+        # Bulk queries are checked against the real db functions' signatures
+        for name in ("get_tasks_by_goals", "create_status_overview", "bulk_create_status_overviews",
+                     "bulk_create_tasks"):
+            setattr(self.status_overview.db, name, create_autospec(getattr(db_module, name)))
+        # Tests opt in to the LLM paths, whatever the environment
+        self.status_overview._llm_available = False
     
     def test_read_current_goals(self):
         """Test reading current goals from the database."""
@@ -48,6 +57,24 @@ class TestStatusOverview(unittest.TestCase):
         self.status_overview.db.get_goals.assert_any_call(goal_type="high_level")
         self.status_overview.db.get_goals.assert_any_call(goal_type="project")
     
+    def test_read_current_goals_reuses_recent_read(self):
+        """Test that goals are read once per cache period and re-read after an update."""
+        # Configure mock
+        self.status_overview.db.get_goals.return_value = [{"id": "1", "title": "Goal 1"}]
+        
+        # Call the method
+        first = self.status_overview.read_current_goals()
+        first["high_level"].append({"id": "2"})
+        second = self.status_overview.read_current_goals()
+        
+        # Assertions
+        self.assertEqual(second["high_level"], [{"id": "1", "title": "Goal 1"}])
+        self.assertEqual(self.status_overview.db.get_goals.call_count, 2)
+        
+        self.status_overview.update_goal_status("1", {"status": "done"})
+        self.status_overview.read_current_goals()
+        self.assertEqual(self.status_overview.db.get_goals.call_count, 4)
+    
     def test_process_new_inputs(self):
         """Test processing new inputs from various sources."""
         # Configure mocks
@@ -99,6 +126,320 @@ class TestStatusOverview(unittest.TestCase):
         self.status_overview.db.get_goal_by_id.assert_called_with("1")
         self.status_overview.db.get_tasks_by_goal_id.assert_called_with("1")
     
+    @patch('src.status_overview.get_llm')
+    def test_generate_status_overview_loads_shared_context_once(self, mock_get_llm):
+        """Test that context shared by all goals is fetched once per run."""
+        # Configure mocks
+        self.status_overview._llm_available = True
+        self.status_overview.db.get_goals.side_effect = [
+            [{"id": "1", "title": "Goal 1"}],
+            [{"id": "2", "title": "Goal 2"}, {"id": "3", "title": "Goal 3"}]
+        ]
+        self.status_overview.db.get_tasks_by_goals.return_value = {"1": [{"id": "t1", "title": "Task 1"}]}
+        self.status_overview.db.get_past_obstacles.return_value = []
+        mock_get_llm.return_value.generate_goal_analysis.return_value = {"summary": "On track"}
+        mock_get_llm.return_value.identify_obstacles.return_value = {"remedial_tasks": []}
+        
+        # Call the method
+        result = self.status_overview.generate_status_overview()
+        
+        # Assertions
+        self.assertEqual(len(result["overviews"]), 3)
+        self.status_overview.db.get_context_document_by_type.assert_called_once_with("biography")
+        self.status_overview.db.get_emails.assert_called_once()
+        self.status_overview.db.get_upcoming_calendar_events.assert_called_once()
+    
+    def test_load_shared_context(self):
+        """Test that the shared context combines the biography, emails and calendar."""
+        # Configure mocks
+        self.status_overview.db.get_context_document_by_type.return_value = {"content": "Bio"}
+        self.status_overview.db.get_emails.return_value = [{"id": "m1"}]
+        self.status_overview.db.get_upcoming_calendar_events.return_value = [{"id": "e1"}]
+        
+        # Call the method
+        context = self.status_overview.load_shared_context()
+        
+        # Assertions
+        self.assertEqual(context, {
+            "biography": "Bio",
+            "recent_emails": [{"id": "m1"}],
+            "calendar_events": [{"id": "e1"}]
+        })
+        self.status_overview.db.get_emails.assert_called_once_with(days=7, limit=10)
+        
+        # A failed query fails the whole context
+        self.status_overview.db.get_emails.side_effect = Exception("Connection lost")
+        self.assertIsNone(self.status_overview.load_shared_context())
+    
+    @patch('src.status_overview.get_llm')
+    def test_generate_status_overview_fetches_calendar_once_per_goal(self, mock_get_llm):
+        """Test that the goal description and obstacles share one calendar query."""
+        # Configure mocks
+        self.status_overview._llm_available = True
+        self.status_overview.db.get_goal_by_id.return_value = {"id": "1", "title": "Goal 1"}
+        self.status_overview.db.get_tasks_by_goal_id.return_value = []
+        self.status_overview.db.get_upcoming_calendar_events.return_value = [{"id": "e1"}]
+        self.status_overview.db.get_past_obstacles.return_value = []
+        mock_get_llm.return_value.generate_goal_analysis.return_value = {"summary": "On track"}
+        mock_get_llm.return_value.identify_obstacles.return_value = {"remedial_tasks": []}
+        
+        # Call the method
+        overview = self.status_overview.generate_status_overview(goal_id="1")
+        
+        # Assertions
+        self.assertEqual(overview["goal_id"], "1")
+        self.status_overview.db.get_upcoming_calendar_events.assert_called_once_with(days=14)
+        constraints = mock_get_llm.return_value.identify_obstacles.call_args[0][2]
+        self.assertEqual(constraints["time_constraints"], "1 upcoming events in the next 14 days")
+    
+    @patch('src.status_overview.get_llm')
+    def test_generate_status_overview_overlaps_llm_requests(self, mock_get_llm):
+        """Test that a goal's analysis and obstacle identification run at the same time."""
+        # Configure mocks
+        self.status_overview._llm_available = True
+        self.status_overview.db.get_goal_by_id.return_value = {"id": "1", "title": "Goal 1"}
+        self.status_overview.db.get_tasks_by_goal_id.return_value = []
+        self.status_overview.db.get_past_obstacles.return_value = []
+        obstacles_started = threading.Event()
+        
+        def analyze(*args, **kwargs):
+            # Only finishes if the obstacle request has started meanwhile
+            if not obstacles_started.wait(timeout=5):
+                raise TimeoutError("Obstacles were not identified concurrently")
+            return {"summary": "On track"}
+        
+        def find_obstacles(*args, **kwargs):
+            obstacles_started.set()
+            return {"remedial_tasks": [{"title": "Book a review", "priority": 5}]}
+        
+        mock_get_llm.return_value.generate_goal_analysis.side_effect = analyze
+        mock_get_llm.return_value.identify_obstacles.side_effect = find_obstacles
+        
+        # Call the method
+        overview = self.status_overview.generate_status_overview(goal_id="1")
+        
+        # Assertions
+        self.assertIn("On track", overview["description"])
+        self.assertEqual([task["title"] for task in overview["remedial_tasks"]], ["Book a review"])
+    
+    @patch('src.status_overview.ThreadPoolExecutor', wraps=ThreadPoolExecutor)
+    @patch('src.status_overview.get_llm')
+    def test_generate_status_overview_shares_obstacles_pool(self, mock_get_llm, mock_executor):
+        """Test that all goals identify their obstacles in one pool owned by the run."""
+        # Configure mocks
+        self.status_overview._llm_available = True
+        self.status_overview.db.get_goals.side_effect = [[{"id": "1"}, {"id": "2"}], [{"id": "3"}]]
+        self.status_overview.db.get_tasks_by_goals.return_value = {}
+        self.status_overview.db.get_past_obstacles.return_value = []
+        mock_get_llm.return_value.generate_goal_analysis.return_value = {"summary": "On track"}
+        mock_get_llm.return_value.identify_obstacles.return_value = {"remedial_tasks": []}
+        
+        # Call the method
+        result = self.status_overview.generate_status_overview(
+            shared_context={"biography": "Bio", "recent_emails": [], "calendar_events": [{"id": "e1"}]}
+        )
+        
+        # Assertions
+        self.assertEqual(len(result["overviews"]), 3)
+        self.assertEqual(mock_get_llm.return_value.identify_obstacles.call_count, 3)
+        # One pool for the goals and one for their obstacles
+        self.assertEqual(mock_executor.call_count, 2)
+    
+    @patch('src.status_overview.get_llm')
+    def test_generate_status_overview_skips_llm_without_context(self, mock_get_llm):
+        """Test that the LLM is not asked about a goal with no tasks, biography or events."""
+        # Configure mocks
+        self.status_overview._llm_available = True
+        self.status_overview.db.get_goal_by_id.return_value = {"id": "1", "title": "Goal 1"}
+        self.status_overview.db.get_tasks_by_goal_id.return_value = []
+        self.status_overview.db.get_context_document_by_type.return_value = None
+        self.status_overview.db.get_emails.return_value = []
+        self.status_overview.db.get_upcoming_calendar_events.return_value = []
+        
+        # Call the method
+        overview = self.status_overview.generate_status_overview(goal_id="1")
+        
+        # Assertions
+        self.assertIn("Goal: Goal 1", overview["description"])
+        self.assertEqual(overview["remedial_tasks"], [])
+        mock_get_llm.assert_not_called()
+        self.status_overview.db.get_past_obstacles.assert_not_called()
+    
+    def test_generate_status_overview_prefetches_goal_tasks(self):
+        """Test that the tasks of all goals are loaded with one query."""
+        # Configure mocks
+        self.status_overview.db.get_goals.side_effect = [
+            [{"id": "1", "title": "Goal 1"}],
+            [{"id": "2", "title": "Goal 2"}]
+        ]
+        self.status_overview.db.get_tasks_by_goals.return_value = {"1": [{"id": "t1", "title": "Task 1"}]}
+        
+        # Call the method
+        result = self.status_overview.generate_status_overview()
+        
+        # Assertions
+        self.assertEqual(len(result["overviews"]), 2)
+        self.assertIn("Task 1", result["overviews"][0]["description"])
+        self.status_overview.db.get_tasks_by_goals.assert_called_once_with(["1", "2"])
+        self.status_overview.db.get_goal_by_id.assert_not_called()
+        self.status_overview.db.get_tasks_by_goal_id.assert_not_called()
+    
+    def test_generate_status_overview_reuses_goals_without_prefetch(self):
+        """Test that goals are not looked up again when the task prefetch fails."""
+        # Configure mocks
+        self.status_overview.db.get_goals.side_effect = [[{"id": "1", "title": "Goal 1"}], []]
+        self.status_overview.db.get_tasks_by_goals.side_effect = RuntimeError("query failed")
+        self.status_overview.db.get_tasks_by_goal_id.return_value = []
+        
+        # Call the method
+        result = self.status_overview.generate_status_overview()
+        
+        # Assertions
+        self.assertEqual(result["overviews"][0]["goal_id"], "1")
+        self.status_overview.db.get_tasks_by_goal_id.assert_called_once_with("1")
+        self.status_overview.db.get_goal_by_id.assert_not_called()
+    
+    def test_generate_status_overview_isolates_goal_errors(self):
+        """Test that concurrent overviews keep goal order and one failure doesn't fail the run."""
+        # Configure mocks
+        self.status_overview.db.get_goals.side_effect = [
+            [{"id": "1", "title": "Goal 1"}, {"id": "2", "title": "Goal 2"}],
+            [{"id": "3", "title": "Goal 3"}]
+        ]
+        self.status_overview.db.get_tasks_by_goals.return_value = {}
+        self.status_overview.db.bulk_create_status_overviews.side_effect = RuntimeError("bulk write failed")
+        
+        def save(goal_id, overview, obstacles=None, skip_unchanged=False):
+            if goal_id == "2":
+                raise RuntimeError("write failed")
+        self.status_overview.db.create_status_overview.side_effect = save
+        
+        # Call the method
+        result = self.status_overview.generate_status_overview(max_workers=3)
+        
+        # Assertions
+        overviews = result["overviews"]
+        self.assertEqual([overviews[0]["goal_id"], overviews[2]["goal_id"]], ["1", "3"])
+        self.assertIn("write failed", overviews[1]["error"])
+        self.assertEqual(self.status_overview.db.create_status_overview.call_count, 3)
+        # Saved one by one in the same format as the bulk write
+        self.status_overview.db.create_status_overview.assert_any_call(
+            goal_id="1", overview=overviews[0]["description"], obstacles=None, skip_unchanged=True
+        )
+    
+    @patch('src.status_overview.get_llm')
+    def test_generate_status_overview_fails_fast_without_database(self, mock_get_llm):
+        """Test that an unreachable database fails the run instead of each goal retrying."""
+        # Configure mocks
+        self.status_overview._llm_available = True
+        self.status_overview.db.get_goals.side_effect = [[{"id": "1"}, {"id": "2"}], []]
+        self.status_overview.db.get_tasks_by_goals.side_effect = ConnectionError("connection refused")
+        
+        # Call the method
+        result = self.status_overview.generate_status_overview()
+        
+        # Assertions
+        self.assertIn("connection refused", result["error"])
+        self.status_overview.db.get_tasks_by_goal_id.assert_not_called()
+        mock_get_llm.assert_not_called()
+    
+    def test_save_overviews_does_not_retry_without_database(self):
+        """Test that overviews are not saved one by one when the database is unreachable."""
+        # Configure mocks
+        self.status_overview.db.get_goals.side_effect = [[{"id": "1"}, {"id": "2"}], []]
+        self.status_overview.db.get_tasks_by_goals.return_value = {}
+        self.status_overview.db.bulk_create_status_overviews.side_effect = TimeoutError("timed out")
+        
+        # Call the method
+        result = self.status_overview.generate_status_overview()
+        
+        # Assertions
+        self.assertEqual(len(result["overviews"]), 2)
+        self.assertTrue(all("timed out" in overview["error"] for overview in result["overviews"]))
+        self.status_overview.db.create_status_overview.assert_not_called()
+    
+    def test_generate_status_overview_saves_overviews_together(self):
+        """Test that the overviews of all goals are saved with one write."""
+        # Configure mocks
+        self.status_overview.db.get_goals.side_effect = [[{"id": "1"}], [{"id": "2"}]]
+        self.status_overview.db.get_tasks_by_goals.return_value = {}
+        
+        # Call the method
+        result = self.status_overview.generate_status_overview()
+        
+        # Assertions
+        self.status_overview.db.bulk_create_status_overviews.assert_called_once_with([
+            {"goal_id": "1", "overview": result["overviews"][0]["description"], "obstacles": None},
+            {"goal_id": "2", "overview": result["overviews"][1]["description"], "obstacles": None}
+        ], skip_unchanged=True)
+        self.status_overview.db.create_status_overview.assert_not_called()
+    
+    def test_identify_obstacles_without_llm(self):
+        """Test that overdue and blocked tasks get remedial tasks."""
+        # Configure mocks
+        self.status_overview.db.get_goal_by_id.return_value = {"id": "1", "title": "Goal 1"}
+        self.status_overview.db.get_tasks_by_goal_id.return_value = [
+            {"id": "t1", "title": "Late", "status": "pending", "due_date": "2020-01-01T00:00:00"},
+            {"id": "t2", "title": "Stuck", "status": "blocked"},
+            {"id": "t3", "title": "Done", "status": "completed", "due_date": "2020-01-01T00:00:00"},
+            {"id": "t4", "title": "Later", "status": "pending", "due_date": datetime.datetime(2999, 1, 1)}
+        ]
+        
+        # Call the method
+        remedial_tasks = self.status_overview.identify_obstacles("1")
+        
+        # Assertions
+        self.assertEqual(
+            [task["title"] for task in remedial_tasks],
+            ["Resolve overdue task: Late", "Unblock task: Stuck"]
+        )
+        self.assertEqual([task["related_to_task_id"] for task in remedial_tasks], ["t1", "t2"])
+        self.assertTrue(all(task["is_remedial"] and task["goal_id"] == "1" for task in remedial_tasks))
+    
+    def test_breakdown_into_subtasks_skips_existing_titles(self):
+        """Test that standard subtasks already on the goal are not suggested again."""
+        # Configure mocks
+        self.status_overview.db.get_goal_by_id.return_value = {"id": "1", "type": "project"}
+        self.status_overview.db.get_tasks_by_goal_id.return_value = [
+            {"title": "Define project scope"},
+            {"title": " create project TIMELINE "}
+        ]
+        
+        # Call the method
+        subtasks = self.status_overview.breakdown_into_subtasks("1")
+        
+        # Assertions
+        self.assertEqual(
+            [task["title"] for task in subtasks],
+            ["Identify key stakeholders", "Set up project tracking", "Schedule regular reviews"]
+        )
+    
+    def test_breakdown_into_subtasks_skips_task_fetch_for_other_goals(self):
+        """Test that goals other than projects get no subtasks without fetching their tasks."""
+        # Configure mocks
+        self.status_overview.db.get_goal_by_id.return_value = {"id": "1", "type": "high_level"}
+        
+        # Call the method
+        subtasks = self.status_overview.breakdown_into_subtasks("1")
+        
+        # Assertions
+        self.assertEqual(subtasks, [])
+        self.status_overview.db.get_tasks_by_goal_id.assert_not_called()
+    
+    def test_save_new_subtasks(self):
+        """Test that new subtasks are saved with one write."""
+        subtasks = [
+            {"title": "Define project scope", "priority": "high", "goal_id": "1"},
+            {"title": "Create project timeline", "priority": "high", "priority_score": 0.9, "goal_id": "1"}
+        ]
+        
+        self.assertTrue(self.status_overview.save_new_subtasks(subtasks))
+        self.status_overview.db.bulk_create_tasks.assert_called_once_with([
+            {"title": "Define project scope", "description": None, "goal_id": "1", "priority": None},
+            {"title": "Create project timeline", "description": None, "goal_id": "1", "priority": 0.9}
+        ])
+        self.status_overview.db.create_task.assert_not_called()
+    
     @patch('src.status_overview.run_status_overview_generation')
     def test_run_status_overview_generation(self, mock_run):
         """Test the run_status_overview_generation function."""
@@ -116,11 +457,14 @@ class TestStatusOverview(unittest.TestCase):
 class TestTaskPrioritization(unittest.TestCase):
     """Tests for the TaskPrioritizer class and related functions."""
     
-    @patch('src.task_prioritization.db.Database')
+    @patch('src.task_prioritization.db.Database', create=True)
     def setUp(self, mock_db):
         """Set up test environment."""
         self.mock_db = mock_db
         self.task_prioritizer = TaskPrioritizer()
+        # Bulk queries are checked against the real db functions' signatures
+        for name in ("get_goals_by_ids", "bulk_update_tasks"):
+            setattr(self.task_prioritizer.db, name, create_autospec(getattr(db_module, name)))
     
     def test_get_tasks_to_prioritize(self):
         """Test getting tasks to prioritize."""
@@ -167,6 +511,94 @@ class TestTaskPrioritization(unittest.TestCase):
         score = self.task_prioritizer.calculate_goal_importance_score({"goal_id": "2"})
         self.assertLessEqual(score, 0.5)  # Low priority project goal should have lower score
     
+    def test_prioritize_tasks_loads_goals_once(self):
+        """Test that the goals of all tasks are loaded with one query."""
+        # Configure mocks
+        self.task_prioritizer.db.get_active_tasks.return_value = [
+            {"id": "1", "title": "Task 1", "goal_id": "1"},
+            {"id": "2", "title": "Task 2", "goal_id": "1"},
+            {"id": "3", "title": "Task 3", "goal_id": "2"}
+        ]
+        self.task_prioritizer.db.get_goals_by_ids.return_value = [
+            {"id": "1", "priority": "high", "type": "high_level"},
+            {"id": "2", "priority": "low", "type": "project"}
+        ]
+        
+        # Call the method
+        tasks = self.task_prioritizer.prioritize_tasks(use_llm=False)
+        
+        # Assertions
+        self.assertEqual(len(tasks), 3)
+        self.assertEqual(tasks[-1]["id"], "3")  # Lowest priority goal sorts last
+        self.task_prioritizer.db.get_goals_by_ids.assert_called_once()
+        self.assertEqual(set(self.task_prioritizer.db.get_goals_by_ids.call_args[0][0]), {"1", "2"})
+        self.task_prioritizer.db.get_goal_by_id.assert_not_called()
+    
+    def test_prioritize_tasks_updates_tasks_together(self):
+        """Test that the new priorities are saved with one write, skipping manual priorities."""
+        # Configure mocks
+        self.task_prioritizer.db.get_active_tasks.return_value = [
+            {"id": "1", "title": "Task 1"},
+            {"id": "2", "title": "Task 2", "manual_priority_set": True},
+            {"id": "3", "title": "Task 3"}
+        ]
+        
+        # Call the method
+        self.task_prioritizer.prioritize_tasks(use_llm=False)
+        
+        # Assertions
+        self.task_prioritizer.db.bulk_update_tasks.assert_called_once()
+        updates = self.task_prioritizer.db.bulk_update_tasks.call_args[0][0]
+        self.assertEqual([update["id"] for update in updates], ["1", "3"])
+        self.assertEqual(set(updates[0]), {"id", "priority"})
+        self.assertIsInstance(updates[0]["priority"], float)
+        self.task_prioritizer.db.update_task.assert_not_called()
+    
+    @patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"})
+    @patch('src.task_prioritization.get_llm')
+    def test_prioritize_tasks_sends_only_automatic_tasks_to_llm(self, mock_get_llm):
+        """Test that tasks with a manual priority are returned unchanged and not sent to the LLM."""
+        # Configure mocks
+        manual_task = {"id": "2", "title": "Task 2", "manual_priority_set": True, "priority_score": 0.9}
+        self.task_prioritizer.db.get_active_tasks.return_value = [
+            {"id": "1", "title": "Task 1"},
+            manual_task,
+            {"id": "3", "title": "Task 3"}
+        ]
+        self.task_prioritizer.db.get_goals_by_ids.return_value = []
+        mock_get_llm.return_value.prioritize_tasks.return_value = [
+            {"llm_priority": 2, "llm_reasoning": "Can wait"},
+            {"llm_priority": 10, "llm_reasoning": "Do first"}
+        ]
+        
+        # Call the method
+        tasks = self.task_prioritizer.prioritize_tasks()
+        
+        # Assertions
+        sent_tasks = mock_get_llm.return_value.prioritize_tasks.call_args[0][0]
+        self.assertEqual([task["id"] for task in sent_tasks], ["1", "3"])
+        self.assertEqual([task["id"] for task in tasks], ["2", "3", "1"])
+        self.assertIs(tasks[0], manual_task)
+        self.assertEqual(tasks[1]["llm_reasoning"], "Do first")
+    
+    def test_prioritize_tasks_reads_each_goal_once_without_bulk_query(self):
+        """Test that goals shared by several tasks are read once when the bulk query fails."""
+        # Configure mocks
+        self.task_prioritizer.db.get_active_tasks.return_value = [
+            {"id": "1", "title": "Task 1", "goal_id": "1"},
+            {"id": "2", "title": "Task 2", "goal_id": "1"},
+            {"id": "3", "title": "Task 3", "goal_id": "2"}
+        ]
+        self.task_prioritizer.db.get_goals_by_ids.side_effect = RuntimeError("query failed")
+        self.task_prioritizer.db.get_goal_by_id.side_effect = lambda goal_id: {"id": goal_id, "priority": "high"}
+        
+        # Call the method twice
+        self.task_prioritizer.prioritize_tasks(use_llm=False)
+        self.task_prioritizer.prioritize_tasks(use_llm=False)
+        
+        # Assertions: two goals per run, and goals are read again on the next run
+        self.assertEqual(self.task_prioritizer.db.get_goal_by_id.call_count, 4)
+    
     def test_calculate_deadline_score(self):
         """Test calculating deadline score."""
         # Test overdue task
@@ -184,6 +616,34 @@ class TestTaskPrioritization(unittest.TestCase):
         score = self.task_prioritizer.calculate_deadline_score({"due_date": next_week})
         self.assertLessEqual(score, 0.7)
         self.assertGreaterEqual(score, 0.3)
+        
+        # Test a task due in 3 days, measured from a given time
+        now = datetime.datetime(2024, 1, 1, 9, 0)
+        score = self.task_prioritizer.calculate_deadline_score({"due_date": "2024-01-04T12:00:00"}, now)
+        self.assertEqual(score, 0.7)
+        
+        # Test every step of the ladder
+        expected = {0: 1.0, 1: 0.9, 2: 0.8, 3: 0.7, 5: 0.6, 7: 0.5, 10: 0.3, 14: 0.2, 15: 0.1, 60: 0.1}
+        for days, expected_score in expected.items():
+            due_date = (now + datetime.timedelta(days=days, hours=1)).isoformat()
+            score = self.task_prioritizer.calculate_deadline_score({"due_date": due_date}, now)
+            self.assertEqual(score, expected_score, f"{days} days until deadline")
+        
+        # Test a due date that is already a datetime
+        score = self.task_prioritizer.calculate_deadline_score({"due_date": datetime.datetime(2024, 1, 2, 12, 0)}, now)
+        self.assertEqual(score, 0.9)
+    
+    def test_calculate_wellbeing_score(self):
+        """Test calculating wellbeing score from tags and keywords."""
+        score = self.task_prioritizer.calculate_wellbeing_score
+        
+        self.assertEqual(score({"wellbeing_impact": "high_negative"}), 0.1)
+        self.assertEqual(score({"title": "Book EXERCISE class"}), 0.8)
+        self.assertEqual(score({"title": "Report", "description": "Overdue, but see family first"}), 0.8)
+        self.assertEqual(score({"title": "Urgent report"}), 0.3)
+        self.assertEqual(score({"title": "Review notes", "description": ""}), 0.5)
+        # Keywords don't match across the title and description
+        self.assertEqual(score({"title": "Ho", "description": "bby"}), 0.5)
     
     def test_calculate_priority_score(self):
         """Test calculating overall priority score."""
@@ -203,8 +663,8 @@ class TestTaskPrioritization(unittest.TestCase):
         self.assertLessEqual(score, 1.0)
         
         # Verify scoring methods were called
-        self.task_prioritizer.calculate_goal_importance_score.assert_called_with(task)
-        self.task_prioritizer.calculate_deadline_score.assert_called_with(task)
+        self.task_prioritizer.calculate_goal_importance_score.assert_called_with(task, None)
+        self.task_prioritizer.calculate_deadline_score.assert_called_with(task, None)
         self.task_prioritizer.calculate_wellbeing_score.assert_called_with(task)
     
     @patch('src.task_prioritization.run_task_prioritization')
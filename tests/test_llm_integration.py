@@ -3,12 +3,17 @@ Unit tests for the LLM integration module.
 """
 
 import os
+import time
+import asyncio
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import json
 
 # Import the module to test
 from src.llm_integration import LLMIntegration, get_llm
+from src.llm_cache import SemanticLLMCache
+from src.utils.rate_limit import AsyncTokenBucket
 
 
 class TestLLMIntegration(unittest.TestCase):
@@ -23,15 +28,20 @@ class TestLLMIntegration(unittest.TestCase):
         # Create a mock Anthropic client
         self.mock_client_patcher = patch('anthropic.Anthropic')
         self.mock_client = self.mock_client_patcher.start()
+        self.mock_async_client_patcher = patch('anthropic.AsyncAnthropic')
+        self.mock_async_client = self.mock_async_client_patcher.start()
         
         # Set up mock response
         self.mock_response = MagicMock()
         self.mock_response.content = [MagicMock(text="Test response from LLM")]
         self.mock_response.usage.input_tokens = 100
         self.mock_response.usage.output_tokens = 50
+        self.mock_response.usage.cache_read_input_tokens = 0
         
         # Configure the mock client
         self.mock_client.return_value.messages.create.return_value = self.mock_response
+        self.mock_async_client.return_value.messages.create = AsyncMock(return_value=self.mock_response)
+        self.mock_async_client.return_value.close = AsyncMock()
         
         # Create the LLM integration instance
         self.llm = LLMIntegration(api_key='test_api_key')
@@ -40,6 +50,7 @@ class TestLLMIntegration(unittest.TestCase):
         """Tear down test fixtures."""
         self.env_patcher.stop()
         self.mock_client_patcher.stop()
+        self.mock_async_client_patcher.stop()
     
     def test_init_with_api_key(self):
         """Test initialization with explicit API key."""
@@ -57,6 +68,14 @@ class TestLLMIntegration(unittest.TestCase):
         llm = LLMIntegration(model='claude-3-haiku-20240229')
         self.assertEqual(llm.model, 'claude-3-haiku-20240229')
     
+    def test_instances_share_http_client(self):
+        """Test that all instances reuse one pooled HTTP client."""
+        LLMIntegration(api_key='another_key')
+        
+        first, second = self.mock_client.call_args_list[-2:]
+        self.assertIsNotNone(first[1]['http_client'])
+        self.assertIs(first[1]['http_client'], second[1]['http_client'])
+    
     def test_query_llm_basic(self):
         """Test basic LLM query functionality."""
         response = self.llm.query_llm(prompt="Test prompt")
@@ -78,7 +97,202 @@ class TestLLMIntegration(unittest.TestCase):
         self.llm.query_llm(prompt="Test prompt", system_prompt=custom_system)
         
         args, kwargs = self.mock_client.return_value.messages.create.call_args
-        self.assertEqual(kwargs['system'], custom_system)
+        self.assertEqual(kwargs['system'][0]['text'], custom_system)
+        self.assertEqual(kwargs['system'][0]['cache_control'], {"type": "ephemeral"})
+    
+    def test_query_llm_with_instructions(self):
+        """Test that static instructions are sent as a cached block before the prompt."""
+        self.llm.query_llm(prompt="Goal data", instructions="Static instructions")
+        
+        args, kwargs = self.mock_client.return_value.messages.create.call_args
+        content = kwargs['messages'][0]['content']
+        self.assertEqual(content[0]['text'], "Static instructions")
+        self.assertEqual(content[0]['cache_control'], {"type": "ephemeral"})
+        self.assertEqual(content[1], {"type": "text", "text": "Goal data"})
+    
+    def test_goal_analysis_sends_shared_context_as_cached_block(self):
+        """Test that context shared by all goals is cached separately from the goal details."""
+        context = {"biography": "Test bio"}
+        
+        self.llm.generate_goal_analysis({"title": "First goal"}, [], context)
+        first = self.mock_client.return_value.messages.create.call_args[1]['messages'][0]['content']
+        self.llm.generate_goal_analysis({"title": "Second goal"}, [], context)
+        second = self.mock_client.return_value.messages.create.call_args[1]['messages'][0]['content']
+        
+        self.assertIn("Test bio", first[1]['text'])
+        self.assertEqual(first[1]['cache_control'], {"type": "ephemeral"})
+        self.assertEqual(first[:2], second[:2])
+        self.assertNotIn("Test bio", first[2]['text'])
+        self.assertIn("First goal", first[2]['text'])
+    
+    def test_aquery_llm(self):
+        """Test querying the LLM through the async client."""
+        response = asyncio.run(self.llm.aquery_llm(prompt="Async prompt"))
+        
+        create = self.mock_async_client.return_value.messages.create
+        create.assert_awaited_once()
+        args, kwargs = create.call_args
+        self.assertEqual(kwargs['messages'][0]['content'], "Async prompt")
+        self.assertEqual(response, "Test response from LLM")
+        self.assertTrue(self.llm.interaction_logs[-1]['success'])
+    
+    def test_aquery_llm_deduplicates_in_flight_prompts(self):
+        """Test that concurrent identical queries share one API call."""
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0)
+            return self.mock_response
+        
+        create = self.mock_async_client.return_value.messages.create
+        create.side_effect = slow_create
+        
+        async def run():
+            return await asyncio.gather(
+                self.llm.aquery_llm(prompt="Same prompt"),
+                self.llm.aquery_llm(prompt="Same prompt"),
+                self.llm.aquery_llm(prompt="Other prompt")
+            )
+        
+        responses = asyncio.run(run())
+        
+        self.assertEqual(responses, ["Test response from LLM"] * 3)
+        self.assertEqual(create.await_count, 2)
+        self.assertEqual(sum(1 for log in self.llm.interaction_logs if log.get('deduplicated')), 1)
+        self.assertEqual(self.llm._inflight, {})
+    
+    def test_aquery_llm_stream(self):
+        """Test streaming the LLM response in chunks."""
+        async def text_stream():
+            for chunk in ("Test response ", "from LLM"):
+                yield chunk
+        
+        stream = MagicMock()
+        stream.text_stream = text_stream()
+        stream.get_final_message = AsyncMock(return_value=self.mock_response)
+        stream_manager = MagicMock()
+        stream_manager.__aenter__ = AsyncMock(return_value=stream)
+        stream_manager.__aexit__ = AsyncMock(return_value=False)
+        self.mock_async_client.return_value.messages.stream.return_value = stream_manager
+        
+        async def collect():
+            return [chunk async for chunk in self.llm.aquery_llm_stream(prompt="Stream prompt")]
+        
+        chunks = asyncio.run(collect())
+        
+        self.assertEqual(chunks, ["Test response ", "from LLM"])
+        self.assertTrue(self.llm.interaction_logs[-1]['success'])
+        self.assertEqual(self.llm.interaction_logs[-1]['tokens']['total_tokens'], 150)
+    
+    def test_aquery_llm_stream_shares_cache_with_query_llm(self):
+        """Test that streaming sends the background and reuses the non-streaming cache entry."""
+        self.llm._cache = SemanticLLMCache(path=":memory:")
+        parts = {"instructions": "Instructions", "background": "Background"}
+        
+        response = self.llm.query_llm(prompt="Prompt", cache_mode="exact", **parts)
+        
+        async def collect():
+            return [chunk async for chunk in self.llm.aquery_llm_stream(prompt="Prompt", cache_mode="exact", **parts)]
+        
+        self.assertEqual(asyncio.run(collect()), [response])
+        self.mock_async_client.return_value.messages.stream.assert_not_called()
+        self.assertTrue(self.llm.interaction_logs[-1]['cached'])
+    
+    def test_generate_goal_analyses_parallel(self):
+        """Test analyzing several goals concurrently with a failing goal."""
+        create = self.mock_async_client.return_value.messages.create
+        create.side_effect = [self.mock_response, ValueError("bad request")]
+        goals = [{"title": "Goal 1"}, {"title": "Goal 2"}]
+        
+        analyses = self.llm.generate_goal_analyses_parallel(goals, [[], []], {})
+        
+        self.assertEqual(len(analyses), 2)
+        self.assertEqual(analyses[0]['raw_response'], "Test response from LLM")
+        self.assertEqual(analyses[1]['error'], "bad request")
+        self.assertEqual(create.await_count, 2)
+    
+    def test_identify_obstacles_parallel(self):
+        """Test identifying obstacles for several goals concurrently."""
+        goals = [{"title": "Goal 1"}, {"title": "Goal 2"}]
+        
+        first = self.llm.identify_obstacles_parallel(goals, [[], []], {})
+        second = self.llm.identify_obstacles_parallel(goals[:1], [[]], {})
+        
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertTrue(all('obstacles' in result for result in first + second))
+        # Each asyncio.run has its own loop, so each gets its own client,
+        # closed before its loop ends
+        self.assertEqual(self.mock_async_client.call_count, 2)
+        self.assertEqual(self.mock_async_client.return_value.close.await_count, 2)
+        self.assertIsNone(self.llm._async_client)
+    
+    def test_query_llm_exact_cache_hit(self):
+        """Test that a repeated prompt is answered from the cache."""
+        self.llm._cache = SemanticLLMCache(path=":memory:")
+        
+        first = self.llm.query_llm(prompt="Cached   prompt", cache_mode="exact")
+        second = self.llm.query_llm(prompt="Cached prompt", cache_mode="exact")
+        
+        self.assertEqual(first, second)
+        self.mock_client.return_value.messages.create.assert_called_once()
+        self.assertTrue(self.llm.interaction_logs[-1]['cached'])
+    
+    def test_cache_expires_after_ttl(self):
+        """Test that cached responses are not used once they have expired."""
+        cache = SemanticLLMCache(path=":memory:", ttl=60)
+        cache.put("Prompt", "System", "model", 0.3, "Response")
+        
+        self.assertEqual(cache.get("Prompt", "System", "model", 0.3), "Response")
+        with patch('src.llm_cache.time.time', return_value=time.time() + 61):
+            self.assertIsNone(cache.get("Prompt", "System", "model", 0.3))
+    
+    def test_cache_put_removes_expired_responses(self):
+        """Test that storing a response deletes responses that have expired."""
+        cache = SemanticLLMCache(path=":memory:", ttl=60)
+        cache.put("Old prompt", "System", "model", 0.3, "Old response")
+        
+        with patch('src.llm_cache.time.time', return_value=time.time() + 61):
+            cache.put("New prompt", "System", "model", 0.3, "New response")
+        
+        prompts = [row[0] for row in cache._conn.execute("SELECT prompt FROM llm_cache")]
+        self.assertEqual(prompts, ["New prompt"])
+    
+    def test_semantic_cache_matches_within_context(self):
+        """Test that semantic hits compare only the embedded text and never cross contexts."""
+        cache = SemanticLLMCache(path=":memory:")
+        embeddings = {"Goal one tasks": [1.0, 0.0], "Goal one task": [1.0, 0.0]}
+        
+        with patch.object(cache, '_embed', side_effect=lambda text: embeddings.get(text, [0.0, 1.0])) as mock_embed:
+            cache.put("Shared\nGoal one tasks", "System", "model", 0.3, "Response",
+                      mode="semantic", context="goal:1", embed_text="Goal one tasks")
+            
+            self.assertEqual(
+                cache.get("Shared\nGoal one task", "System", "model", 0.3, mode="semantic",
+                          context="goal:1", embed_text="Goal one task"),
+                "Response"
+            )
+            self.assertIsNone(
+                cache.get("Shared\nGoal one task", "System", "model", 0.3, mode="semantic",
+                          context="goal:2", embed_text="Goal one task")
+            )
+            mock_embed.assert_any_call("Goal one tasks")
+    
+    def test_goal_analysis_prompt_ignores_task_order(self):
+        """Test that the same tasks in a different order render the same prompt."""
+        goal = {"title": "Goal"}
+        tasks = [{"id": 2, "title": "Second"}, {"id": 1, "title": "First"}]
+        
+        self.assertEqual(
+            self.llm._format_goal_analysis_prompt(goal, tasks),
+            self.llm._format_goal_analysis_prompt(goal, tasks[::-1])
+        )
+    
+    def test_query_llm_cache_off_by_default(self):
+        """Test that the cache is not used unless enabled."""
+        self.llm.query_llm(prompt="Uncached prompt")
+        self.llm.query_llm(prompt="Uncached prompt")
+        
+        self.assertEqual(self.mock_client.return_value.messages.create.call_count, 2)
+        self.assertIsNone(self.llm._cache)
     
     def test_export_logs_to_string(self):
         """Test exporting logs as a string."""
@@ -92,7 +306,8 @@ class TestLLMIntegration(unittest.TestCase):
         log_data = json.loads(logs)
         self.assertTrue(isinstance(log_data, list))
         self.assertEqual(len(log_data), 1)
-        self.assertEqual(log_data[0]['prompt'], "Log test")
+        self.assertEqual(log_data[0]['prompt']['head'], "Log test")
+        self.assertEqual(log_data[0]['prompt']['len'], len("Log test"))
         self.assertTrue('success' in log_data[0])
         self.assertTrue('elapsed_time' in log_data[0])
     
@@ -106,9 +321,48 @@ class TestLLMIntegration(unittest.TestCase):
         result = self.llm.export_logs(file_path="test_logs.json")
         
         # Verify file operations
-        mock_open.assert_called_once_with("test_logs.json", "w")
+        mock_open.assert_called_once()
+        self.assertEqual(mock_open.call_args[0][0], "test_logs.json")
         self.assertTrue(result)  # Should return True for successful file write
     
+    def test_aexport_logs_to_file(self):
+        """Test exporting logs to a file from async code."""
+        self.llm.query_llm(prompt="Async file log test")
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "logs.json")
+            result = asyncio.run(self.llm.aexport_logs(file_path=file_path))
+            
+            with open(file_path) as f:
+                log_data = json.load(f)
+        
+        self.assertTrue(result)
+        self.assertEqual(log_data[0]['prompt']['head'], "Async file log test")
+    
+    def test_interaction_logs_are_bounded(self):
+        """Test that only the most recent interactions are kept."""
+        with patch('src.llm_integration.LLM_LOG_RING', 2):
+            llm = LLMIntegration(api_key='test_api_key')
+        
+        for i in range(3):
+            llm.query_llm(prompt=f"Prompt {i}")
+        
+        self.assertEqual([entry['prompt']['head'] for entry in llm.interaction_logs], ["Prompt 1", "Prompt 2"])
+    
+    def test_interaction_logs_truncate_prompts(self):
+        """Test that long prompts are summarized unless full logging is enabled."""
+        prompt = "x" * 1000
+        
+        self.llm.query_llm(prompt=prompt)
+        summary = self.llm.interaction_logs[-1]['prompt']
+        self.assertEqual(summary['len'], 1000)
+        self.assertEqual(len(summary['head']), 200)
+        self.assertEqual(len(summary['tail']), 200)
+        
+        llm = LLMIntegration(api_key='test_api_key', log_full_prompts=True)
+        llm.query_llm(prompt=prompt)
+        self.assertEqual(llm.interaction_logs[-1]['prompt'], prompt)
+    
     def test_generate_goal_analysis(self):
         """Test goal analysis generation."""
         # Mock data
@@ -140,6 +394,28 @@ class TestLLMIntegration(unittest.TestCase):
         self.assertTrue('next_steps' in analysis)
         self.assertTrue('raw_response' in analysis)
     
+    def test_generate_goal_analysis_tool_use(self):
+        """Test that goal analysis is requested and parsed as a tool call."""
+        goal = {"title": "Test Goal", "description": "Goal description"}
+        
+        tool_block = MagicMock(type="tool_use", input={
+            "summary": "On track",
+            "next_steps": ["Complete Task 1", "Start on Task 2"],
+            "obstacles": ["Time constraints"],
+            "success_criteria": "Both tasks done",
+            "connections": "Supports career goals"
+        })
+        self.mock_response.content = [tool_block]
+        
+        analysis = self.llm.generate_goal_analysis(goal, [], {})
+        
+        call_kwargs = self.mock_client.return_value.messages.create.call_args[1]
+        self.assertEqual(call_kwargs['tools'][0]['name'], "emit_goal_analysis")
+        self.assertEqual(call_kwargs['tool_choice'], {"type": "tool", "name": "emit_goal_analysis"})
+        self.assertEqual(analysis['summary'], "On track")
+        self.assertEqual(analysis['next_steps'], ["Complete Task 1", "Start on Task 2"])
+        self.assertEqual(analysis['obstacles'], ["Time constraints"])
+    
     def test_prioritize_tasks(self):
         """Test task prioritization."""
         # Mock data
@@ -191,6 +467,40 @@ class TestLLMIntegration(unittest.TestCase):
         self.assertTrue(len(obstacles['obstacles']) > 0)
         self.assertTrue(len(obstacles['remedial_tasks']) > 0)
     
+    def test_parse_obstacle_text_prefers_highest_severity(self):
+        """Test that the prose parser picks the most severe keyword in a section."""
+        response = "Obstacle 1: Low morale with high turnover\n- Hold a team retro\n\nUnrelated notes"
+        
+        result = self.llm._parse_obstacle_identification_response(response)
+        
+        self.assertEqual(len(result['obstacles']), 1)
+        self.assertEqual(result['obstacles'][0]['severity'], "High")
+        self.assertEqual(result['remedial_tasks'][0]['priority'], 7)
+    
+    def test_identify_obstacles_tool_use(self):
+        """Test that obstacles are requested and parsed as a tool call."""
+        goal = {"title": "Test Goal", "description": "Goal description"}
+        
+        tool_block = MagicMock(type="tool_use", input={
+            "obstacles": [
+                {"title": "Time constraints", "severity": "High", "remedial_tasks": ["Block out time"]},
+                {"title": "Lack of resources", "severity": "Low", "remedial_tasks": []}
+            ]
+        })
+        self.mock_response.content = [tool_block]
+        
+        obstacles = self.llm.identify_obstacles(goal, [], {})
+        
+        call_kwargs = self.mock_client.return_value.messages.create.call_args[1]
+        self.assertEqual(call_kwargs['tool_choice'], {"type": "tool", "name": "emit_obstacles"})
+        self.assertEqual(obstacles['obstacles'], [
+            {"title": "Time constraints", "severity": "High"},
+            {"title": "Lack of resources", "severity": "Low"}
+        ])
+        self.assertEqual(obstacles['remedial_tasks'], [
+            {"title": "Remedial: Block out time", "for_obstacle": "Time constraints", "priority": 7}
+        ])
+    
     def test_get_llm_factory_function(self):
         """Test the get_llm factory function."""
         with patch('src.llm_integration.LLMIntegration') as mock_llm:
@@ -200,5 +510,49 @@ class TestLLMIntegration(unittest.TestCase):
             mock_llm.assert_called_once()
 
 
+class TestAsyncTokenBucket(unittest.TestCase):
+    """Test cases for the token-bucket limiter used by async LLM queries."""
+    
+    def test_acquire_within_limits_does_not_wait(self):
+        """Test that requests within both limits go straight through."""
+        async def run():
+            bucket = AsyncTokenBucket(tpm=1000, rpm=10)
+            with patch('src.utils.rate_limit.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+                await bucket.acquire(500)
+                await bucket.acquire(400)
+            return mock_sleep
+        
+        mock_sleep = asyncio.run(run())
+        mock_sleep.assert_not_awaited()
+    
+    def test_acquire_waits_for_tokens(self):
+        """Test that a request waits for the token bucket to refill."""
+        async def run():
+            bucket = AsyncTokenBucket(tpm=600)
+            await bucket.acquire(600)
+            
+            async def refill(seconds):
+                bucket._updated -= seconds
+            
+            with patch('src.utils.rate_limit.asyncio.sleep', side_effect=refill) as mock_sleep:
+                await bucket.acquire(60)
+            return mock_sleep
+        
+        mock_sleep = asyncio.run(run())
+        # 60 tokens at 600 tokens per minute take about 6 seconds to refill
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 6.0, delta=0.5)
+    
+    def test_record_usage_returns_unused_tokens(self):
+        """Test that over-estimated requests give their spare tokens back."""
+        async def run():
+            bucket = AsyncTokenBucket(tpm=1000)
+            await bucket.acquire(800)
+            bucket.record_usage(800, 300)
+            return bucket
+        
+        bucket = asyncio.run(run())
+        self.assertAlmostEqual(bucket._tokens, 700, delta=1)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""
+Tests for the kairoslms application middlewares.
+"""
+import time
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.middlewares import (
+    ErrorHandlingMiddleware, RequestLoggingMiddleware, RateLimitingMiddleware,
+    _ORJSONResponse, _client_key, _parse_rate_limit
+)
+from src.utils.error_handling import DataValidationError, ErrorResponse
+from src.utils.logging import REQUEST_ID
+
+# Nanoseconds per second, for patching time.monotonic_ns
+NS = 1_000_000_000
+
+
+def make_client(requests_per_minute: int = 2) -> TestClient:
+    """Build a minimal app behind the rate limiting middleware."""
+    app = FastAPI()
+    app.add_middleware(RateLimitingMiddleware, requests_per_minute=requests_per_minute)
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    @app.get("/static/app.js")
+    async def static_file():
+        return {"status": "ok"}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return TestClient(app)
+
+
+def test_rate_limit_rejects_requests_over_limit():
+    """Test that requests beyond the limit get a 429 response."""
+    client = make_client(requests_per_minute=2)
+
+    assert client.get("/ping").status_code == 200
+    assert client.get("/ping").status_code == 200
+
+    response = client.get("/ping")
+    assert response.status_code == 429
+    assert response.headers["content-type"] == "application/json"
+    assert set(response.json()) == set(ErrorResponse.model_fields)
+    assert response.json()["details"]["limit"] == 2
+    assert 1 <= int(response.headers["Retry-After"]) <= 60
+
+
+def test_rate_limit_skips_untracked_paths():
+    """Test that static files and health probes are not rate limited."""
+    client = make_client(requests_per_minute=1)
+
+    for _ in range(3):
+        assert client.get("/static/app.js").status_code == 200
+        assert client.get("/health").status_code == 200
+
+
+def test_rate_limit_resets_in_next_window():
+    """Test that the limit resets once the window has passed."""
+    client = make_client(requests_per_minute=1)
+
+    with patch("src.middlewares.time.monotonic_ns", return_value=1000 * NS):
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 429
+
+    with patch("src.middlewares.time.monotonic_ns", return_value=1061 * NS):
+        assert client.get("/ping").status_code == 200
+
+
+def test_rate_limit_weights_previous_window():
+    """Test that requests from the previous window still count, weighted by overlap."""
+    client = make_client(requests_per_minute=2)
+
+    with patch("src.middlewares.time.monotonic_ns", return_value=1000 * NS):
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 200
+
+    # A quarter into the next window, 2 * 0.75 = 1.5 requests still count
+    with patch("src.middlewares.time.monotonic_ns", return_value=1035 * NS):
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 429
+
+    # Three quarters in, 2 * 0.25 + 1 = 1.5 requests count
+    with patch("src.middlewares.time.monotonic_ns", return_value=1065 * NS):
+        assert client.get("/ping").status_code == 200
+
+
+def test_rate_limit_blocks_rejected_clients():
+    """Test that a rejected client is turned away without checking its counters."""
+    client = make_client(requests_per_minute=2)
+
+    with patch("src.middlewares.time.monotonic_ns", return_value=1000 * NS):
+        client.get("/ping")
+        client.get("/ping")
+    # A quarter into the next window the estimate of 1.5 + 1 requests stays
+    # at the limit until the previous window's weight halves, 15s later
+    with patch("src.middlewares.time.monotonic_ns", return_value=1035 * NS):
+        assert client.get("/ping").status_code == 200
+        response = client.get("/ping")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "15"
+
+    with patch("src.middlewares.time.monotonic_ns", return_value=1049 * NS), \
+            patch.object(RateLimitingMiddleware, "_check") as mock_check:
+        response = client.get("/ping")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        assert response.json()["details"]["current"] == 2
+        mock_check.assert_not_called()
+
+    with patch("src.middlewares.time.monotonic_ns", return_value=1051 * NS):
+        assert client.get("/ping").status_code == 200
+
+
+def test_rate_limit_uses_redis_result():
+    """Test that the shared Redis log decides when configured."""
+    middleware = RateLimitingMiddleware(FastAPI(), requests_per_minute=5)
+    middleware._redis_script = AsyncMock(return_value=[1, 5, 12500])
+
+    allowed, count, reset_after = asyncio.run(middleware._check(_client_key("10.0.0.1")))
+
+    assert not allowed
+    assert count == 5
+    assert reset_after == 13
+    args = middleware._redis_script.call_args[1]
+    assert args["keys"] == [b"ratelimit:\x0a\x00\x00\x01"]
+    assert args["args"][1:3] == [60000, 5]
+
+
+def test_rate_limit_falls_back_to_local_counters():
+    """Test that a Redis failure falls back to the in-process counters."""
+    middleware = RateLimitingMiddleware(FastAPI(), requests_per_minute=5)
+    middleware._redis_script = AsyncMock(side_effect=ConnectionError("redis down"))
+
+    allowed, count, _ = asyncio.run(middleware._check(_client_key("10.0.0.1")))
+    asyncio.run(middleware._check(_client_key("10.0.0.1")))
+
+    assert allowed
+    assert count == 1
+    # Redis is not retried until the retry interval has passed
+    middleware._redis_script.assert_awaited_once()
+
+
+def test_rate_limit_evicts_idle_clients():
+    """Test that clients idle for two windows are dropped from the counters."""
+    middleware = RateLimitingMiddleware(FastAPI(), requests_per_minute=5)
+
+    with patch("src.middlewares.time.monotonic_ns", return_value=1000 * NS):
+        middleware._check_local(_client_key("10.0.0.1"))
+        middleware._check_local(_client_key("10.0.0.2"))
+    with patch("src.middlewares.time.monotonic_ns", return_value=1130 * NS):
+        middleware._check_local(_client_key("10.0.0.2"))
+
+    for shard in middleware.count_shards:
+        middleware._evict_expired(shard, 1130 // 60)
+
+    assert [key for shard in middleware.count_shards for key in shard] == [_client_key("10.0.0.2")]
+
+
+def test_rate_limit_sweeper_runs_in_background():
+    """Test that the sweeper evicts expired clients without further requests."""
+    middleware = RateLimitingMiddleware(FastAPI(), requests_per_minute=5)
+    middleware.window_size = 0.008
+    middleware.window_ns = 8_000_000
+
+    async def run():
+        middleware._check_local(_client_key("10.0.0.1"))
+        middleware._blocked[_client_key("10.0.0.1")] = (time.monotonic_ns(), 5)
+        middleware._start_sweeper()
+        await asyncio.sleep(0.2)
+        middleware._sweeper.cancel()
+
+    asyncio.run(run())
+
+    assert sum(len(shard) for shard in middleware.count_shards) == 0
+    assert middleware._blocked == {}
+
+
+def test_client_key_packs_addresses():
+    """Test that client addresses are keyed by their packed bytes."""
+    assert _client_key("192.168.0.1") == bytes([192, 168, 0, 1])
+    assert _client_key("::ffff:192.168.0.1") == bytes([192, 168, 0, 1])
+    assert len(_client_key("2001:db8::1")) == 16
+    assert _client_key("testclient") == b"testclient"
+
+
+def test_parse_rate_limit():
+    """Test that RATE_LIMIT is validated and clamped."""
+    assert _parse_rate_limit("120") == 120
+    assert _parse_rate_limit("0") == 1
+    assert _parse_rate_limit("lots") == 60
+
+
+def make_error_client() -> TestClient:
+    """Build a minimal app behind the error handling and logging middlewares."""
+    app = FastAPI()
+    app.add_middleware(ErrorHandlingMiddleware)
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    @app.get("/invalid")
+    async def invalid():
+        raise DataValidationError("Invalid input data", {"field": "Must be a number"})
+
+    @app.get("/broken")
+    async def broken():
+        raise ValueError("boom")
+
+    return TestClient(app)
+
+
+def test_error_handling_converts_kairos_errors():
+    """Test that KairosErrors become JSON error responses with their status."""
+    response = make_error_client().get("/invalid")
+
+    assert response.status_code == 400
+    assert set(response.json()) == set(ErrorResponse.model_fields)
+    assert response.json()["error"] == "Invalid input data"
+    assert response.json()["details"] == {"field": "Must be a number"}
+    assert response.json()["path"] == "/invalid"
+
+
+def test_error_handling_hides_unexpected_errors():
+    """Test that unexpected exceptions become generic 500 responses."""
+    response = make_error_client().get("/broken")
+
+    assert response.status_code == 500
+    assert response.json()["error"] == "Internal server error"
+
+
+def test_request_logging_adds_request_id():
+    """Test that responses carry the request ID and the completion is logged."""
+    with patch("src.middlewares.logger") as mock_logger:
+        response = make_error_client().get("/ping")
+
+    assert response.status_code == 200
+    assert len(response.headers["X-Request-ID"]) == 16
+    assert mock_logger.info.call_args[0][1:4] == ("GET", "/ping", 200)
+
+
+def test_request_id_is_available_to_handlers():
+    """Test that code handling the request can read its ID from the context."""
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/whoami")
+    async def whoami():
+        return {"request_id": REQUEST_ID.get()}
+
+    response = TestClient(app).get("/whoami")
+
+    assert response.json()["request_id"] == response.headers["X-Request-ID"]
+    assert REQUEST_ID.get() == "-"
+
+
+def test_request_logging_samples_successes():
+    """Test that only a sample of successful requests is logged, but every error is."""
+    client = make_error_client()
+
+    with patch("src.middlewares.logger") as mock_logger:
+        for _ in range(RequestLoggingMiddleware.success_sample_rate):
+            client.get("/ping")
+        client.get("/invalid")
+
+    statuses = [call[0][3] for call in mock_logger.info.call_args_list]
+    assert statuses == [200, 400]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_orjson_response_renders_compact_json(use_orjson):
+    """Test that error bodies are the same with and without orjson."""
+    import src.middlewares as middlewares
+    encoder = middlewares.orjson if use_orjson else None
+
+    with patch.object(middlewares, "orjson", encoder):
+        response = _ORJSONResponse({"error": "café", "details": {1: "a"}}, 400)
+
+    assert response.body == '{"error":"café","details":{"1":"a"}}'.encode("utf-8")
+    assert response.headers["content-type"] == "application/json"
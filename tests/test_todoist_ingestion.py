@@ -2,13 +2,16 @@
 Unit tests for Todoist ingestion module.
 """
 import os
+import json
+import asyncio
 import pytest
-from unittest.mock import patch, MagicMock, call
-from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock, call, ANY
+from datetime import datetime
 
+import requests
 from todoist_api_python.models import Task as TodoistTask
 from todoist_api_python.models import Due as TodoistDue
-from src.ingestion.todoist_ingestion import TodoistClient, ingest_todoist_tasks, sync_task_to_todoist, parse_todoist_due_date
+from src.ingestion.todoist_ingestion import TodoistClient, get_client, ingest_todoist_tasks, sync_task_to_todoist, sync_tasks_to_todoist, parse_todoist_due_date
 
 
 @pytest.fixture
@@ -53,6 +56,26 @@ class TestTodoistClient:
         client = TodoistClient(api_token="custom_token")
         assert client.api_token == "custom_token"
     
+    def test_init_with_shared_session(self):
+        """Test that a shared HTTP session is handed to the Todoist API."""
+        session = MagicMock()
+        with patch('src.ingestion.todoist_ingestion.TodoistAPI') as MockTodoistAPI:
+            client = TodoistClient(api_token="fake_token", session=session)
+            MockTodoistAPI.assert_called_once_with("fake_token", session=session)
+        
+        # The shared session keeps its adapter and pooled connections
+        assert client.session is session
+        session.mount.assert_not_called()
+    
+    def test_get_client_is_shared(self):
+        """Test that get_client reuses a single client instance."""
+        get_client.cache_clear()
+        try:
+            with patch('src.ingestion.todoist_ingestion.TodoistAPI'):
+                assert get_client() is get_client()
+        finally:
+            get_client.cache_clear()
+    
     def test_fetch_tasks(self, todoist_client, mock_todoist_task):
         """Test fetching tasks."""
         # Setup mock return value
@@ -70,7 +93,7 @@ class TestTodoistClient:
     def test_fetch_tasks_with_error(self, todoist_client):
         """Test handling errors when fetching tasks."""
         # Setup mock to raise an exception
-        todoist_client.api.get_tasks.side_effect = Exception("API error")
+        todoist_client.api.get_tasks.side_effect = requests.ConnectionError("API error")
         
         # Call the method
         tasks = todoist_client.fetch_tasks()
@@ -99,7 +122,7 @@ class TestTodoistClient:
     def test_fetch_projects_with_error(self, todoist_client):
         """Test handling errors when fetching projects."""
         # Setup mock to raise an exception
-        todoist_client.api.get_projects.side_effect = Exception("API error")
+        todoist_client.api.get_projects.side_effect = requests.ConnectionError("API error")
         
         # Call the method
         projects = todoist_client.fetch_projects()
@@ -127,7 +150,8 @@ class TestTodoistClient:
             content="New Task",
             project_id="p1",
             parent_id="12345",
-            due_string="tomorrow"
+            due_string="tomorrow",
+            request_id=ANY
         )
     
     def test_create_todoist_task_minimal(self, todoist_client, mock_todoist_task):
@@ -140,12 +164,12 @@ class TestTodoistClient:
         
         # Assertions
         assert task is mock_todoist_task
-        todoist_client.api.add_task.assert_called_once_with(content="New Task")
+        todoist_client.api.add_task.assert_called_once_with(content="New Task", request_id=ANY)
     
     def test_create_todoist_task_with_error(self, todoist_client):
         """Test handling errors when creating a task."""
         # Setup mock to raise an exception
-        todoist_client.api.add_task.side_effect = Exception("API error")
+        todoist_client.api.add_task.side_effect = requests.ConnectionError("API error")
         
         # Call the method
         task = todoist_client.create_todoist_task(content="New Task")
@@ -174,7 +198,7 @@ class TestTodoistClient:
     def test_update_todoist_task_with_error(self, todoist_client):
         """Test handling errors when updating a task."""
         # Setup mock to raise an exception
-        todoist_client.api.update_task.side_effect = Exception("API error")
+        todoist_client.api.update_task.side_effect = requests.ConnectionError("API error")
         
         # Call the method
         result = todoist_client.update_todoist_task(task_id="12345", content="Updated Task")
@@ -195,7 +219,7 @@ class TestTodoistClient:
     def test_complete_todoist_task_with_error(self, todoist_client):
         """Test handling errors when completing a task."""
         # Setup mock to raise an exception
-        todoist_client.api.close_task.side_effect = Exception("API error")
+        todoist_client.api.close_task.side_effect = requests.ConnectionError("API error")
         
         # Call the method
         result = todoist_client.complete_todoist_task(task_id="12345")
@@ -204,6 +228,101 @@ class TestTodoistClient:
         assert result is False
         todoist_client.api.close_task.assert_called_once()
 
+    
+    def test_fetch_tasks_sync(self, todoist_client):
+        """Test fetching tasks with the Sync API."""
+        payload = {
+            "full_sync": True,
+            "sync_token": "token-1",
+            "items": [
+                {"id": "1", "content": "Timed", "priority": 4, "checked": False,
+                 "parent_id": None, "due": {"date": "2023-01-01T12:00:00Z"}},
+                {"id": "2", "content": "Dated", "priority": 1, "checked": True,
+                 "parent_id": "1", "due": {"date": "2023-01-02"}},
+                {"id": "3", "content": "Deleted", "is_deleted": True}
+            ]
+        }
+        response = MagicMock()
+        response.json.return_value = payload
+        response.content = json.dumps(payload).encode()
+        todoist_client.session = MagicMock()
+        todoist_client.session.post.return_value = response
+        
+        tasks, sync_token = todoist_client.fetch_tasks_sync("*")
+        
+        assert sync_token == "token-1"
+        assert [task.id for task in tasks] == ["1", "2"]
+        assert tasks[0].due.datetime == "2023-01-01T12:00:00Z"
+        assert tasks[1].is_completed is True
+        assert parse_todoist_due_date(tasks[1].due) == datetime(2023, 1, 2, 23, 59, 59)
+        assert todoist_client.session.post.call_args[1]["data"]["sync_token"] == "*"
+    
+    def test_fetch_tasks_sync_with_error(self, todoist_client):
+        """Test that a failed sync keeps the previous token."""
+        todoist_client.session = MagicMock()
+        todoist_client.session.post.side_effect = requests.ConnectionError("API error")
+        
+        tasks, sync_token = todoist_client.fetch_tasks_sync("token-1")
+        
+        assert tasks == []
+        assert sync_token == "token-1"
+    
+    def test_fetch_tasks_sync_raises_auth_error(self, todoist_client):
+        """Test that a rejected API token is raised instead of swallowed."""
+        todoist_client.session = MagicMock()
+        todoist_client.session.post.side_effect = _http_error(401)
+    
+        with pytest.raises(requests.HTTPError):
+            todoist_client.fetch_tasks_sync("token-1")
+    
+        assert todoist_client.session.post.call_count == 1
+
+
+def _http_error(status_code, headers=None):
+    """Build a requests.HTTPError carrying a response with the given status."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return requests.HTTPError(response=response)
+
+
+class TestTodoistClientRetry:
+    """Tests for TodoistClient retry handling."""
+    
+    @patch('src.ingestion.todoist_ingestion.time.sleep')
+    def test_retries_rate_limit_honoring_retry_after(self, mock_sleep, todoist_client):
+        """Test that a 429 is retried after at least the Retry-After delay."""
+        fn = MagicMock(side_effect=[_http_error(429, {"Retry-After": "5"}), "ok"])
+        
+        assert todoist_client._with_retry(fn, "arg", key="value") == "ok"
+        
+        assert fn.call_count == 2
+        fn.assert_called_with("arg", key="value")
+        assert mock_sleep.call_count == 1
+        assert mock_sleep.call_args[0][0] >= 5
+    
+    @patch('src.ingestion.todoist_ingestion.time.sleep')
+    def test_gives_up_after_max_attempts(self, mock_sleep, todoist_client):
+        """Test that persistent server errors are raised after the last attempt."""
+        fn = MagicMock(side_effect=_http_error(503))
+        
+        with pytest.raises(requests.HTTPError):
+            todoist_client._with_retry(fn)
+        
+        assert fn.call_count == 8
+        assert mock_sleep.call_count == 7
+    
+    @patch('src.ingestion.todoist_ingestion.time.sleep')
+    def test_does_not_retry_client_errors(self, mock_sleep, todoist_client):
+        """Test that non-retryable errors are raised immediately."""
+        fn = MagicMock(side_effect=_http_error(400))
+        
+        with pytest.raises(requests.HTTPError):
+            todoist_client._with_retry(fn)
+        
+        assert fn.call_count == 1
+        mock_sleep.assert_not_called()
+
 
 class TestParseTodoistDueDate:
     """Tests for the parse_todoist_due_date function."""
@@ -269,15 +388,23 @@ class TestParseTodoistDueDate:
 class TestIngestTodoistTasks:
     """Tests for the ingest_todoist_tasks function."""
     
-    @patch('src.ingestion.todoist_ingestion.TodoistClient')
-    @patch('src.ingestion.todoist_ingestion.get_task')
-    @patch('src.ingestion.todoist_ingestion.create_task')
-    @patch('src.ingestion.todoist_ingestion.update_task')
-    def test_ingest_tasks_new(self, mock_update_task, mock_create_task, mock_get_task, MockTodoistClient):
+    @pytest.fixture(autouse=True)
+    def mock_set_sync_token(self):
+        """Start every test from a full sync and capture the stored token."""
+        with patch('src.ingestion.todoist_ingestion.get_sync_token', return_value=None), \
+                patch('src.ingestion.todoist_ingestion.set_sync_token') as mock_set:
+            yield mock_set
+    
+    @patch('src.ingestion.todoist_ingestion.get_client')
+    @patch('src.ingestion.todoist_ingestion.get_tasks_by_todoist_ids')
+    @patch('src.ingestion.todoist_ingestion.bulk_create_tasks')
+    @patch('src.ingestion.todoist_ingestion.bulk_update_tasks')
+    def test_ingest_tasks_new(self, mock_bulk_update, mock_bulk_create, mock_get_existing, mock_get_client,
+                              mock_set_sync_token):
         """Test ingesting new tasks from Todoist."""
         # Setup mock client
         mock_client = MagicMock()
-        MockTodoistClient.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Create mock tasks
         task1 = MagicMock()
@@ -300,10 +427,14 @@ class TestIngestTodoistTasks:
         task2.due = due
         
         # Setup mock client to return the tasks
-        mock_client.fetch_tasks.return_value = [task1, task2]
+        mock_client.fetch_tasks_sync.return_value = ([task1, task2], "token-1")
         
-        # Setup mock get_task to return no existing tasks
-        mock_get_task.return_value = []
+        # Setup mock lookup to return no existing tasks, then the stored ones
+        stored_task1 = MagicMock(id=1)
+        stored_task2 = MagicMock(id=2)
+        mock_get_existing.side_effect = [{}, {"t1": stored_task1, "t2": stored_task2}]
+        mock_bulk_update.side_effect = len
+        mock_bulk_create.side_effect = len
         
         # Call the function
         total, processed = ingest_todoist_tasks()
@@ -311,37 +442,74 @@ class TestIngestTodoistTasks:
         # Assertions
         assert total == 2
         assert processed == 2
-        mock_client.fetch_tasks.assert_called_once()
-        
-        # Both tasks should be created as new
-        mock_create_task.assert_has_calls([
-            call(
-                title="Task 1",
-                description=None,
-                parent_id=None,
-                priority=3.0,
-                deadline=None,
-                todoist_id="t1"
-            ),
-            call(
-                title="Task 2",
-                description=None,
-                parent_id="t1",
-                priority=4.0,
-                deadline=pytest.approx(datetime(2023, 1, 1, 23, 59, 59), abs=timedelta(seconds=1)),
-                todoist_id="t2"
-            )
+        mock_client.fetch_tasks_sync.assert_called_once_with("*")
+        
+        # Existing tasks should be looked up once for the whole batch
+        assert mock_get_existing.call_args_list[0] == call(["t1", "t2"])
+        
+        # Both tasks should be created as new in a single batch
+        mock_bulk_create.assert_called_once_with([
+            {
+                "title": "Task 1",
+                "description": None,
+                "parent_id": None,
+                "priority": 3.0,
+                "deadline": None,
+                "todoist_id": "t1"
+            },
+            {
+                "title": "Task 2",
+                "description": None,
+                "parent_id": None,
+                "priority": 4.0,
+                "deadline": datetime(2023, 1, 1, 23, 59, 59),
+                "todoist_id": "t2"
+            }
         ])
+        
+        # The subtask is then linked to its parent's local ID
+        assert sorted(mock_get_existing.call_args_list[1][0][0]) == ["t1", "t2"]
+        assert mock_bulk_update.call_args_list == [call([]), call([{"id": 2, "parent_id": 1}])]
+        mock_set_sync_token.assert_called_once_with("todoist_items", "token-1")
     
-    @patch('src.ingestion.todoist_ingestion.TodoistClient')
-    @patch('src.ingestion.todoist_ingestion.get_task')
-    @patch('src.ingestion.todoist_ingestion.create_task')
-    @patch('src.ingestion.todoist_ingestion.update_task')
-    def test_ingest_tasks_existing(self, mock_update_task, mock_create_task, mock_get_task, MockTodoistClient):
+    @patch('src.ingestion.todoist_ingestion.get_client')
+    @patch('src.ingestion.todoist_ingestion.get_tasks_by_todoist_ids')
+    @patch('src.ingestion.todoist_ingestion.bulk_create_tasks')
+    @patch('src.ingestion.todoist_ingestion.bulk_update_tasks')
+    def test_ingest_tasks_maps_parent_ids(self, mock_bulk_update, mock_bulk_create, mock_get_existing, mock_get_client):
+        """Test that subtasks of known tasks get the parent's local ID, and unknown parents none."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        
+        subtasks = []
+        for todoist_id, parent_id in (("t2", "t1"), ("t3", "missing")):
+            task = MagicMock(id=todoist_id, content=f"Task {todoist_id}", priority=1,
+                             is_completed=False, parent_id=parent_id, due=None)
+            subtasks.append(task)
+        mock_client.fetch_tasks_sync.return_value = (subtasks, "token-1")
+        
+        # t1 is already stored; the unknown parent never is
+        mock_get_existing.side_effect = [{"t1": MagicMock(id=7)}, {"t3": MagicMock(id=9)}]
+        mock_bulk_update.return_value = 0
+        mock_bulk_create.return_value = 2
+        
+        ingest_todoist_tasks()
+        
+        rows = mock_bulk_create.call_args[0][0]
+        assert [row["parent_id"] for row in rows] == [7, None]
+        assert sorted(mock_get_existing.call_args_list[1][0][0]) == ["missing", "t3"]
+        # Nothing to link when the parent is still unknown
+        mock_bulk_update.assert_called_once_with([])
+    
+    @patch('src.ingestion.todoist_ingestion.get_client')
+    @patch('src.ingestion.todoist_ingestion.get_tasks_by_todoist_ids')
+    @patch('src.ingestion.todoist_ingestion.bulk_create_tasks')
+    @patch('src.ingestion.todoist_ingestion.bulk_update_tasks')
+    def test_ingest_tasks_existing(self, mock_bulk_update, mock_bulk_create, mock_get_existing, mock_get_client):
         """Test ingesting existing tasks from Todoist."""
         # Setup mock client
         mock_client = MagicMock()
-        MockTodoistClient.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Create mock task
         task = MagicMock()
@@ -353,13 +521,15 @@ class TestIngestTodoistTasks:
         task.due = None
         
         # Setup mock client to return the task
-        mock_client.fetch_tasks.return_value = [task]
+        mock_client.fetch_tasks_sync.return_value = ([task], "token-1")
         
-        # Setup mock get_task to return an existing task
+        # Setup mock lookup to return an existing task
         existing_task = MagicMock()
         existing_task.id = 1
         existing_task.todoist_id = "t1"
-        mock_get_task.return_value = [existing_task]
+        mock_get_existing.return_value = {"t1": existing_task}
+        mock_bulk_update.return_value = 1
+        mock_bulk_create.return_value = 0
         
         # Call the function
         total, processed = ingest_todoist_tasks()
@@ -367,27 +537,28 @@ class TestIngestTodoistTasks:
         # Assertions
         assert total == 1
         assert processed == 1
-        mock_client.fetch_tasks.assert_called_once()
+        mock_client.fetch_tasks_sync.assert_called_once_with("*")
         
         # The task should be updated, not created
-        mock_update_task.assert_called_once_with(
-            task_id=1,
-            title="Task 1",
-            priority=3.0,
-            deadline=None,
-            completed=True
-        )
-        mock_create_task.assert_not_called()
+        mock_bulk_update.assert_called_once_with([
+            {
+                "id": 1,
+                "title": "Task 1",
+                "priority": 3.0,
+                "completed": True
+            }
+        ])
+        mock_bulk_create.assert_called_once_with([])
     
-    @patch('src.ingestion.todoist_ingestion.TodoistClient')
-    def test_ingest_tasks_fetch_error(self, MockTodoistClient):
+    @patch('src.ingestion.todoist_ingestion.get_client')
+    def test_ingest_tasks_fetch_error(self, mock_get_client, mock_set_sync_token):
         """Test error handling when fetching tasks."""
         # Setup mock client
         mock_client = MagicMock()
-        MockTodoistClient.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Setup mock client to raise an exception
-        mock_client.fetch_tasks.side_effect = Exception("API error")
+        mock_client.fetch_tasks_sync.side_effect = Exception("API error")
         
         # Call the function
         total, processed = ingest_todoist_tasks()
@@ -395,26 +566,100 @@ class TestIngestTodoistTasks:
         # Assertions
         assert total == 0
         assert processed == 0
-        mock_client.fetch_tasks.assert_called_once()
+        mock_client.fetch_tasks_sync.assert_called_once()
+        mock_set_sync_token.assert_not_called()
+    
+    @patch('src.ingestion.todoist_ingestion.get_tasks_by_todoist_ids')
+    @patch('src.ingestion.todoist_ingestion.bulk_create_tasks')
+    @patch('src.ingestion.todoist_ingestion.bulk_update_tasks')
+    @patch('src.ingestion.todoist_ingestion.get_client')
+    def test_ingest_tasks_uses_given_client(self, mock_get_client, mock_bulk_update, mock_bulk_create,
+                                            mock_get_existing, mock_set_sync_token):
+        """Test that a client passed in, such as the scheduler's, is used instead of the shared one."""
+        client = MagicMock()
+        client.fetch_tasks_sync.return_value = ([], "token-1")
+        mock_get_existing.return_value = {}
+        mock_bulk_update.return_value = 0
+        mock_bulk_create.return_value = 0
+        
+        ingest_todoist_tasks(client=client)
+        
+        client.fetch_tasks_sync.assert_called_once_with("*")
+        mock_get_client.assert_not_called()
+    
+    @patch('src.ingestion.todoist_ingestion.get_client')
+    @patch('src.ingestion.todoist_ingestion.get_tasks_by_todoist_ids')
+    @patch('src.ingestion.todoist_ingestion.bulk_create_tasks')
+    @patch('src.ingestion.todoist_ingestion.bulk_update_tasks')
+    def test_ingest_tasks_keeps_sync_token_after_failed_rows(self, mock_bulk_update, mock_bulk_create,
+                                                             mock_get_existing, mock_get_client,
+                                                             mock_set_sync_token):
+        """Test that the sync token isn't advanced past tasks that weren't stored."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        tasks = [
+            MagicMock(id=todoist_id, content=todoist_id, priority=1, is_completed=False, parent_id=None, due=None)
+            for todoist_id in ("t1", "t2")
+        ]
+        mock_client.fetch_tasks_sync.return_value = (tasks, "token-1")
+        mock_get_existing.return_value = {}
+        mock_bulk_update.return_value = 0
+        mock_bulk_create.return_value = 1  # One row failed and was skipped
+        
+        total, processed = ingest_todoist_tasks()
+        
+        assert (total, processed) == (2, 1)
+        mock_set_sync_token.assert_not_called()
+    
+    @patch('src.ingestion.todoist_ingestion.get_client')
+    def test_ingest_tasks_client_error(self, mock_get_client, mock_set_sync_token):
+        """Test that a client that can't be created fails the run without raising."""
+        mock_get_client.side_effect = TypeError("unexpected keyword argument 'session'")
+        
+        total, processed = ingest_todoist_tasks()
+        
+        assert (total, processed) == (0, 0)
+        mock_set_sync_token.assert_not_called()
+    
+    @patch('src.ingestion.todoist_ingestion.get_client')
+    @patch('src.ingestion.todoist_ingestion.get_tasks_by_todoist_ids')
+    @patch('src.ingestion.todoist_ingestion.bulk_create_tasks')
+    @patch('src.ingestion.todoist_ingestion.bulk_update_tasks')
+    def test_ingest_tasks_stores_sync_token(self, mock_bulk_update, mock_bulk_create, mock_get_existing,
+                                            mock_get_client, mock_set_sync_token):
+        """Test that the next sync token is stored after the changes are written."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.fetch_tasks_sync.return_value = ([], "token-2")
+        mock_get_existing.return_value = {}
+        mock_bulk_update.return_value = 0
+        mock_bulk_create.return_value = 0
+        
+        with patch('src.ingestion.todoist_ingestion.get_sync_token', return_value="token-1"):
+            ingest_todoist_tasks()
+        
+        mock_client.fetch_tasks_sync.assert_called_once_with("token-1")
+        mock_set_sync_token.assert_called_once_with("todoist_items", "token-2")
 
 
 class TestSyncTaskToTodoist:
     """Tests for the sync_task_to_todoist function."""
     
-    @patch('src.ingestion.todoist_ingestion.TodoistClient')
+    @patch('src.ingestion.todoist_ingestion.get_client')
     @patch('src.ingestion.todoist_ingestion.get_task')
     @patch('src.ingestion.todoist_ingestion.update_task')
-    def test_sync_task_new(self, mock_update_task, mock_get_task, MockTodoistClient):
+    def test_sync_task_new(self, mock_update_task, mock_get_task, mock_get_client):
         """Test syncing a new task to Todoist."""
         # Setup mock client
         mock_client = MagicMock()
-        MockTodoistClient.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Setup mock task to return
         task = MagicMock()
         task.id = 1
         task.title = "Test Task"
         task.todoist_id = None
+        task.todoist_request_id = None
         task.deadline = datetime(2023, 1, 1)
         task.completed = False
         task.parent = None
@@ -430,24 +675,50 @@ class TestSyncTaskToTodoist:
         
         # Assertions
         assert result is True
-        mock_get_task.assert_called_once_with(1)
+        mock_get_task.assert_called_once_with(1, eager=True)
+        request_id = mock_client.create_todoist_task.call_args[1]["request_id"]
         mock_client.create_todoist_task.assert_called_once_with(
             content="Test Task",
             due_string="2023-01-01",
-            parent_id=None
-        )
-        mock_update_task.assert_called_once_with(
-            task_id=1,
-            todoist_id="t1"
+            parent_id=None,
+            request_id=request_id
         )
+        assert mock_update_task.call_args_list == [
+            call(task_id=1, todoist_request_id=request_id),
+            call(task_id=1, todoist_id="t1")
+        ]
     
-    @patch('src.ingestion.todoist_ingestion.TodoistClient')
+    @patch('src.ingestion.todoist_ingestion.get_client')
     @patch('src.ingestion.todoist_ingestion.get_task')
-    def test_sync_task_existing_incomplete(self, mock_get_task, MockTodoistClient):
+    @patch('src.ingestion.todoist_ingestion.update_task')
+    def test_sync_task_reuses_request_id(self, mock_update_task, mock_get_task, mock_get_client):
+        """Test that a retried create sends the stored idempotency key."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        
+        task = MagicMock()
+        task.id = 1
+        task.title = "Test Task"
+        task.todoist_id = None
+        task.todoist_request_id = "abc123"
+        task.deadline = None
+        task.parent = None
+        mock_get_task.return_value = task
+        mock_client.create_todoist_task.return_value.id = "t1"
+        
+        result = sync_task_to_todoist(task_id=1)
+        
+        assert result is True
+        assert mock_client.create_todoist_task.call_args[1]["request_id"] == "abc123"
+        mock_update_task.assert_called_once_with(task_id=1, todoist_id="t1")
+    
+    @patch('src.ingestion.todoist_ingestion.get_client')
+    @patch('src.ingestion.todoist_ingestion.get_task')
+    def test_sync_task_existing_incomplete(self, mock_get_task, mock_get_client):
         """Test syncing an existing incomplete task to Todoist."""
         # Setup mock client
         mock_client = MagicMock()
-        MockTodoistClient.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Setup mock task to return
         task = MagicMock()
@@ -466,7 +737,7 @@ class TestSyncTaskToTodoist:
         
         # Assertions
         assert result is True
-        mock_get_task.assert_called_once_with(1)
+        mock_get_task.assert_called_once_with(1, eager=True)
         mock_client.update_todoist_task.assert_called_once_with(
             "t1",
             content="Test Task",
@@ -474,13 +745,13 @@ class TestSyncTaskToTodoist:
         )
         mock_client.complete_todoist_task.assert_not_called()
     
-    @patch('src.ingestion.todoist_ingestion.TodoistClient')
+    @patch('src.ingestion.todoist_ingestion.get_client')
     @patch('src.ingestion.todoist_ingestion.get_task')
-    def test_sync_task_existing_completed(self, mock_get_task, MockTodoistClient):
+    def test_sync_task_existing_completed(self, mock_get_task, mock_get_client):
         """Test syncing an existing completed task to Todoist."""
         # Setup mock client
         mock_client = MagicMock()
-        MockTodoistClient.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Setup mock task to return
         task = MagicMock()
@@ -499,13 +770,13 @@ class TestSyncTaskToTodoist:
         
         # Assertions
         assert result is True
-        mock_get_task.assert_called_once_with(1)
+        mock_get_task.assert_called_once_with(1, eager=True)
         mock_client.complete_todoist_task.assert_called_once_with("t1")
         mock_client.update_todoist_task.assert_not_called()
     
-    @patch('src.ingestion.todoist_ingestion.TodoistClient')
+    @patch('src.ingestion.todoist_ingestion.get_client')
     @patch('src.ingestion.todoist_ingestion.get_task')
-    def test_sync_task_not_found(self, mock_get_task, MockTodoistClient):
+    def test_sync_task_not_found(self, mock_get_task, mock_get_client):
         """Test syncing a non-existent task."""
         # Setup mock task to return None
         mock_get_task.return_value = None
@@ -515,15 +786,15 @@ class TestSyncTaskToTodoist:
         
         # Assertions
         assert result is False
-        mock_get_task.assert_called_once_with(1)
+        mock_get_task.assert_called_once_with(1, eager=True)
     
-    @patch('src.ingestion.todoist_ingestion.TodoistClient')
+    @patch('src.ingestion.todoist_ingestion.get_client')
     @patch('src.ingestion.todoist_ingestion.get_task')
-    def test_sync_task_api_error(self, mock_get_task, MockTodoistClient):
+    def test_sync_task_api_error(self, mock_get_task, mock_get_client):
         """Test error handling with API errors."""
         # Setup mock client
         mock_client = MagicMock()
-        MockTodoistClient.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Setup mock task to return
         task = MagicMock()
@@ -542,5 +813,19 @@ class TestSyncTaskToTodoist:
         
         # Assertions
         assert result is False
-        mock_get_task.assert_called_once_with(1)
-        mock_client.complete_todoist_task.assert_called_once()
\ No newline at end of file
+        mock_get_task.assert_called_once_with(1, eager=True)
+        mock_client.complete_todoist_task.assert_called_once()
+
+
+class TestSyncTasksToTodoist:
+    """Tests for the sync_tasks_to_todoist function."""
+    
+    @patch('src.ingestion.todoist_ingestion.sync_task_to_todoist')
+    def test_sync_tasks_batch(self, mock_sync_task):
+        """Test syncing several tasks returns a result per task."""
+        mock_sync_task.side_effect = lambda task_id: task_id != 2
+        
+        results = asyncio.run(sync_tasks_to_todoist([1, 2, 3], max_concurrency=2))
+        
+        assert results == {1: True, 2: False, 3: True}
+        assert mock_sync_task.call_count == 3